@@ -13,4 +13,105 @@ ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
 # Configuración de API externa
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
\ No newline at end of file
+GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+
+# Configuración de ETag: duración máxima (segundos) de un ETag sin escrituras
+ETAG_WINDOW_SECONDS = int(os.getenv("ETAG_WINDOW_SECONDS", "300"))
+
+# Configuración de la caché de respuestas ("memory" o "redis")
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")
+CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL", "redis://localhost:6379/0")
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "2048"))
+CACHE_TTL_SECONDS = int(os.getenv("CACHE_TTL_SECONDS", "300"))
+# Con "memory" cada worker tiene su propia caché y sus versiones de ETag, e invalidate()
+# solo afecta al worker que atendió la escritura: los demás pueden servir datos
+# obsoletos hasta que caduquen. Con varios workers conviene CACHE_BACKEND=redis. Con un
+# backend local, los espacios de mucha escritura caducan a los pocos segundos.
+CACHE_VOLATILE_NAMESPACES = {
+    ns.strip() for ns in os.getenv("CACHE_VOLATILE_NAMESPACES", "foros,comentarios_foro").split(",") if ns.strip()
+}
+CACHE_VOLATILE_TTL_SECONDS = int(os.getenv("CACHE_VOLATILE_TTL_SECONDS", "5"))
+
+# Configuración de compresión de respuestas
+COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "true").lower() in ("1", "true", "yes")
+COMPRESSION_MINIMUM_SIZE = int(os.getenv("COMPRESSION_MINIMUM_SIZE", "1024"))
+COMPRESSION_CONTENT_TYPES = [
+    t.strip() for t in os.getenv("COMPRESSION_CONTENT_TYPES", "application/json,application/x-ndjson,text/").split(",") if t.strip()
+]
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+
+# Modo debug: expone cabeceras de diagnóstico (consultas SQL por petición)
+DEBUG = os.getenv("DEBUG", "false").lower() in ("1", "true", "yes")
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", "5"))
+
+# Sonda de disponibilidad (/ready)
+READINESS_CACHE_SECONDS = float(os.getenv("READINESS_CACHE_SECONDS", "5"))
+READINESS_DB_TIMEOUT = float(os.getenv("READINESS_DB_TIMEOUT", "2"))
+READINESS_POOL_SATURATION = float(os.getenv("READINESS_POOL_SATURATION", "0.9"))
+
+# Trazas: "none", "stdout" o "file" (una línea JSON por span)
+TRACING_EXPORTER = os.getenv("TRACING_EXPORTER", "none").lower()
+TRACING_FILE = os.getenv("TRACING_FILE", "traces.jsonl")
+TRACING_SERVICE_NAME = os.getenv("TRACING_SERVICE_NAME", "sysmentor-api")
+
+# Llamadas al LLM: tiempo límite, reintentos y circuito
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "20"))
+LLM_AUX_TIMEOUT_SECONDS = float(os.getenv("LLM_AUX_TIMEOUT_SECONDS", "8"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+LLM_RETRY_BACKOFF_SECONDS = float(os.getenv("LLM_RETRY_BACKOFF_SECONDS", "0.5"))
+LLM_RETRY_BACKOFF_MAX_SECONDS = float(os.getenv("LLM_RETRY_BACKOFF_MAX_SECONDS", "4"))
+LLM_CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("LLM_CIRCUIT_FAILURE_THRESHOLD", "5"))
+LLM_CIRCUIT_RESET_SECONDS = float(os.getenv("LLM_CIRCUIT_RESET_SECONDS", "30"))
+
+# Planificador global de llamadas al LLM (0 en LLM_RATE_PER_SECOND = sin límite de ritmo)
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+LLM_MAX_QUEUE = int(os.getenv("LLM_MAX_QUEUE", "64"))
+LLM_RATE_PER_SECOND = float(os.getenv("LLM_RATE_PER_SECOND", "0"))
+LLM_RATE_BURST = int(os.getenv("LLM_RATE_BURST", "10"))
+
+# Proveedor de LLM: "gemini", "openai" (cualquier API compatible) o "fake" (local, sin red)
+LLM_PROVIDER = os.getenv("LLM_PROVIDER", "gemini").lower()
+LLM_MODEL = os.getenv("LLM_MODEL", "")
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1")
+LLM_FAKE_LATENCY_MS = float(os.getenv("LLM_FAKE_LATENCY_MS", "0"))
+
+# Archivado de sesiones de chat: antigüedad para archivar, retención de los archivos (0 = siempre) y sesiones por lote
+CHAT_ARCHIVE_AFTER_DAYS = int(os.getenv("CHAT_ARCHIVE_AFTER_DAYS", "90"))
+CHAT_ARCHIVE_RETENTION_DAYS = int(os.getenv("CHAT_ARCHIVE_RETENTION_DAYS", "730"))
+CHAT_ARCHIVE_BATCH = int(os.getenv("CHAT_ARCHIVE_BATCH", "200"))
+
+# Exportaciones en streaming: filas leídas del cursor y emitidas por fragmento
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+
+# Inscripción masiva por CSV: filas por INSERT, procesos para bcrypt (0 = núcleos disponibles) y máximo de filas
+BULK_ENROLL_BATCH_SIZE = int(os.getenv("BULK_ENROLL_BATCH_SIZE", "500"))
+BULK_ENROLL_HASH_WORKERS = int(os.getenv("BULK_ENROLL_HASH_WORKERS", "0"))
+BULK_ENROLL_MAX_ROWS = int(os.getenv("BULK_ENROLL_MAX_ROWS", "20000"))
+
+# Límites de ritmo por ruta (token bucket): "METODO RUTA=PETICIONES/SEGUNDOS[:ip,anonima,matricula]"
+# separadas por ";" ("anonima" es la IP, solo en peticiones sin matrícula). Si varias
+# reglas aplican a una ruta se aplican todas. Un grupo entero detrás del NAT del campus
+# comparte IP: login y chat se limitan por matrícula con un techo por IP más holgado, el
+# chat sin matrícula tiene una cubeta pequeña por IP y el registro admite la ráfaga de
+# un grupo completo (para más, la importación CSV de administración).
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() in ("1", "true", "yes")
+RATE_LIMIT_RULES = os.getenv(
+    "RATE_LIMIT_RULES",
+    "POST /api/usuarios/login=10/60:matricula;"
+    "POST /api/usuarios/login=300/60:ip;"
+    "POST /api/usuarios/=60/3600:ip;"
+    "POST /api/mensajes/mensajes-chatbot/conversar=20/60:matricula;"
+    "POST /api/mensajes/mensajes-chatbot/conversar=5/60:anonima;"
+    "POST /api/mensajes/mensajes-chatbot/conversar=120/60:ip",
+)
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")
+RATE_LIMIT_REDIS_URL = os.getenv("RATE_LIMIT_REDIS_URL", CACHE_REDIS_URL)
+# Tomar la IP de X-Forwarded-For (solo detrás de un proxy de confianza). Es obligatorio
+# detrás de Render u otro balanceador: sin él todas las peticiones llegan con la IP del
+# proxy y comparten las cubetas por IP.
+RATE_LIMIT_TRUST_PROXY = os.getenv("RATE_LIMIT_TRUST_PROXY", "false").lower() in ("1", "true", "yes")
+# Proxies de confianza delante de la aplicación (1 en Render): la IP del cliente es la
+# dirección en esa posición contando desde la derecha de X-Forwarded-For
+RATE_LIMIT_TRUSTED_HOPS = int(os.getenv("RATE_LIMIT_TRUSTED_HOPS", "1"))
@@ -3,10 +3,20 @@ from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
 from .config import DATABASE_URL
+from .utils.query_stats import instrument_engine
+from .utils.metrics import register_pool_metrics
+from .utils import tracing
 
 # Crear el motor de SQLAlchemy
 engine = create_engine(DATABASE_URL)
 
+# Medir el número de sentencias y el tiempo en base de datos por petición
+instrument_engine(engine)
+register_pool_metrics(engine)
+
+# Un span por sentencia cuando las trazas están activas
+tracing.instrument_engine(engine)
+
 # Crear una sesión local
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
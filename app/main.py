@@ -1,8 +1,33 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Depends, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, PlainTextResponse
 from sqlalchemy.orm import Session
 
+from .config import (
+    COMPRESSION_ENABLED,
+    COMPRESSION_MINIMUM_SIZE,
+    COMPRESSION_CONTENT_TYPES,
+    COMPRESSION_GZIP_LEVEL,
+    COMPRESSION_BROTLI_QUALITY,
+    DEBUG,
+    N_PLUS_ONE_THRESHOLD,
+    RATE_LIMIT_ENABLED,
+    RATE_LIMIT_TRUST_PROXY,
+    RATE_LIMIT_TRUSTED_HOPS
+)
 from .database import get_db
+from .middleware.compresion import CompressionMiddleware
+from .middleware.consultas import QueryStatsMiddleware
+from .middleware.metricas import MetricsMiddleware
+from .middleware.contexto import RequestContextMiddleware
+from .middleware.limites import RateLimitMiddleware
+from .utils import metrics
+from .utils.health import get_readiness
+from .utils.inscripcion import cerrar_pool
+from .utils.tracing import install_log_context
+from .utils.security import SECRET_KEY, ALGORITHM
 from .routers import (
     usuarios, 
     semestres, 
@@ -15,15 +40,39 @@ from .routers import (
     progreso_recursos, 
     foros, 
     comentarios_foro,  
-    mensajes_chatbot
+    mensajes_chatbot,
+    catalogo,
+    exportaciones
 )
 
+# Identificador de petición y traza en todos los logs
+install_log_context()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # Procesos del pool de cifrado de la inscripción masiva
+    cerrar_pool()
+
 app = FastAPI(
     title="SysMentor API",
     description="API para la plataforma académica SysMentor",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
+# Límites de ritmo por IP y matrícula (login, registro y chat); dentro de CORS para
+# que los navegadores puedan leer las respuestas 429
+if RATE_LIMIT_ENABLED:
+    app.add_middleware(
+        RateLimitMiddleware,
+        trust_proxy=RATE_LIMIT_TRUST_PROXY,
+        trusted_hops=RATE_LIMIT_TRUSTED_HOPS,
+        secret_key=SECRET_KEY,
+        algorithm=ALGORITHM,
+    )
+
 # Configuración de CORS
 app.add_middleware(
     CORSMiddleware,
@@ -33,6 +82,30 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Métricas de latencia y peticiones en curso
+app.add_middleware(MetricsMiddleware)
+
+# Conteo de consultas SQL por petición (cabeceras solo en modo debug)
+app.add_middleware(
+    QueryStatsMiddleware,
+    expose_headers=DEBUG,
+    n_plus_one_threshold=N_PLUS_ONE_THRESHOLD,
+)
+
+# Compresión de respuestas (gzip, o brotli si está instalado)
+if COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=COMPRESSION_MINIMUM_SIZE,
+        content_types=COMPRESSION_CONTENT_TYPES,
+        gzip_level=COMPRESSION_GZIP_LEVEL,
+        brotli_quality=COMPRESSION_BROTLI_QUALITY,
+    )
+
+# Identificador de petición y span raíz de la traza; se añade el último para que
+# envuelva a los demás middlewares y sus logs también lleven el identificador
+app.add_middleware(RequestContextMiddleware)
+
 # Incluir routers
 app.include_router(usuarios.router, prefix="/api/usuarios", tags=["Usuarios"])
 app.include_router(semestres.router, prefix="/api/semestres", tags=["Semestres"])
@@ -46,6 +119,8 @@ app.include_router(progreso_recursos.router, prefix="/api/progreso-recursos", ta
 app.include_router(foros.router, prefix="/api/foros", tags=["Foros"])
 app.include_router(comentarios_foro.router, prefix="/api/comentarios-foro", tags=["Comentarios de Foros"])
 app.include_router(mensajes_chatbot.router, prefix="/api/mensajes", tags=["Mensajes de Chatbot"])
+app.include_router(catalogo.router, prefix="/api/catalogo", tags=["Catálogo"])
+app.include_router(exportaciones.router, prefix="/api/exportaciones", tags=["Exportaciones"])
 
 @app.get("/")
 def read_root():
@@ -53,4 +128,17 @@ def read_root():
 
 @app.get("/health")
 def health_check():
-    return {"status": "ok"}
\ No newline at end of file
+    return {"status": "ok"}
+
+@app.get("/ready")
+def readiness_check():
+    readiness = get_readiness()
+    return ORJSONResponse(
+        status_code=200 if readiness.ready else 503,
+        content={"status": "ok" if readiness.ready else "unavailable", "checks": readiness.checks},
+        headers={"Cache-Control": "no-store"},
+    )
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def metrics_endpoint():
+    return PlainTextResponse(metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
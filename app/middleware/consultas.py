@@ -0,0 +1,36 @@
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..utils.query_stats import track_queries, log_n_plus_one
+
+class QueryStatsMiddleware:
+    """
+    Cuenta las sentencias SQL y el tiempo total en base de datos de cada petición.
+    Con `expose_headers` (modo debug) los añade como cabeceras X-DB-Queries y
+    X-DB-Time-Ms; las sentencias repetidas `n_plus_one_threshold` veces se registran
+    en el log como posible N+1.
+    """
+
+    def __init__(self, app: ASGIApp, expose_headers: bool = False, n_plus_one_threshold: int = 5):
+        self.app = app
+        self.expose_headers = expose_headers
+        self.n_plus_one_threshold = n_plus_one_threshold
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries() as stats:
+            async def send_wrapper(message: Message) -> None:
+                if message["type"] == "http.response.start" and self.expose_headers:
+                    headers = MutableHeaders(scope=message)
+                    headers["X-DB-Queries"] = str(stats.count)
+                    headers["X-DB-Time-Ms"] = f"{stats.total_time * 1000:.2f}"
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                if self.n_plus_one_threshold > 0:
+                    log_n_plus_one(stats, f"{scope['method']} {scope['path']}", self.n_plus_one_threshold)
@@ -0,0 +1,54 @@
+import re
+import uuid
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..utils.tracing import format_traceparent, parse_traceparent, request_context, start_span
+
+_REQUEST_ID = re.compile(r"^[A-Za-z0-9._-]{1,128}$")
+
+class RequestContextMiddleware:
+    """
+    Asigna un identificador a cada petición (respeta X-Request-ID si el cliente lo
+    envía), lo deja disponible para los logs y abre el span raíz de la traza,
+    continuando la traza del cliente si llega una cabecera traceparent.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        request_id = headers.get("x-request-id", "")
+        if not _REQUEST_ID.match(request_id):
+            request_id = uuid.uuid4().hex
+
+        with request_context(request_id):
+            with start_span(
+                f"{scope['method']} {scope['path']}",
+                kind="SERVER",
+                parent=parse_traceparent(headers.get("traceparent")),
+                **{"http.method": scope["method"], "http.target": scope["path"]},
+            ) as span:
+                async def send_wrapper(message: Message) -> None:
+                    if message["type"] == "http.response.start":
+                        response_headers = MutableHeaders(scope=message)
+                        response_headers["X-Request-ID"] = request_id
+                        if span is not None:
+                            response_headers["traceparent"] = format_traceparent(span)
+                            span.set_attribute("http.status_code", message["status"])
+                    await send(message)
+
+                await self.app(scope, receive, send_wrapper)
+
+                if span is not None:
+                    # El nombre usa la plantilla de la ruta una vez resuelta
+                    route = scope.get("route")
+                    if route is not None:
+                        span.name = f"{scope['method']} {route.path}"
+                        span.set_attribute("http.route", route.path)
@@ -0,0 +1,125 @@
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs
+
+import orjson
+from jose import JWTError, jwt
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..utils.rate_limit import RateLimiter, Regla, get_limiter, retry_after_header
+
+# Cuerpo máximo que se lee para buscar la matrícula (login y chat envían formularios pequeños)
+MAX_CUERPO = 16 * 1024
+
+class RateLimitMiddleware:
+    """
+    Aplica las reglas de límite de ritmo antes de llegar a la aplicación y responde
+    429 con Retry-After cuando una cubeta está vacía. La IP sale del cliente de la
+    conexión o, con `trust_proxy` (necesario detrás de un proxy), de X-Forwarded-For
+    contando `trusted_hops` direcciones desde la derecha: cada proxy de confianza añade
+    al final la dirección que le conectó y lo anterior lo puede escribir el cliente. La matrícula sale del token
+    Bearer si es válido y, si no, del campo `username` o `matricula` del cuerpo.
+    """
+
+    def __init__(self, app: ASGIApp, limiter: Optional[RateLimiter] = None, trust_proxy: bool = False,
+                 trusted_hops: int = 1, secret_key: Optional[str] = None, algorithm: str = "HS256"):
+        self.app = app
+        self.limiter = limiter or get_limiter()
+        self.trust_proxy = trust_proxy
+        self.trusted_hops = max(1, trusted_hops)
+        self.secret_key = secret_key
+        self.algorithm = algorithm
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        reglas = self.limiter.aplicables(scope["method"], scope["path"])
+        if not reglas:
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        identidades: Dict[str, Optional[str]] = {"ip": self._ip(scope, headers)}
+        if any({"matricula", "anonima"} & set(regla.claves) for regla in reglas):
+            identidades["matricula"], receive = await self._matricula(headers, receive)
+            # Sin matrícula la petición se carga a una cubeta por IP mucho más pequeña
+            identidades["anonima"] = None if identidades["matricula"] else identidades["ip"]
+
+        # Se rechaza con la primera regla que agota su cubeta (las de IP van primero): un
+        # cliente ya limitado no crea ni carga cubetas por matrícula
+        for regla in reglas:
+            espera = self.limiter.check(regla, identidades)
+            if espera is not None:
+                await self._rechazar(send, regla, espera)
+                return
+        await self.app(scope, receive, send)
+
+    def _ip(self, scope: Scope, headers: Headers) -> Optional[str]:
+        if self.trust_proxy and "x-forwarded-for" in headers:
+            direcciones = [d.strip() for d in ",".join(headers.getlist("x-forwarded-for")).split(",") if d.strip()]
+            if len(direcciones) >= self.trusted_hops:
+                return direcciones[-self.trusted_hops]
+        client = scope.get("client")
+        return client[0] if client else None
+
+    async def _matricula(self, headers: Headers, receive: Receive) -> Tuple[Optional[str], Receive]:
+        autorizacion = headers.get("authorization", "")
+        if self.secret_key and autorizacion.lower().startswith("bearer "):
+            try:
+                sub = jwt.decode(autorizacion[7:], self.secret_key, algorithms=[self.algorithm]).get("sub")
+                if sub:
+                    return sub.lower(), receive
+            except JWTError:
+                pass
+
+        tipo = headers.get("content-type", "")
+        longitud = headers.get("content-length")
+        if not longitud or not longitud.isdigit() or int(longitud) > MAX_CUERPO:
+            return None, receive
+        if not (tipo.startswith("application/x-www-form-urlencoded") or tipo.startswith("application/json")):
+            return None, receive
+
+        # Se lee el cuerpo completo y se entrega de nuevo a la aplicación
+        cuerpo = b""
+        mensajes = []
+        while True:
+            message = await receive()
+            mensajes.append(message)
+            if message["type"] != "http.request":
+                break
+            cuerpo += message.get("body", b"")
+            if not message.get("more_body", False):
+                break
+
+        async def replay() -> Message:
+            if mensajes:
+                return mensajes.pop(0)
+            return await receive()
+
+        try:
+            if tipo.startswith("application/json"):
+                datos = orjson.loads(cuerpo) if cuerpo else {}
+                datos = datos if isinstance(datos, dict) else {}
+                valor = datos.get("matricula") or datos.get("username")
+            else:
+                datos = parse_qs(cuerpo.decode("utf-8", "replace"))
+                valor = (datos.get("username") or datos.get("matricula") or [None])[0]
+        except orjson.JSONDecodeError:
+            valor = None
+        return (valor.strip().lower() if isinstance(valor, str) and valor.strip() else None), replay
+
+    async def _rechazar(self, send: Send, regla: Regla, espera: float) -> None:
+        cuerpo = orjson.dumps({"detail": "Demasiadas solicitudes, intenta más tarde"})
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(cuerpo)).encode()),
+                (b"retry-after", retry_after_header(espera).encode()),
+                (b"x-ratelimit-limit", f"{regla.capacidad};w={int(regla.periodo)}".encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": cuerpo})
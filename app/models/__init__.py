@@ -11,4 +11,4 @@ from .foro import Foro
 from .comentario_foro import ComentarioForo
 from .reaccion_foro import ReaccionForo
 from .progreso_recurso import ProgresoRecurso
-from app.models.mensaje_chatbot import MensajeChatbot
\ No newline at end of file
+from app.models.mensaje_chatbot import MensajeChatbot, ConversacionChatbot, ConversacionArchivada
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -13,6 +13,11 @@ class ComentarioForo(Base):
     comentario = Column(Text, nullable=False)
     fecha_comentario = Column(DateTime(timezone=True), server_default=func.now())
 
+    __table_args__ = (
+        # Comentarios de un tema en orden y último comentario para recalcular la actividad
+        Index("ix_comentario_foro_foro_fecha", "foro_id", "fecha_comentario"),
+    )
+
     # Relaciones
     foro = relationship("Foro", back_populates="comentarios")
     usuario = relationship("Usuario", backref="comentarios_foro")
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -15,6 +15,17 @@ class Foro(Base):
     fecha_publicacion = Column(DateTime(timezone=True), server_default=func.now())
     likes = Column(Integer, default=0)
     dislikes = Column(Integer, default=0)
+    # Contadores desnormalizados: se mantienen en la misma transacción que los comentarios
+    num_comentarios = Column(Integer, nullable=False, default=0, server_default="0")
+    ultima_actividad = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        # Listados ordenados por actividad o por likes, con y sin filtro de materia
+        Index("ix_foro_actividad", "ultima_actividad", "id"),
+        Index("ix_foro_likes", "likes", "id"),
+        Index("ix_foro_materia_actividad", "materia_id", "ultima_actividad", "id"),
+        Index("ix_foro_materia_likes", "materia_id", "likes", "id"),
+    )
 
     # Relaciones
     usuario = relationship("Usuario", backref="foros")
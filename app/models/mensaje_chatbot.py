@@ -1,5 +1,6 @@
 import uuid
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, JSON
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, JSON, LargeBinary, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.database import Base
@@ -12,12 +13,20 @@ class MensajeChatbot(Base):
     session_id = Column(String(36), nullable=False, default=lambda: str(uuid.uuid4()))
     mensaje = Column(Text, nullable=False)
     respuesta = Column(Text, nullable=False)
-    fecha = Column(DateTime, default=func.now())
-    contexto = Column(Text, nullable=True)  # Contexto textual de la conversación
+    # Fecha generada en Python: conserva los microsegundos (SQLite guarda CURRENT_TIMESTAMP
+    # sin fracción y la comparación con el cursor de paginación, como texto, fallaría)
+    fecha = Column(DateTime, default=datetime.now)
+    # El contexto enviado al modelo no se guarda: metadatos["contexto_ids"] referencia los
+    # mensajes previos usados y reconstruir_contexto() lo vuelve a generar bajo demanda
     metadatos = Column(JSON, nullable=True)  # Metadatos adicionales como temas, sentimiento, etc.
     
     # Relaciones
     usuario = relationship("Usuario", backref="mensajes_chatbot")
+    
+    __table_args__ = (
+        # Historial de una sesión en orden cronológico y paginación por (fecha, id)
+        Index("ix_mensaje_chatbot_session_fecha_id", "session_id", "fecha", "id"),
+    )
 
 class ConversacionChatbot(Base):
     __tablename__ = "conversacion_chatbot"
@@ -32,4 +41,18 @@ class ConversacionChatbot(Base):
     temas = Column(JSON, nullable=True)  # Temas principales detectados
     
     # Relaciones
-    usuario = relationship("Usuario", backref="conversaciones_chatbot")
\ No newline at end of file
+    usuario = relationship("Usuario", backref="conversaciones_chatbot")
+
+class ConversacionArchivada(Base):
+    """Mensajes de una sesión antigua, movidos fuera de mensaje_chatbot en un único bloque comprimido."""
+    __tablename__ = "conversacion_archivada"
+    
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    session_id = Column(String(36), unique=True, nullable=False)
+    matricula = Column(String(7), ForeignKey("usuario.matricula", ondelete="SET NULL"), nullable=True, index=True)
+    num_mensajes = Column(Integer, nullable=False)
+    fecha_primer_mensaje = Column(DateTime, nullable=True)
+    fecha_ultimo_mensaje = Column(DateTime, nullable=True, index=True)
+    fecha_archivado = Column(DateTime, default=func.now())
+    tamano_original = Column(Integer, nullable=False)  # Bytes del JSON sin comprimir
+    datos = Column(LargeBinary(length=2**24), nullable=False)  # JSON de los mensajes comprimido con zlib
@@ -1,5 +1,6 @@
 from sqlalchemy import Column, Integer, String, Text, ForeignKey, Enum
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, defer, query_expression, with_expression
+from sqlalchemy.sql import func
 import enum
 
 from ..database import Base
@@ -19,7 +20,20 @@ class Recurso(Base):
     url_video = Column(String(255))
     cuestionario_id = Column(Integer, ForeignKey("cuestionario.id", ondelete="CASCADE"), nullable=True)
 
+    # Valores calculados en SQL solo para los listados (ver resumen_options)
+    extracto_lectura = query_expression()
+    longitud_lectura = query_expression()
+
     # Relaciones
     semana_tema = relationship("SemanaTema", back_populates="recursos")
     cuestionario = relationship("Cuestionario", back_populates="recurso")
-    progresos = relationship("ProgresoRecurso", back_populates="recurso", cascade="all, delete-orphan")
\ No newline at end of file
+    progresos = relationship("ProgresoRecurso", back_populates="recurso", cascade="all, delete-orphan")
+
+# Opciones de carga para listados: el contenido completo de la lectura no se lee,
+# solo un extracto y su longitud calculados por la base de datos
+def resumen_options(longitud_extracto: int = 200):
+    return (
+        defer(Recurso.contenido_lectura),
+        with_expression(Recurso.extracto_lectura, func.substr(Recurso.contenido_lectura, 1, longitud_extracto)),
+        with_expression(Recurso.longitud_lectura, func.length(Recurso.contenido_lectura)),
+    )
@@ -0,0 +1,30 @@
+from fastapi import APIRouter, Depends, Request, Response, status
+from sqlalchemy.orm import Session
+from typing import List
+
+from ..database import get_db
+from ..schemas.catalogo import SemestreCatalogo
+from ..utils.catalogo import get_catalog_snapshot
+from ..utils.etag import etag_matches
+from ..utils.security import get_current_active_user
+from ..models.usuario import Usuario
+
+router = APIRouter()
+
+@router.get("/", response_model=List[SemestreCatalogo])
+def read_catalogo(
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_active_user)
+):
+    """
+    Obtiene el árbol completo del catálogo (semestres → materias → semanas → recursos).
+    Responde 304 si el cliente ya tiene la versión vigente (If-None-Match).
+    """
+    snapshot = get_catalog_snapshot(db)
+    headers = {"ETag": snapshot.etag, "Cache-Control": "private, no-cache"}
+
+    if etag_matches(request.headers.get("if-none-match"), snapshot.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    return Response(content=snapshot.body, media_type="application/json", headers=headers)
@@ -6,6 +6,9 @@ from typing import List
 from ..database import get_db
 from ..models.comentario_foro import ComentarioForo
 from ..schemas.comentario_foro import ComentarioForoCreate, ComentarioForo as ComentarioForoSchema, ComentarioForoUpdate
+from ..utils.cache import cached, invalidate
+from ..utils.contadores_foro import recalcular, registrar_comentario
+from ..utils.etag import conditional_get
 from ..utils.security import get_current_active_user
 from ..models.usuario import Usuario
 
@@ -26,19 +29,27 @@ def create_comentario_foro(
         comentario=comentario.comentario
     )
     
+    error = HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Error al crear el comentario. Verifica que el tema del foro exista."
+    )
+    
     try:
+        # El contador del tema se actualiza en la misma transacción que el comentario
+        if not registrar_comentario(db, comentario.foro_id):
+            db.rollback()
+            raise error
         db.add(db_comentario)
         db.commit()
+        invalidate("foros", "comentarios_foro")
         db.refresh(db_comentario)
         return db_comentario
     except IntegrityError:
         db.rollback()
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Error al crear el comentario. Verifica que el tema del foro exista."
-        )
+        raise error
 
-@router.get("/foro/{foro_id}", response_model=List[ComentarioForoSchema])
+@router.get("/foro/{foro_id}", response_model=List[ComentarioForoSchema], dependencies=[Depends(conditional_get("comentarios_foro"))])
+@cached("comentarios_foro", List[ComentarioForoSchema])
 def read_comentarios_by_foro(
     foro_id: int,
     skip: int = 0, 
@@ -55,7 +66,8 @@ def read_comentarios_by_foro(
     
     return comentarios
 
-@router.get("/{comentario_id}", response_model=ComentarioForoSchema)
+@router.get("/{comentario_id}", response_model=ComentarioForoSchema, dependencies=[Depends(conditional_get("comentarios_foro"))])
+@cached("comentarios_foro", ComentarioForoSchema)
 def read_comentario_foro(
     comentario_id: int,
     db: Session = Depends(get_db),
@@ -102,6 +114,7 @@ def update_comentario_foro(
     
     try:
         db.commit()
+        invalidate("comentarios_foro")
         db.refresh(db_comentario)
         return db_comentario
     except IntegrityError:
@@ -134,6 +147,10 @@ def delete_comentario_foro(
             detail="No tienes permisos para eliminar este comentario"
         )
     
+    foro_id = db_comentario.foro_id
     db.delete(db_comentario)
+    db.flush()
+    recalcular(db, [foro_id])
     db.commit()
+    invalidate("foros", "comentarios_foro")
     return None
\ No newline at end of file
@@ -9,6 +9,7 @@ from ..models.pregunta import Pregunta
 from ..models.opcion import Opcion
 from ..schemas.cuestionario import CuestionarioCreate, Cuestionario as CuestionarioSchema, CuestionarioUpdate
 from ..schemas.pregunta import PreguntaCreate, Pregunta as PreguntaSchema
+from ..utils.cache import invalidate
 from ..utils.security import get_current_active_user, get_admin_user
 from ..models.usuario import Usuario
 
@@ -126,6 +127,7 @@ def delete_cuestionario(
     try:
         db.delete(db_cuestionario)
         db.commit()
+        invalidate("recursos")
         return None
     except IntegrityError:
         db.rollback()
@@ -0,0 +1,150 @@
+from datetime import datetime
+from typing import Any, Iterator, Optional, Sequence
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import select
+
+from app.models.comentario_foro import ComentarioForo
+from app.models.foro import Foro
+from app.models.mensaje_chatbot import ConversacionArchivada, ConversacionChatbot, MensajeChatbot
+from app.models.progreso_recurso import ProgresoRecurso
+from app.models.usuario import Usuario
+from app.utils.archivo_chat import descomprimir
+from app.utils.exportacion import exportar, fecha_naive, filas
+from app.utils.security import get_admin_user
+
+router = APIRouter(
+    dependencies=[Depends(get_admin_user)],
+    responses={403: {"description": "Solo administradores"}},
+)
+
+# Todas las exportaciones se emiten en streaming (NDJSON por defecto o CSV) y en
+# orden de id; la memoria usada no depende del número de filas.
+Formato = Query("ndjson", pattern="^(ndjson|csv)$")
+
+def _rango(consulta, columna, desde: Optional[datetime], hasta: Optional[datetime]):
+    desde, hasta = fecha_naive(desde), fecha_naive(hasta)
+    if desde:
+        consulta = consulta.where(columna >= desde)
+    if hasta:
+        consulta = consulta.where(columna < hasta)
+    return consulta
+
+@router.get("/conversaciones")
+def exportar_conversaciones(
+    formato: str = Formato,
+    matricula: Optional[str] = None,
+    desde: Optional[datetime] = None,
+    hasta: Optional[datetime] = None,
+):
+    """Exporta las conversaciones (título, resumen y temas), filtrando por última actividad."""
+    consulta = select(
+        ConversacionChatbot.id, ConversacionChatbot.session_id, ConversacionChatbot.matricula,
+        ConversacionChatbot.titulo, ConversacionChatbot.fecha_inicio, ConversacionChatbot.fecha_ultima_actividad,
+        ConversacionChatbot.resumen, ConversacionChatbot.temas,
+    ).order_by(ConversacionChatbot.id)
+    if matricula:
+        consulta = consulta.where(ConversacionChatbot.matricula == matricula)
+    consulta = _rango(consulta, ConversacionChatbot.fecha_ultima_actividad, desde, hasta)
+    return exportar("conversaciones", consulta, formato)
+
+@router.get("/mensajes")
+def exportar_mensajes(
+    formato: str = Formato,
+    matricula: Optional[str] = None,
+    session_id: Optional[str] = None,
+    desde: Optional[datetime] = None,
+    hasta: Optional[datetime] = None,
+    incluir_archivados: bool = False,
+):
+    """
+    Exporta los mensajes del chatbot. Con `incluir_archivados` se añaden al final los
+    de las sesiones archivadas, descomprimiendo una sesión cada vez.
+    """
+    desde, hasta = fecha_naive(desde), fecha_naive(hasta)
+    consulta = select(
+        MensajeChatbot.id, MensajeChatbot.session_id, MensajeChatbot.matricula, MensajeChatbot.fecha,
+        MensajeChatbot.mensaje, MensajeChatbot.respuesta, MensajeChatbot.metadatos,
+    ).order_by(MensajeChatbot.id)
+    if matricula:
+        consulta = consulta.where(MensajeChatbot.matricula == matricula)
+    if session_id:
+        consulta = consulta.where(MensajeChatbot.session_id == session_id)
+    consulta = _rango(consulta, MensajeChatbot.fecha, desde, hasta)
+
+    if not incluir_archivados:
+        return exportar("mensajes", consulta, formato)
+
+    archivos = select(ConversacionArchivada.datos).order_by(ConversacionArchivada.id)
+    if matricula:
+        archivos = archivos.where(ConversacionArchivada.matricula == matricula)
+    if session_id:
+        archivos = archivos.where(ConversacionArchivada.session_id == session_id)
+    if desde:
+        archivos = archivos.where(ConversacionArchivada.fecha_ultimo_mensaje >= desde)
+    if hasta:
+        archivos = archivos.where(ConversacionArchivada.fecha_primer_mensaje < hasta)
+    columnas = [c.name for c in consulta.selected_columns]
+
+    def con_archivados(registros: Iterator[Sequence[Any]]) -> Iterator[Sequence[Any]]:
+        yield from registros
+        for (datos,) in filas(archivos, lote=50):
+            for mensaje in descomprimir(datos):
+                fecha = fecha_naive(datetime.fromisoformat(mensaje["fecha"])) if mensaje.get("fecha") else None
+                if fecha and ((desde and fecha < desde) or (hasta and fecha >= hasta)):
+                    continue
+                yield tuple(fecha if c == "fecha" else mensaje.get(c) for c in columnas)
+
+    return exportar("mensajes", consulta, formato, transformar=con_archivados)
+
+@router.get("/foros")
+def exportar_foros(
+    formato: str = Formato,
+    materia_id: Optional[int] = None,
+    desde: Optional[datetime] = None,
+    hasta: Optional[datetime] = None,
+):
+    """Exporta las publicaciones del foro con su autor y contadores de reacciones y comentarios."""
+    consulta = select(
+        Foro.id, Foro.materia_id, Foro.matricula, Usuario.nombre.label("autor"), Foro.titulo, Foro.contenido,
+        Foro.fecha_publicacion, Foro.likes, Foro.dislikes, Foro.num_comentarios, Foro.ultima_actividad,
+    ).join(Usuario, Usuario.matricula == Foro.matricula).order_by(Foro.id)
+    if materia_id:
+        consulta = consulta.where(Foro.materia_id == materia_id)
+    consulta = _rango(consulta, Foro.fecha_publicacion, desde, hasta)
+    return exportar("foros", consulta, formato)
+
+@router.get("/comentarios-foro")
+def exportar_comentarios_foro(
+    formato: str = Formato,
+    foro_id: Optional[int] = None,
+    desde: Optional[datetime] = None,
+    hasta: Optional[datetime] = None,
+):
+    """Exporta los comentarios del foro."""
+    consulta = select(
+        ComentarioForo.id, ComentarioForo.foro_id, ComentarioForo.matricula, ComentarioForo.comentario,
+        ComentarioForo.fecha_comentario,
+    ).order_by(ComentarioForo.id)
+    if foro_id:
+        consulta = consulta.where(ComentarioForo.foro_id == foro_id)
+    consulta = _rango(consulta, ComentarioForo.fecha_comentario, desde, hasta)
+    return exportar("comentarios-foro", consulta, formato)
+
+@router.get("/progreso")
+def exportar_progreso(
+    formato: str = Formato,
+    matricula: Optional[str] = None,
+    recurso_id: Optional[int] = None,
+):
+    """Exporta el progreso de los estudiantes en los recursos."""
+    consulta = select(
+        ProgresoRecurso.id, ProgresoRecurso.matricula, ProgresoRecurso.recurso_id, ProgresoRecurso.estado,
+        ProgresoRecurso.fecha_inicio, ProgresoRecurso.fecha_finalizacion, ProgresoRecurso.calificacion,
+        ProgresoRecurso.comentarios,
+    ).order_by(ProgresoRecurso.id)
+    if matricula:
+        consulta = consulta.where(ProgresoRecurso.matricula == matricula)
+    if recurso_id:
+        consulta = consulta.where(ProgresoRecurso.recurso_id == recurso_id)
+    return exportar("progreso", consulta, formato)
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 from typing import List, Optional
@@ -9,11 +9,20 @@ from ..models.reaccion_foro import ReaccionForo
 from ..schemas.foro import ForoCreate, Foro as ForoSchema, ForoUpdate
 from ..schemas.comentario_foro import ComentarioForoCreate, ComentarioForo as ComentarioForoSchema
 from ..schemas.reaccion_foro import ReaccionForoCreate, TipoReaccionEnum
+from ..utils.cache import cached, invalidate
+from ..utils.etag import conditional_get
 from ..utils.security import get_current_active_user
 from ..models.usuario import Usuario
 
 router = APIRouter()
 
+# Criterios de orden del listado; actividad y likes usan los índices ix_foro_*
+ORDENES = {
+    "recientes": (Foro.fecha_publicacion.desc(), Foro.id.desc()),
+    "actividad": (Foro.ultima_actividad.desc(), Foro.id.desc()),
+    "likes": (Foro.likes.desc(), Foro.id.desc()),
+}
+
 @router.post("/", response_model=ForoSchema, status_code=status.HTTP_201_CREATED)
 def create_foro(
     foro: ForoCreate,
@@ -33,6 +42,7 @@ def create_foro(
     try:
         db.add(db_foro)
         db.commit()
+        invalidate("foros")
         db.refresh(db_foro)
         return db_foro
     except IntegrityError:
@@ -42,17 +52,21 @@ def create_foro(
             detail="Error al crear el tema en el foro. Verifica que la materia exista."
         )
 
-@router.get("/", response_model=List[ForoSchema])
+@router.get("/", response_model=List[ForoSchema], dependencies=[Depends(conditional_get("foros"))])
+@cached("foros", List[ForoSchema])
 def read_foros(
     skip: int = 0, 
     limit: int = 100, 
     materia_id: Optional[int] = None,
     search: Optional[str] = None,
+    orden: str = Query("recientes", pattern="^(recientes|actividad|likes)$"),
     db: Session = Depends(get_db),
     current_user: Usuario = Depends(get_current_active_user)
 ):
     """
-    Obtiene la lista de temas en el foro con filtros opcionales.
+    Obtiene la lista de temas en el foro con filtros opcionales, con su número de
+    comentarios y última actividad. `orden`: recientes (publicación), actividad
+    (último comentario) o likes.
     """
     query = db.query(Foro)
     
@@ -66,9 +80,10 @@ def read_foros(
             (Foro.contenido.like(search))
         )
     
-    return query.order_by(Foro.fecha_publicacion.desc()).offset(skip).limit(limit).all()
+    return query.order_by(*ORDENES[orden]).offset(skip).limit(limit).all()
 
-@router.get("/{foro_id}", response_model=ForoSchema)
+@router.get("/{foro_id}", response_model=ForoSchema, dependencies=[Depends(conditional_get("foros"))])
+@cached("foros", ForoSchema)
 def read_foro(
     foro_id: int,
     db: Session = Depends(get_db),
@@ -115,6 +130,7 @@ def update_foro(
     
     try:
         db.commit()
+        invalidate("foros")
         db.refresh(db_foro)
         return db_foro
     except IntegrityError:
@@ -150,6 +166,7 @@ def delete_foro(
     try:
         db.delete(db_foro)
         db.commit()
+        invalidate("foros", "comentarios_foro")
         return None
     except IntegrityError:
         db.rollback()
@@ -220,6 +237,7 @@ def create_reaccion(
     
     try:
         db.commit()
+        invalidate("foros")
         return {"message": "Reacción registrada correctamente"}
     except IntegrityError:
         db.rollback()
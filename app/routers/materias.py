@@ -5,7 +5,11 @@ from typing import List, Optional
 
 from ..database import get_db
 from ..models.materia import Materia
+from ..models.semana_tema import SemanaTema
 from ..schemas.materia import MateriaCreate, Materia as MateriaSchema, MateriaUpdate
+from ..schemas.semana_tema import SemanaTema as SemanaTemaSchema
+from ..utils.cache import cached, invalidate
+from ..utils.etag import conditional_get
 from ..utils.security import get_current_active_user, get_admin_user
 from ..models.usuario import Usuario
 
@@ -29,6 +33,7 @@ def create_materia(
     try:
         db.add(db_materia)
         db.commit()
+        invalidate("materias")
         db.refresh(db_materia)
         return db_materia
     except IntegrityError:
@@ -38,7 +43,8 @@ def create_materia(
             detail="Error al crear la materia. Verifica que el semestre exista."
         )
 
-@router.get("/", response_model=List[MateriaSchema])
+@router.get("/", response_model=List[MateriaSchema], dependencies=[Depends(conditional_get("materias"))])
+@cached("materias", List[MateriaSchema])
 def read_materias(
     skip: int = 0, 
     limit: int = 100, 
@@ -64,7 +70,8 @@ def read_materias(
     
     return query.offset(skip).limit(limit).all()
 
-@router.get("/{materia_id}", response_model=MateriaSchema)
+@router.get("/{materia_id}", response_model=MateriaSchema, dependencies=[Depends(conditional_get("materias"))])
+@cached("materias", MateriaSchema)
 def read_materia(
     materia_id: int,
     db: Session = Depends(get_db),
@@ -104,6 +111,7 @@ def update_materia(
     
     try:
         db.commit()
+        invalidate("materias")
         db.refresh(db_materia)
         return db_materia
     except IntegrityError:
@@ -132,6 +140,7 @@ def delete_materia(
     try:
         db.delete(db_materia)
         db.commit()
+        invalidate("materias", "semanas_temas", "recursos", "foros", "comentarios_foro")
         return None
     except IntegrityError:
         db.rollback()
@@ -140,7 +149,8 @@ def delete_materia(
             detail="No se puede eliminar la materia porque tiene registros asociados"
         )
 
-@router.get("/{materia_id}/semanas", response_model=List)
+@router.get("/{materia_id}/semanas", response_model=List[SemanaTemaSchema], dependencies=[Depends(conditional_get("semanas_temas"))])
+@cached("semanas_temas", List[SemanaTemaSchema])
 def read_semanas_by_materia(
     materia_id: int,
     db: Session = Depends(get_db),
@@ -149,9 +159,6 @@ def read_semanas_by_materia(
     """
     Obtiene todas las semanas/temas de una materia.
     """
-    from ..models.semana_tema import SemanaTema
-    from ..schemas.semana_tema import SemanaTema as SemanaTemaSchema
-    
     db_materia = db.query(Materia).filter(Materia.id == materia_id).first()
     if db_materia is None:
         raise HTTPException(
@@ -1,6 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, status, BackgroundTasks
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session, joinedload
 from typing import List, Optional, Dict, Any
+from datetime import datetime
 import uuid
 import logging
 import traceback
@@ -15,8 +17,12 @@ from app.schemas.mensaje_chatbot import (
     MensajeChatbotWithUsuario,
     Conversacion,
     ConversacionWithMensajes,
+    ContextoMensaje,
 )
-from app.utils.chatbot import get_chatbot_response, ChatbotException, update_conversation, get_conversation_history
+from app.utils.archivo_chat import leer_archivo
+from app.utils.chatbot import get_chatbot_response, ChatbotException, update_conversation, get_conversation_history, reconstruir_contexto
+from app.utils.llm_scheduler import LLMQueueFull
+from app.utils.paginacion import codificar_cursor, decodificar_cursor
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -28,15 +34,8 @@ router = APIRouter(
     responses={404: {"description": "No encontrado"}},
 )
 
-# Función auxiliar para convertir objetos ORM a modelos Pydantic
-def orm_to_pydantic(orm_obj, pydantic_model):
-    obj_dict = {c.name: getattr(orm_obj, c.name) for c in orm_obj.__table__.columns}
-
-    if pydantic_model == MensajeChatbotWithUsuario and hasattr(orm_obj, "usuario") and orm_obj.usuario:
-        from app.schemas.usuario import Usuario
-        obj_dict["usuario"] = orm_to_pydantic(orm_obj.usuario, Usuario)
-
-    return pydantic_model(**obj_dict)
+# Los endpoints devuelven los objetos ORM directamente: FastAPI los valida una sola
+# vez contra el response_model (from_attributes) y ORJSONResponse los serializa.
 
 @router.post("/conversar", response_model=MensajeChatbot, status_code=status.HTTP_201_CREATED)
 async def conversar_chatbot(mensaje: MensajeChatbotCreate, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
@@ -82,18 +81,26 @@ async def conversar_chatbot(mensaje: MensajeChatbotCreate, background_tasks: Bac
         db.refresh(db_mensaje)
         logger.info(f"Mensaje guardado con ID: {db_mensaje.id}")
         
-        # Actualizar la conversación en segundo plano
-        background_tasks.add_task(
-            update_conversation,
-            session_id,
-            mensaje.matricula,
-            mensaje.mensaje,
-            chatbot_response,
-            db
+        # Actualizar la conversación en segundo plano (no con respuestas degradadas)
+        if not metadatos.get("degradado"):
+            background_tasks.add_task(
+                update_conversation,
+                session_id,
+                mensaje.matricula,
+                mensaje.mensaje,
+                chatbot_response,
+                db
+            )
+
+        return db_mensaje
+
+    except LLMQueueFull as e:
+        logger.warning(f"Cola del LLM llena, se rechaza /conversar: {e.message}")
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=e.message,
+            headers={"Retry-After": e.retry_after_header}
         )
-
-        return orm_to_pydantic(db_mensaje, MensajeChatbot)
-
     except ChatbotException as e:
         logger.error(f"ChatbotException en conversar_chatbot: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -111,48 +118,103 @@ def get_conversaciones(matricula: Optional[str] = None, skip: int = 0, limit: in
         query = query.filter(ConversacionModel.matricula == matricula)
     
     conversaciones = query.order_by(ConversacionModel.fecha_ultima_actividad.desc()).offset(skip).limit(limit).all()
-    return [orm_to_pydantic(conv, Conversacion) for conv in conversaciones]
+    return conversaciones
 
 @router.get("/conversaciones/{session_id}", response_model=ConversacionWithMensajes)
-def get_conversacion_by_id(session_id: str, db: Session = Depends(get_db)):
-    """Obtiene una conversación completa con todos sus mensajes."""
+def get_conversacion_by_id(
+    session_id: str,
+    limit: int = Query(50, ge=1, le=200),
+    antes: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Obtiene una conversación con sus mensajes más recientes (en orden cronológico).
+    Para cargar los anteriores se repite la petición con `antes=cursor_anteriores`.
+    """
     conversacion = db.query(ConversacionModel).filter(ConversacionModel.session_id == session_id).first()
     
     if not conversacion:
         raise HTTPException(status_code=404, detail="Conversación no encontrada")
+
+    try:
+        cursor = decodificar_cursor(antes) if antes else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
-    # Obtener todos los mensajes de la conversación
-    mensajes = db.query(MensajeChatbotModel).filter(
-        MensajeChatbotModel.session_id == session_id
-    ).order_by(MensajeChatbotModel.fecha.asc()).all()
-    
-    # Construir el resultado
-    result = orm_to_pydantic(conversacion, Conversacion)
-    result_dict = result.dict()
-    result_dict["mensajes"] = [orm_to_pydantic(m, MensajeChatbot) for m in mensajes]
+    # Página por clave sobre el índice (session_id, fecha, id), de la más reciente hacia atrás;
+    # se pide una fila de más para saber si quedan mensajes anteriores
+    query = db.query(MensajeChatbotModel).filter(MensajeChatbotModel.session_id == session_id)
+    if cursor:
+        fecha, mensaje_id = cursor
+        query = query.filter(or_(
+            MensajeChatbotModel.fecha < fecha,
+            and_(MensajeChatbotModel.fecha == fecha, MensajeChatbotModel.id < mensaje_id)
+        ))
+    mensajes = query.order_by(
+        MensajeChatbotModel.fecha.desc(), MensajeChatbotModel.id.desc()
+    ).limit(limit + 1).all()
+
+    if len(mensajes) <= limit:
+        # Las sesiones antiguas pueden estar archivadas (total o parcialmente, si se retomaron)
+        archivados = leer_archivo(db, session_id)
+        if archivados:
+            # Los mensajes archivados son anteriores a los que siguen en la tabla
+            for archivado in reversed(archivados):
+                archivado["fecha"] = datetime.fromisoformat(archivado["fecha"]) if archivado["fecha"] else datetime.min
+                if cursor is None or (archivado["fecha"], archivado["id"]) < cursor:
+                    mensajes.append(archivado)
+                if len(mensajes) > limit:
+                    break
+
+    pagina = mensajes[:limit]
+    cursor_anteriores = None
+    if len(mensajes) > limit:
+        ultimo = pagina[-1]
+        cursor_anteriores = codificar_cursor(*(
+            (ultimo["fecha"], ultimo["id"]) if isinstance(ultimo, dict) else (ultimo.fecha, ultimo.id)
+        ))
+    pagina.reverse()
     
-    return ConversacionWithMensajes(**result_dict)
+    # Construir el resultado; los mensajes se validan directamente desde el ORM
+    return {
+        **Conversacion.model_validate(conversacion).model_dump(),
+        "mensajes": pagina,
+        "cursor_anteriores": cursor_anteriores
+    }
 
 @router.get("/", response_model=List[MensajeChatbotWithUsuario])
 def read_mensajes_chatbot(skip: int = 0, limit: int = 100, matricula: str = None, session_id: str = None, db: Session = Depends(get_db)):
     """Obtiene todos los mensajes de chatbot, filtrando opcionalmente por matrícula o session_id."""
-    query = db.query(MensajeChatbotModel)
+    # El usuario se carga en la misma consulta para no emitir una consulta extra por mensaje
+    query = db.query(MensajeChatbotModel).options(joinedload(MensajeChatbotModel.usuario))
     if matricula:
         query = query.filter(MensajeChatbotModel.matricula == matricula)
     if session_id:
         query = query.filter(MensajeChatbotModel.session_id == session_id)
 
     mensajes = query.order_by(MensajeChatbotModel.fecha.desc()).offset(skip).limit(limit).all()
-    return [orm_to_pydantic(mensaje, MensajeChatbotWithUsuario) for mensaje in mensajes]
+    return mensajes
 
 @router.get("/{mensaje_id}", response_model=MensajeChatbotWithUsuario)
 def read_mensaje_chatbot(mensaje_id: int, db: Session = Depends(get_db)):
     """Obtiene un mensaje de chatbot por su ID."""
+    db_mensaje = db.query(MensajeChatbotModel).options(
+        joinedload(MensajeChatbotModel.usuario)
+    ).filter(MensajeChatbotModel.id == mensaje_id).first()
+    if db_mensaje is None:
+        raise HTTPException(status_code=404, detail="Mensaje no encontrado")
+
+    return db_mensaje
+
+@router.get("/{mensaje_id}/contexto", response_model=ContextoMensaje)
+def read_contexto_mensaje(mensaje_id: int, db: Session = Depends(get_db)):
+    """Reconstruye el historial de conversación con el que se generó la respuesta de un mensaje."""
     db_mensaje = db.query(MensajeChatbotModel).filter(MensajeChatbotModel.id == mensaje_id).first()
     if db_mensaje is None:
         raise HTTPException(status_code=404, detail="Mensaje no encontrado")
 
-    return orm_to_pydantic(db_mensaje, MensajeChatbotWithUsuario)
+    contexto, ids = reconstruir_contexto(db_mensaje, db)
+    return {"mensaje_id": db_mensaje.id, "session_id": db_mensaje.session_id, "contexto": contexto, "mensajes_ids": ids}
 
 @router.delete("/{mensaje_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_mensaje_chatbot(mensaje_id: int, db: Session = Depends(get_db)):
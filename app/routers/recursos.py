@@ -4,8 +4,10 @@ from sqlalchemy.exc import IntegrityError
 from typing import List, Optional
 
 from ..database import get_db
-from ..models.recurso import Recurso
-from ..schemas.recurso import RecursoCreate, Recurso as RecursoSchema, RecursoUpdate, TipoRecursoEnum
+from ..models.recurso import Recurso, resumen_options
+from ..schemas.recurso import RecursoCreate, Recurso as RecursoSchema, RecursoResumen, RecursoUpdate, TipoRecursoEnum
+from ..utils.cache import cached, invalidate
+from ..utils.etag import conditional_get
 from ..utils.security import get_current_active_user, get_admin_user
 from ..models.usuario import Usuario
 
@@ -31,6 +33,7 @@ def create_recurso(
     try:
         db.add(db_recurso)
         db.commit()
+        invalidate("recursos")
         db.refresh(db_recurso)
         return db_recurso
     except IntegrityError:
@@ -40,7 +43,8 @@ def create_recurso(
             detail="Error al crear el recurso. Verifica que la semana/tema y el cuestionario (si aplica) existan."
         )
 
-@router.get("/", response_model=List[RecursoSchema])
+@router.get("/", response_model=List[RecursoResumen], dependencies=[Depends(conditional_get("recursos"))])
+@cached("recursos", List[RecursoResumen])
 def read_recursos(
     skip: int = 0, 
     limit: int = 100, 
@@ -51,8 +55,9 @@ def read_recursos(
 ):
     """
     Obtiene la lista de recursos con filtros opcionales.
+    Devuelve resúmenes; el contenido completo de una lectura se obtiene por su ID.
     """
-    query = db.query(Recurso)
+    query = db.query(Recurso).options(*resumen_options())
     
     if semana_tema_id:
         query = query.filter(Recurso.semana_tema_id == semana_tema_id)
@@ -62,7 +67,8 @@ def read_recursos(
     
     return query.offset(skip).limit(limit).all()
 
-@router.get("/{recurso_id}", response_model=RecursoSchema)
+@router.get("/{recurso_id}", response_model=RecursoSchema, dependencies=[Depends(conditional_get("recursos"))])
+@cached("recursos", RecursoSchema)
 def read_recurso(
     recurso_id: int,
     db: Session = Depends(get_db),
@@ -102,6 +108,7 @@ def update_recurso(
     
     try:
         db.commit()
+        invalidate("recursos")
         db.refresh(db_recurso)
         return db_recurso
     except IntegrityError:
@@ -130,6 +137,7 @@ def delete_recurso(
     try:
         db.delete(db_recurso)
         db.commit()
+        invalidate("recursos")
         return None
     except IntegrityError:
         db.rollback()
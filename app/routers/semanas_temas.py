@@ -5,7 +5,11 @@ from typing import List, Optional
 
 from ..database import get_db
 from ..models.semana_tema import SemanaTema
+from ..models.recurso import Recurso, resumen_options
 from ..schemas.semana_tema import SemanaTemaCreate, SemanaTema as SemanaTemaSchema, SemanaTemaUpdate
+from ..schemas.recurso import RecursoResumen
+from ..utils.cache import cached, invalidate
+from ..utils.etag import conditional_get
 from ..utils.security import get_current_active_user, get_admin_user
 from ..models.usuario import Usuario
 
@@ -29,6 +33,7 @@ def create_semana_tema(
     try:
         db.add(db_semana_tema)
         db.commit()
+        invalidate("semanas_temas")
         db.refresh(db_semana_tema)
         return db_semana_tema
     except IntegrityError:
@@ -38,7 +43,8 @@ def create_semana_tema(
             detail="Error al crear la semana/tema. Verifica que la materia exista y que no haya duplicados."
         )
 
-@router.get("/", response_model=List[SemanaTemaSchema])
+@router.get("/", response_model=List[SemanaTemaSchema], dependencies=[Depends(conditional_get("semanas_temas"))])
+@cached("semanas_temas", List[SemanaTemaSchema])
 def read_semanas_temas(
     skip: int = 0, 
     limit: int = 100, 
@@ -56,7 +62,8 @@ def read_semanas_temas(
     
     return query.order_by(SemanaTema.materia_id, SemanaTema.numero_semana).offset(skip).limit(limit).all()
 
-@router.get("/{semana_tema_id}", response_model=SemanaTemaSchema)
+@router.get("/{semana_tema_id}", response_model=SemanaTemaSchema, dependencies=[Depends(conditional_get("semanas_temas"))])
+@cached("semanas_temas", SemanaTemaSchema)
 def read_semana_tema(
     semana_tema_id: int,
     db: Session = Depends(get_db),
@@ -96,6 +103,7 @@ def update_semana_tema(
     
     try:
         db.commit()
+        invalidate("semanas_temas")
         db.refresh(db_semana_tema)
         return db_semana_tema
     except IntegrityError:
@@ -124,6 +132,7 @@ def delete_semana_tema(
     try:
         db.delete(db_semana_tema)
         db.commit()
+        invalidate("semanas_temas", "recursos")
         return None
     except IntegrityError:
         db.rollback()
@@ -132,18 +141,16 @@ def delete_semana_tema(
             detail="No se puede eliminar la semana/tema porque tiene registros asociados"
         )
 
-@router.get("/{semana_tema_id}/recursos", response_model=List)
+@router.get("/{semana_tema_id}/recursos", response_model=List[RecursoResumen], dependencies=[Depends(conditional_get("recursos"))])
+@cached("recursos", List[RecursoResumen])
 def read_recursos_by_semana_tema(
     semana_tema_id: int,
     db: Session = Depends(get_db),
     current_user: Usuario = Depends(get_current_active_user)
 ):
     """
-    Obtiene todos los recursos de una semana/tema.
+    Obtiene todos los recursos de una semana/tema (resúmenes, sin el contenido completo de las lecturas).
     """
-    from ..models.recurso import Recurso
-    from ..schemas.recurso import Recurso as RecursoSchema
-    
     db_semana_tema = db.query(SemanaTema).filter(SemanaTema.id == semana_tema_id).first()
     if db_semana_tema is None:
         raise HTTPException(
@@ -151,5 +158,5 @@ def read_recursos_by_semana_tema(
             detail="Semana/tema no encontrado"
         )
     
-    recursos = db.query(Recurso).filter(Recurso.semana_tema_id == semana_tema_id).all()
+    recursos = db.query(Recurso).options(*resumen_options()).filter(Recurso.semana_tema_id == semana_tema_id).all()
     return recursos
\ No newline at end of file
@@ -6,6 +6,8 @@ from typing import List
 from ..database import get_db
 from ..models.semestre import Semestre
 from ..schemas.semestre import SemestreCreate, Semestre as SemestreSchema, SemestreUpdate
+from ..utils.cache import cached, invalidate
+from ..utils.etag import conditional_get
 from ..utils.security import get_admin_user
 
 router = APIRouter()
@@ -24,6 +26,7 @@ def create_semestre(
     try:
         db.add(db_semestre)
         db.commit()
+        invalidate("semestres")
         db.refresh(db_semestre)
         return db_semestre
     except IntegrityError:
@@ -33,14 +36,16 @@ def create_semestre(
             detail="Ya existe un semestre con ese nombre"
         )
 
-@router.get("/", response_model=List[SemestreSchema])
+@router.get("/", response_model=List[SemestreSchema], dependencies=[Depends(conditional_get("semestres", publico=True))])
+@cached("semestres", List[SemestreSchema])
 def read_semestres(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
     """
     Obtiene la lista de semestres.
     """
     return db.query(Semestre).offset(skip).limit(limit).all()
 
-@router.get("/{semestre_id}", response_model=SemestreSchema)
+@router.get("/{semestre_id}", response_model=SemestreSchema, dependencies=[Depends(conditional_get("semestres", publico=True))])
+@cached("semestres", SemestreSchema)
 def read_semestre(semestre_id: int, db: Session = Depends(get_db)):
     """
     Obtiene un semestre por su ID.
@@ -76,6 +81,7 @@ def update_semestre(
     
     try:
         db.commit()
+        invalidate("semestres")
         db.refresh(db_semestre)
         return db_semestre
     except IntegrityError:
@@ -104,6 +110,7 @@ def delete_semestre(
     try:
         db.delete(db_semestre)
         db.commit()
+        invalidate("semestres", "materias", "semanas_temas", "recursos", "foros", "comentarios_foro")
         return None
     except IntegrityError:
         db.rollback()
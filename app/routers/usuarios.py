@@ -1,4 +1,6 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from dataclasses import asdict
+
+from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
@@ -6,8 +8,14 @@ from typing import List, Optional
 from datetime import timedelta
 
 from ..database import get_db
+from ..models.comentario_foro import ComentarioForo
+from ..models.foro import Foro
 from ..models.usuario import Usuario, RolEnum
-from ..schemas.usuario import UsuarioCreate, UsuarioResponse, UsuarioUpdate, Token
+from ..schemas.usuario import UsuarioCreate, UsuarioResponse, UsuarioUpdate, Token, ResultadoInscripcion
+from ..utils.cache import invalidate
+from ..utils.contadores_foro import recalcular
+from ..utils.inscripcion import inscribir_csv
+from ..utils.integridad import campo_en_conflicto
 from ..utils.security import (
     get_password_hash, 
     verify_password, 
@@ -20,6 +28,14 @@ from ..utils.security import (
 
 router = APIRouter()
 
+# Mensaje de error según el campo que viola una restricción al registrar
+ERRORES_REGISTRO = {
+    "matricula": "La matrícula ya está registrada",
+    "correo": "El correo ya está registrado",
+    "semestre": "Error al crear el usuario. Verifica que el semestre exista.",
+    None: "Error al crear el usuario. Verifica que el semestre exista.",
+}
+
 @router.post("/", response_model=UsuarioResponse, status_code=status.HTTP_201_CREATED)
 def create_usuario(usuario: UsuarioCreate, db: Session = Depends(get_db)):
     """
@@ -28,22 +44,6 @@ def create_usuario(usuario: UsuarioCreate, db: Session = Depends(get_db)):
     # La matrícula ya viene en minúsculas gracias al validador
     matricula = normalize_matricula(usuario.matricula)
     
-    # Verificar si la matrícula ya existe
-    db_usuario = db.query(Usuario).filter(Usuario.matricula == matricula).first()
-    if db_usuario:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="La matrícula ya está registrada"
-        )
-    
-    # Verificar si el correo ya existe
-    db_usuario = db.query(Usuario).filter(Usuario.correo == usuario.correo).first()
-    if db_usuario:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="El correo ya está registrado"
-        )
-    
     # Crear el usuario
     hashed_password = get_password_hash(usuario.contrasena)
     db_usuario = Usuario(
@@ -57,18 +57,38 @@ def create_usuario(usuario: UsuarioCreate, db: Session = Depends(get_db)):
         semestre_id=usuario.semestre_id
     )
     
+    # Un único INSERT: los índices únicos de matrícula y correo detectan los
+    # duplicados (también entre peticiones concurrentes) y el error se traduce al campo
     try:
         db.add(db_usuario)
         db.commit()
         db.refresh(db_usuario)
         return db_usuario
-    except IntegrityError:
+    except IntegrityError as e:
         db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Error al crear el usuario. Verifica que el semestre exista."
+            detail=ERRORES_REGISTRO[campo_en_conflicto(e, ("matricula", "correo", "semestre"))]
         )
 
+@router.post("/importar", response_model=ResultadoInscripcion)
+def importar_usuarios(
+    archivo: UploadFile = File(...),
+    current_user: Usuario = Depends(get_admin_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Inscribe estudiantes desde un CSV (solo administradores).
+    Columnas: matricula, nombre, apellido_paterno, apellido_materno, correo,
+    contrasena y, opcionalmente, semestre_id. Las filas con errores se informan
+    y no impiden crear las demás.
+    """
+    try:
+        resultado = inscribir_csv(db, archivo.file.read())
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return asdict(resultado)
+
 @router.get("/", response_model=List[UsuarioResponse])
 def read_usuarios(
     skip: int = 0, 
@@ -195,8 +215,19 @@ def delete_usuario(
             detail="Usuario no encontrado"
         )
     
+    # Temas de otros usuarios que pierden comentarios con la eliminación en cascada
+    foro_ids = [
+        foro_id for (foro_id,) in db.query(ComentarioForo.foro_id).join(Foro)
+        .filter(ComentarioForo.matricula == matricula, Foro.matricula != matricula)
+        .distinct()
+    ]
+    
     db.delete(db_usuario)
+    db.flush()
+    recalcular(db, foro_ids)
     db.commit()
+    # Los temas y comentarios del usuario se eliminan en cascada
+    invalidate("foros", "comentarios_foro")
     return None
 
 @router.post("/login", response_model=Token)
@@ -6,10 +6,11 @@ from .semana_tema import SemanaTema, SemanaTemaCreate, SemanaTemaUpdate, SemanaT
 from .cuestionario import Cuestionario, CuestionarioCreate, CuestionarioUpdate, CuestionarioInDB
 from .pregunta import Pregunta, PreguntaCreate, PreguntaUpdate, PreguntaInDB
 from .opcion import Opcion, OpcionCreate, OpcionUpdate, OpcionInDB
-from .recurso import Recurso, RecursoCreate, RecursoUpdate, RecursoInDB, TipoRecursoEnum
+from .recurso import Recurso, RecursoCreate, RecursoUpdate, RecursoInDB, RecursoResumen, TipoRecursoEnum
 from .progreso_recurso import ProgresoRecurso, ProgresoRecursoCreate, ProgresoRecursoUpdate, ProgresoRecursoInDB, EstadoProgresoEnum
 from .foro import Foro, ForoCreate, ForoUpdate, ForoInDB
 from .comentario_foro import ComentarioForo, ComentarioForoCreate, ComentarioForoUpdate, ComentarioForoInDB
 from .reaccion_foro import ReaccionForo, ReaccionForoCreate, ReaccionForoUpdate, ReaccionForoInDB, TipoReaccionEnum
+from .catalogo import SemestreCatalogo, MateriaCatalogo, SemanaTemaCatalogo, RecursoCatalogo
 from app.schemas.mensaje_chatbot import MensajeChatbot, MensajeChatbotCreate, MensajeChatbotUpdate
 from app.schemas.mensaje_chatbot import MensajeChatbotWithUsuario
\ No newline at end of file
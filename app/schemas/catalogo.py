@@ -0,0 +1,28 @@
+from pydantic import BaseModel
+from typing import Optional, List
+
+from .recurso import TipoRecursoEnum
+
+# Esquemas del árbol del catálogo (solo metadatos, sin contenido de lecturas)
+class RecursoCatalogo(BaseModel):
+    id: int
+    tipo: TipoRecursoEnum
+    url_video: Optional[str] = None
+    cuestionario_id: Optional[int] = None
+
+class SemanaTemaCatalogo(BaseModel):
+    id: int
+    numero_semana: int
+    tema: str
+    recursos: List[RecursoCatalogo] = []
+
+class MateriaCatalogo(BaseModel):
+    id: int
+    nombre: str
+    descripcion: Optional[str] = None
+    semanas_temas: List[SemanaTemaCatalogo] = []
+
+class SemestreCatalogo(BaseModel):
+    id: int
+    nombre: str
+    materias: List[MateriaCatalogo] = []
@@ -20,6 +20,8 @@ class ForoInDB(ForoBase):
     fecha_publicacion: datetime
     likes: int
     dislikes: int
+    num_comentarios: int = 0
+    ultima_actividad: Optional[datetime] = None
     
     class Config:
         orm_mode = True
@@ -8,7 +8,6 @@ class MensajeChatbotBase(BaseModel):
     session_id: Optional[str] = None
     mensaje: str
     respuesta: Optional[str] = None
-    contexto: Optional[str] = None
     metadatos: Optional[Dict[str, Any]] = None  # Cambiado de metadata a metadatos
 
 class MensajeChatbotCreate(BaseModel):
@@ -19,7 +18,6 @@ class MensajeChatbotCreate(BaseModel):
 
 class MensajeChatbotUpdate(BaseModel):
     respuesta: Optional[str] = None
-    contexto: Optional[str] = None
     metadatos: Optional[Dict[str, Any]] = None  # Cambiado de metadata a metadatos
 
 class MensajeChatbot(MensajeChatbotBase):
@@ -61,9 +59,17 @@ class Conversacion(ConversacionBase):
 
 class ConversacionWithMensajes(Conversacion):
     mensajes: List[MensajeChatbot] = []
+    # Cursor para cargar los mensajes anteriores a los de esta página (None si no hay más)
+    cursor_anteriores: Optional[str] = None
     
     model_config = ConfigDict(from_attributes=True)
 
+class ContextoMensaje(BaseModel):
+    mensaje_id: int
+    session_id: str
+    contexto: str
+    mensajes_ids: List[int] = []
+
 # Opcional: Esquema para respuestas con metadatos
 class ChatbotResponse(BaseModel):
     respuesta: str
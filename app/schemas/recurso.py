@@ -48,4 +48,17 @@ class RecursoInDB(RecursoBase):
         orm_mode = True
 
 class Recurso(RecursoInDB):
-    pass
\ No newline at end of file
+    pass
+
+# Esquema ligero para listados: sin el contenido completo de la lectura
+class RecursoResumen(BaseModel):
+    id: int
+    semana_tema_id: int
+    tipo: TipoRecursoEnum
+    url_video: Optional[str] = None
+    cuestionario_id: Optional[int] = None
+    extracto_lectura: Optional[str] = None
+    longitud_lectura: Optional[int] = None  # Longitud reportada por la base de datos (bytes en MySQL)
+
+    class Config:
+        orm_mode = True
@@ -77,6 +77,18 @@ class UsuarioLogin(BaseModel):
             raise ValueError('La matrícula debe comenzar con "ti" seguido de 5 dígitos (ejemplo: ti43806)')
         return v.lower()  # Convertir a minúsculas
 
+# Esquemas para la inscripción masiva por CSV
+class ErrorFilaInscripcion(BaseModel):
+    fila: int
+    campo: Optional[str] = None
+    detalle: str
+    matricula: Optional[str] = None
+
+class ResultadoInscripcion(BaseModel):
+    total: int
+    creados: int
+    errores: List[ErrorFilaInscripcion] = []
+
 # Esquema para token de autenticación
 class Token(BaseModel):
     access_token: str
@@ -0,0 +1,137 @@
+"""
+Archivado de sesiones de chat antiguas.
+
+Los mensajes de las sesiones sin actividad desde hace CHAT_ARCHIVE_AFTER_DAYS se
+mueven de mensaje_chatbot a conversacion_archivada como un único JSON comprimido
+con zlib por sesión, de modo que la tabla caliente (y sus índices) solo contiene
+conversaciones recientes. El registro de ConversacionChatbot (título, resumen y
+temas) se conserva. Los archivos con más de CHAT_ARCHIVE_RETENTION_DAYS se
+eliminan (0 = conservar siempre).
+"""
+import json
+import logging
+import zlib
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session
+
+from app.config import CHAT_ARCHIVE_AFTER_DAYS, CHAT_ARCHIVE_BATCH, CHAT_ARCHIVE_RETENTION_DAYS
+from app.models.mensaje_chatbot import ConversacionArchivada, MensajeChatbot
+
+logger = logging.getLogger(__name__)
+
+NIVEL_COMPRESION = 9
+
+@dataclass
+class ResultadoArchivado:
+    sesiones: int = 0
+    mensajes: int = 0
+    bytes_originales: int = 0
+    bytes_comprimidos: int = 0
+    archivos_eliminados: int = 0
+
+def _mensaje_a_dict(mensaje: MensajeChatbot) -> Dict[str, Any]:
+    return {
+        "id": mensaje.id,
+        "matricula": mensaje.matricula,
+        "session_id": mensaje.session_id,
+        "mensaje": mensaje.mensaje,
+        "respuesta": mensaje.respuesta,
+        "fecha": mensaje.fecha.isoformat() if mensaje.fecha else None,
+        "metadatos": mensaje.metadatos,
+    }
+
+def serializar(mensajes: List[Dict[str, Any]]) -> bytes:
+    return json.dumps(mensajes, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def descomprimir(datos: bytes) -> List[Dict[str, Any]]:
+    return json.loads(zlib.decompress(datos).decode("utf-8"))
+
+def leer_archivo(db: Session, session_id: str) -> Optional[List[Dict[str, Any]]]:
+    """Mensajes archivados de una sesión en orden cronológico, o None si no está archivada."""
+    archivo = db.scalar(select(ConversacionArchivada).where(ConversacionArchivada.session_id == session_id))
+    if archivo is None:
+        return None
+    return descomprimir(archivo.datos)
+
+def sesiones_inactivas(db: Session, corte: datetime, limite: int) -> List[str]:
+    """Sesiones cuyo último mensaje es anterior a `corte`."""
+    return list(db.scalars(
+        select(MensajeChatbot.session_id)
+        .group_by(MensajeChatbot.session_id)
+        .having(func.max(MensajeChatbot.fecha) < corte)
+        .limit(limite)
+    ))
+
+def _archivar_sesion(db: Session, session_id: str, resultado: ResultadoArchivado) -> None:
+    mensajes = db.scalars(
+        select(MensajeChatbot)
+        .where(MensajeChatbot.session_id == session_id)
+        .order_by(MensajeChatbot.fecha.asc(), MensajeChatbot.id.asc())
+    ).all()
+    if not mensajes:
+        return
+    filas = [_mensaje_a_dict(m) for m in mensajes]
+
+    archivo = db.scalar(select(ConversacionArchivada).where(ConversacionArchivada.session_id == session_id))
+    if archivo is None:
+        archivo = ConversacionArchivada(session_id=session_id, matricula=mensajes[0].matricula)
+        db.add(archivo)
+    else:
+        # La sesión se retomó después de archivarse: se añaden los mensajes nuevos
+        filas = descomprimir(archivo.datos) + filas
+        resultado.bytes_originales -= archivo.tamano_original
+        resultado.bytes_comprimidos -= len(archivo.datos)
+
+    original = serializar(filas)
+    datos = zlib.compress(original, NIVEL_COMPRESION)
+    archivo.num_mensajes = len(filas)
+    archivo.fecha_primer_mensaje = datetime.fromisoformat(filas[0]["fecha"]) if filas[0]["fecha"] else None
+    archivo.fecha_ultimo_mensaje = mensajes[-1].fecha
+    archivo.fecha_archivado = datetime.now()
+    archivo.tamano_original = len(original)
+    archivo.datos = datos
+
+    # Solo se borran los mensajes leídos: uno que llegue mientras tanto queda para la siguiente ejecución
+    db.execute(delete(MensajeChatbot).where(MensajeChatbot.id.in_([m.id for m in mensajes])))
+
+    resultado.sesiones += 1
+    resultado.mensajes += len(mensajes)
+    resultado.bytes_originales += archivo.tamano_original
+    resultado.bytes_comprimidos += len(datos)
+
+def archivar_sesiones(
+    db: Session,
+    antiguedad_dias: int = CHAT_ARCHIVE_AFTER_DAYS,
+    lote: int = CHAT_ARCHIVE_BATCH,
+    max_sesiones: Optional[int] = None,
+) -> ResultadoArchivado:
+    """Archiva las sesiones inactivas por lotes, con un commit por lote."""
+    resultado = ResultadoArchivado()
+    corte = datetime.now() - timedelta(days=antiguedad_dias)
+    while max_sesiones is None or resultado.sesiones < max_sesiones:
+        limite = lote if max_sesiones is None else min(lote, max_sesiones - resultado.sesiones)
+        sesiones = sesiones_inactivas(db, corte, limite)
+        if not sesiones:
+            break
+        for session_id in sesiones:
+            _archivar_sesion(db, session_id, resultado)
+        db.commit()
+        logger.info(f"Archivadas {resultado.sesiones} sesiones ({resultado.mensajes} mensajes)")
+    return resultado
+
+def aplicar_retencion(db: Session, dias: int = CHAT_ARCHIVE_RETENTION_DAYS) -> int:
+    """Elimina los archivos cuya última actividad supera la retención. Devuelve cuántos se borraron."""
+    if dias <= 0:
+        return 0
+    corte = datetime.now() - timedelta(days=dias)
+    eliminados = db.execute(
+        delete(ConversacionArchivada).where(ConversacionArchivada.fecha_ultimo_mensaje < corte)
+    ).rowcount
+    db.commit()
+    if eliminados:
+        logger.info(f"Eliminados {eliminados} archivos de chat con más de {dias} días")
+    return eliminados
@@ -0,0 +1,238 @@
+import functools
+import hashlib
+import inspect
+import logging
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+
+from ..config import (
+    CACHE_BACKEND, CACHE_MAX_ENTRIES, CACHE_REDIS_URL, CACHE_TTL_SECONDS,
+    CACHE_VOLATILE_NAMESPACES, CACHE_VOLATILE_TTL_SECONDS,
+)
+from .etag import bump_version
+from .metrics import registry
+
+logger = logging.getLogger(__name__)
+
+class MemoryCacheBackend:
+    """Caché LRU en memoria del proceso con expiración por entrada."""
+
+    # Las invalidaciones no llegan a los demás workers
+    compartido = False
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        # Las generaciones se guardan aparte para que el LRU nunca las desaloje
+        self._generations: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes, ttl: int) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_generation(self, namespace: str) -> int:
+        return self._generations[namespace]
+
+    def incr_generation(self, namespace: str) -> int:
+        with self._lock:
+            self._generations[namespace] += 1
+            # Las entradas de generaciones anteriores ya no se leerán; se liberan ya
+            prefix = f"cache:{namespace}:"
+            for key in [k for k in self._entries if k.startswith(prefix)]:
+                del self._entries[key]
+            return self._generations[namespace]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._generations.clear()
+
+class RedisCacheBackend:
+    """
+    Caché compartida entre procesos sobre cualquier cliente compatible con Redis
+    (get/set con `ex`/incr). Se puede inyectar un cliente local en su lugar.
+    """
+
+    compartido = True
+
+    def __init__(self, client: Any = None, url: Optional[str] = None):
+        if client is None:
+            import redis  # Dependencia opcional, solo necesaria con CACHE_BACKEND=redis
+            client = redis.Redis.from_url(url)
+        self.client = client
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.client.get(key)
+
+    def set(self, key: str, value: bytes, ttl: int) -> None:
+        self.client.set(key, value, ex=ttl)
+
+    def get_generation(self, namespace: str) -> int:
+        value = self.client.get(f"cache-gen:{namespace}")
+        return int(value) if value is not None else 0
+
+    def incr_generation(self, namespace: str) -> int:
+        return int(self.client.incr(f"cache-gen:{namespace}"))
+
+    def clear(self) -> None:
+        pass
+
+def _create_backend():
+    if CACHE_BACKEND == "redis":
+        try:
+            return RedisCacheBackend(url=CACHE_REDIS_URL)
+        except ImportError:
+            logger.warning("CACHE_BACKEND=redis pero el paquete 'redis' no está instalado; se usa caché en memoria")
+    return MemoryCacheBackend(max_entries=CACHE_MAX_ENTRIES)
+
+_backend = _create_backend()
+_hooks: List[Callable[[Tuple[str, ...]], None]] = []
+
+# Contadores de aciertos y fallos por espacio de nombres
+stats: Dict[str, Dict[str, int]] = defaultdict(lambda: {"hits": 0, "misses": 0})
+
+def _metrics_collector():
+    snapshot = {ns: dict(v) for ns, v in list(stats.items())}
+    yield ("cache_hits_total", "counter", "Aciertos de la caché de respuestas",
+           [({"namespace": ns}, v["hits"]) for ns, v in snapshot.items()])
+    yield ("cache_misses_total", "counter", "Fallos de la caché de respuestas",
+           [({"namespace": ns}, v["misses"]) for ns, v in snapshot.items()])
+    yield ("cache_hit_ratio", "gauge", "Proporción de aciertos de la caché de respuestas",
+           [({"namespace": ns}, v["hits"] / (v["hits"] + v["misses"])) for ns, v in snapshot.items() if v["hits"] + v["misses"]])
+
+registry.register_collector(_metrics_collector)
+
+def get_backend():
+    return _backend
+
+def set_backend(backend) -> None:
+    """Reemplaza el backend de caché (por ejemplo, por un cliente Redis local en pruebas)."""
+    global _backend
+    _backend = backend
+
+def ttl_efectivo(namespace: str, ttl: float) -> float:
+    """
+    Tiempo máximo que una respuesta (o un ETag) de `namespace` puede seguir siendo
+    válida. Con un backend local, los espacios volátiles se acotan a
+    CACHE_VOLATILE_TTL_SECONDS porque las escrituras de otros workers no los invalidan.
+    """
+    if namespace in CACHE_VOLATILE_NAMESPACES and not getattr(_backend, "compartido", False):
+        return min(ttl, CACHE_VOLATILE_TTL_SECONDS)
+    return ttl
+
+def register_invalidation_hook(hook: Callable[[Tuple[str, ...]], None]) -> None:
+    """Registra una función que se llama con los espacios invalidados tras cada escritura."""
+    _hooks.append(hook)
+
+def invalidate(*namespaces: str) -> None:
+    """
+    Invalida la caché de respuestas y los ETag de los recursos indicados y
+    notifica a los hooks registrados. Se llama desde los handlers de escritura.
+    """
+    for namespace in namespaces:
+        try:
+            _backend.incr_generation(namespace)
+        except Exception as e:
+            logger.error(f"Error al invalidar la caché '{namespace}': {str(e)}")
+    bump_version(*namespaces)
+    for hook in _hooks:
+        hook(namespaces)
+
+def build_cache_key(namespace: str, generation: int, request: Request, usuario: Any = None, por_usuario: bool = False) -> str:
+    query = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+    rol = getattr(usuario, "rol", None)
+    rol = getattr(rol, "value", rol)
+    clave = f"{request.url.path}?{query}|{rol}"
+    if por_usuario and usuario is not None:
+        clave += f"|{usuario.matricula}"
+    return f"cache:{namespace}:{generation}:{hashlib.sha1(clave.encode('utf-8')).hexdigest()}"
+
+def _json_response(body: bytes, sub_response: Response, estado: str) -> Response:
+    response = Response(content=body, media_type="application/json")
+    # Conservar las cabeceras añadidas por dependencias (p. ej. ETag)
+    for name, value in sub_response.headers.items():
+        if name.lower() != "content-length":
+            response.headers[name] = value
+    response.headers["X-Cache"] = estado
+    return response
+
+def cached(namespace: str, response_model: Any, ttl: Optional[int] = None, por_usuario: bool = False):
+    """
+    Decorador para endpoints GET síncronos que guarda la respuesta ya serializada.
+
+        @router.get("/", response_model=List[ForoSchema])
+        @cached("foros", List[ForoSchema])
+        def read_foros(...):
+
+    La clave incluye ruta, parámetros de consulta y rol del usuario (parámetro
+    `current_user` del endpoint). Las entradas se invalidan con `invalidate()`.
+    """
+    adapter = TypeAdapter(response_model)
+    ttl = ttl or CACHE_TTL_SECONDS
+
+    def decorator(func):
+        signature = inspect.signature(func)
+        owns_request = "request" not in signature.parameters
+        owns_response = "response" not in signature.parameters
+        extra = []
+        if owns_request:
+            extra.append(inspect.Parameter("request", inspect.Parameter.KEYWORD_ONLY, annotation=Request))
+        if owns_response:
+            extra.append(inspect.Parameter("response", inspect.Parameter.KEYWORD_ONLY, annotation=Response))
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            request = kwargs.pop("request") if owns_request else kwargs["request"]
+            sub_response = kwargs.pop("response") if owns_response else kwargs["response"]
+            usuario = kwargs.get("current_user")
+
+            try:
+                generation = _backend.get_generation(namespace)
+                key = build_cache_key(namespace, generation, request, usuario, por_usuario)
+                body = _backend.get(key)
+            except Exception as e:
+                logger.error(f"Error al leer la caché '{namespace}': {str(e)}")
+                key, body = None, None
+
+            if body is not None:
+                stats[namespace]["hits"] += 1
+                return _json_response(body, sub_response, "HIT")
+
+            stats[namespace]["misses"] += 1
+            result = func(*args, **kwargs)
+            if isinstance(result, Response):
+                return result
+
+            body = adapter.dump_json(adapter.validate_python(result, from_attributes=True))
+            if key is not None:
+                try:
+                    _backend.set(key, body, ttl_efectivo(namespace, ttl))
+                except Exception as e:
+                    logger.error(f"Error al escribir la caché '{namespace}': {str(e)}")
+            return _json_response(body, sub_response, "MISS")
+
+        wrapper.__signature__ = signature.replace(parameters=[*signature.parameters.values(), *extra])
+        return wrapper
+
+    return decorator
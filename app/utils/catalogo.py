@@ -0,0 +1,149 @@
+import hashlib
+import json
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from ..models.semestre import Semestre
+from ..models.materia import Materia
+from ..models.semana_tema import SemanaTema
+from ..models.recurso import Recurso
+from ..config import CACHE_TTL_SECONDS
+from .cache import get_backend, register_invalidation_hook
+
+logger = logging.getLogger(__name__)
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    """Árbol del catálogo ya serializado junto con su ETag."""
+    body: bytes
+    etag: str
+    generacion: Tuple[int, ...] = ()
+    creado: float = 0.0
+
+# Snapshot en memoria del proceso. Se reconstruye tras cada escritura local y, para
+# ver las de otros workers, cuando cambian las generaciones de la caché compartida
+# (CACHE_BACKEND=redis) o cuando supera CACHE_TTL_SECONDS de antigüedad.
+_lock = threading.Lock()
+_snapshot: Optional[CatalogSnapshot] = None
+_generation = 0
+
+# Espacios de caché cuyo contenido forma parte del árbol
+CATALOG_NAMESPACES = {"semestres", "materias", "semanas_temas", "recursos"}
+
+def build_catalog_tree(db: Session) -> List[Dict[str, Any]]:
+    """
+    Construye el árbol semestres → materias → semanas → recursos.
+
+    Se ejecuta una consulta por tabla y el árbol se arma en memoria, de modo que
+    el número de consultas no depende del tamaño del catálogo. De los recursos solo
+    se leen metadatos (nunca `contenido_lectura`).
+    """
+    semestres = db.query(Semestre.id, Semestre.nombre).order_by(Semestre.id).all()
+    materias = db.query(
+        Materia.id, Materia.nombre, Materia.descripcion, Materia.semestre_id
+    ).order_by(Materia.id).all()
+    semanas = db.query(
+        SemanaTema.id, SemanaTema.materia_id, SemanaTema.numero_semana, SemanaTema.tema
+    ).order_by(SemanaTema.materia_id, SemanaTema.numero_semana).all()
+    recursos = db.query(
+        Recurso.id, Recurso.semana_tema_id, Recurso.tipo, Recurso.url_video, Recurso.cuestionario_id
+    ).order_by(Recurso.id).all()
+
+    recursos_por_semana: Dict[int, List[Dict[str, Any]]] = {}
+    for r in recursos:
+        recursos_por_semana.setdefault(r.semana_tema_id, []).append({
+            "id": r.id,
+            "tipo": r.tipo.value if hasattr(r.tipo, "value") else r.tipo,
+            "url_video": r.url_video,
+            "cuestionario_id": r.cuestionario_id,
+        })
+
+    semanas_por_materia: Dict[int, List[Dict[str, Any]]] = {}
+    for s in semanas:
+        semanas_por_materia.setdefault(s.materia_id, []).append({
+            "id": s.id,
+            "numero_semana": s.numero_semana,
+            "tema": s.tema,
+            "recursos": recursos_por_semana.get(s.id, []),
+        })
+
+    materias_por_semestre: Dict[int, List[Dict[str, Any]]] = {}
+    for m in materias:
+        materias_por_semestre.setdefault(m.semestre_id, []).append({
+            "id": m.id,
+            "nombre": m.nombre,
+            "descripcion": m.descripcion,
+            "semanas_temas": semanas_por_materia.get(m.id, []),
+        })
+
+    return [
+        {
+            "id": s.id,
+            "nombre": s.nombre,
+            "materias": materias_por_semestre.get(s.id, []),
+        }
+        for s in semestres
+    ]
+
+def _generacion_compartida() -> Tuple[int, ...]:
+    """Generaciones de los espacios del catálogo en el backend de caché."""
+    try:
+        backend = get_backend()
+        return tuple(backend.get_generation(ns) for ns in sorted(CATALOG_NAMESPACES))
+    except Exception as e:
+        # Sin backend solo queda la caducidad por antigüedad
+        logger.error(f"Error al leer la generación del catálogo: {str(e)}")
+        return ()
+
+def get_catalog_snapshot(db: Session) -> CatalogSnapshot:
+    """
+    Devuelve el snapshot vigente del catálogo, reconstruyéndolo si fue invalidado
+    (en este u otro worker) o si ha caducado.
+    """
+    global _snapshot
+
+    generacion = _generacion_compartida()
+    snapshot = _snapshot
+    if (
+        snapshot is not None
+        and snapshot.generacion == generacion
+        and time.monotonic() - snapshot.creado < CACHE_TTL_SECONDS
+    ):
+        return snapshot
+
+    with _lock:
+        generation = _generation
+
+    tree = build_catalog_tree(db)
+    body = json.dumps(tree, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    snapshot = CatalogSnapshot(
+        body=body,
+        etag=f'"{hashlib.sha256(body).hexdigest()[:32]}"',
+        generacion=generacion,
+        creado=time.monotonic(),
+    )
+
+    with _lock:
+        # Si hubo una escritura mientras se construía, no se guarda un árbol obsoleto
+        if generation == _generation:
+            _snapshot = snapshot
+    logger.info(f"Catálogo reconstruido: {len(body)} bytes")
+    return snapshot
+
+def invalidate_catalog() -> None:
+    """Descarta el snapshot del catálogo; la siguiente lectura lo reconstruye."""
+    global _snapshot, _generation
+    with _lock:
+        _snapshot = None
+        _generation += 1
+
+def _on_invalidate(namespaces) -> None:
+    if CATALOG_NAMESPACES.intersection(namespaces):
+        invalidate_catalog()
+
+register_invalidation_hook(_on_invalidate)
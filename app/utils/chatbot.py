@@ -1,24 +1,31 @@
-import os
-from google import genai
-from dotenv import load_dotenv
 from sqlalchemy.orm import Session
 import logging
 import json
+from types import SimpleNamespace
 from typing import Dict, Any, List, Tuple
 from app.models.mensaje_chatbot import MensajeChatbot as MensajeChatbotModel
 from app.models.mensaje_chatbot import ConversacionChatbot as ConversacionModel
 from app.models.usuario import Usuario as UsuarioModel
 from sqlalchemy.sql import func
+from app.config import LLM_AUX_TIMEOUT_SECONDS
+from app.utils.archivo_chat import leer_archivo
+from app.utils.llm import LLMError, create_backend, create_client, register_client
+from app.utils.llm_scheduler import LLMQueueFull
+from app.utils.tracing import traced
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Cargar variables de entorno
-load_dotenv()
+# Todas las llamadas pasan por el cliente común (tiempo límite, reintentos y circuito)
+# sobre el proveedor configurado en LLM_PROVIDER
+llm = register_client("chatbot", create_client(create_backend()))
 
-# Configurar la clave de API de Google
-client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+# Respuesta que se devuelve cuando el LLM no está disponible
+RESPUESTA_DEGRADADA = (
+    "En este momento el asistente no está disponible. "
+    "Por favor, intenta de nuevo en unos minutos."
+)
 
 # Definición de la excepción personalizada
 class ChatbotException(Exception):
@@ -27,6 +34,7 @@ class ChatbotException(Exception):
         self.message = message
 
 # Función para obtener información del estudiante
+@traced("chatbot.get_student_info")
 def get_student_info(matricula: str, db: Session) -> Dict[str, Any]:
     """Obtiene información relevante del estudiante para personalizar respuestas."""
     if not matricula:
@@ -52,7 +60,11 @@ def get_student_info(matricula: str, db: Session) -> Dict[str, Any]:
         logger.error(f"Error al obtener información del estudiante: {str(e)}")
         return {}
 
+def _formatear_turno(mensaje: MensajeChatbotModel) -> str:
+    return f"Usuario: {mensaje.mensaje}\nChatbot: {mensaje.respuesta}\n\n"
+
 # Función para obtener el historial de conversación mejorado
+@traced("chatbot.get_conversation_history")
 def get_conversation_history(session_id: str, db: Session, limit: int = 10) -> Tuple[str, Dict[str, Any]]:
     """
     Obtiene el historial de conversación y metadatos asociados.
@@ -73,17 +85,24 @@ def get_conversation_history(session_id: str, db: Session, limit: int = 10) -> T
     # Buscar los últimos mensajes de la misma sesión
     mensajes = db.query(MensajeChatbotModel).filter(
         MensajeChatbotModel.session_id == session_id
-    ).order_by(MensajeChatbotModel.fecha.desc()).limit(limit).all()
+    ).order_by(MensajeChatbotModel.fecha.desc(), MensajeChatbotModel.id.desc()).limit(limit).all()
     
     # Invertir para tener orden cronológico
     mensajes.reverse()
     
+    # Una sesión archivada que se retoma conserva su contexto: los turnos que faltan
+    # hasta `limit` salen del final del archivo (anteriores a los de la tabla)
+    if len(mensajes) < limit:
+        archivados = leer_archivo(db, session_id) or []
+        mensajes = [SimpleNamespace(**m) for m in archivados[len(mensajes) - limit:]] + mensajes
+    
     # Crear el contexto basado en los mensajes previos
     contexto = ""
     metadatos = {
         "num_mensajes": len(mensajes),
         "temas_detectados": [],
-        "tiene_conversacion_previa": bool(mensajes)
+        "tiene_conversacion_previa": bool(mensajes),
+        "contexto_ids": []
     }
     
     # Añadir información de la conversación si existe
@@ -97,7 +116,11 @@ def get_conversation_history(session_id: str, db: Session, limit: int = 10) -> T
     
     # Añadir los mensajes al contexto
     for mensaje in mensajes:
-        contexto += f"Usuario: {mensaje.mensaje}\nChatbot: {mensaje.respuesta}\n\n"
+        # Las respuestas degradadas no aportan contexto al modelo
+        if isinstance(mensaje.metadatos, dict) and mensaje.metadatos.get("degradado"):
+            continue
+        contexto += _formatear_turno(mensaje)
+        metadatos["contexto_ids"].append(mensaje.id)
         
         # Recopilar metadatos de los mensajes
         if hasattr(mensaje, 'metadatos') and mensaje.metadatos and isinstance(mensaje.metadatos, dict):
@@ -107,7 +130,39 @@ def get_conversation_history(session_id: str, db: Session, limit: int = 10) -> T
     
     return contexto, metadatos
 
+# Función para reconstruir el contexto con el que se generó un mensaje
+def reconstruir_contexto(mensaje: MensajeChatbotModel, db: Session) -> Tuple[str, List[int]]:
+    """
+    Reconstruye el historial enviado al modelo para `mensaje` a partir de los ids
+    guardados en metadatos["contexto_ids"]. El resumen es el actual de la
+    conversación; los mensajes archivados se leen del archivo de la sesión y los
+    eliminados se omiten.
+
+    Returns:
+        Tuple con (contexto_texto, ids de los mensajes incluidos)
+    """
+    ids = (mensaje.metadatos or {}).get("contexto_ids") or []
+    previos = db.query(MensajeChatbotModel).filter(
+        MensajeChatbotModel.id.in_(ids)
+    ).order_by(MensajeChatbotModel.fecha.asc(), MensajeChatbotModel.id.asc()).all() if ids else []
+
+    faltantes = set(ids) - {m.id for m in previos}
+    if faltantes:
+        # Los archivados son anteriores a los que siguen en la tabla
+        archivados = leer_archivo(db, mensaje.session_id) or []
+        previos = [SimpleNamespace(**m) for m in archivados if m["id"] in faltantes] + previos
+
+    contexto = ""
+    resumen = db.query(ConversacionModel.resumen).filter(
+        ConversacionModel.session_id == mensaje.session_id
+    ).scalar()
+    if resumen:
+        contexto += f"Resumen de la conversación anterior: {resumen}\n\n"
+    contexto += "".join(_formatear_turno(m) for m in previos)
+    return contexto, [m.id for m in previos]
+
 # Función para generar un sistema prompt personalizado
+@traced("chatbot.generate_system_prompt")
 def generate_system_prompt(matricula: str, metadatos: Dict[str, Any], db: Session) -> str:
     """Genera un prompt de sistema personalizado basado en el estudiante y la conversación."""
     
@@ -145,6 +200,7 @@ Directrices importantes:
     return system_prompt
 
 # Función para analizar el mensaje y extraer metadatos
+@traced("chatbot.analyze_message")
 async def analyze_message(mensaje: str, db: Session) -> Dict[str, Any]:
     """Analiza el mensaje del usuario para extraer metadatos útiles."""
     try:
@@ -162,15 +218,11 @@ Extrae y devuelve SOLO un objeto JSON con la siguiente estructura:
 }}
 """
         
-        response = client.models.generate_content(
-            model="gemini-2.0-flash",
-            contents=prompt
-        )
+        text = await llm.generate(prompt, "analisis", timeout=LLM_AUX_TIMEOUT_SECONDS)
         
         # Intentar extraer el JSON de la respuesta
         try:
             # Buscar contenido JSON en la respuesta
-            text = response.text
             # Encontrar el primer { y el último }
             start = text.find('{')
             end = text.rfind('}') + 1
@@ -192,7 +244,8 @@ Extrae y devuelve SOLO un objeto JSON con la siguiente estructura:
         return {}
 
 # Función para actualizar o crear la conversación
-def update_conversation(session_id: str, matricula: str, mensaje: str, respuesta: str, db: Session) -> None:
+@traced("chatbot.update_conversation")
+async def update_conversation(session_id: str, matricula: str, mensaje: str, respuesta: str, db: Session) -> None:
     """Actualiza o crea el registro de conversación con metadatos."""
     try:
         # Buscar conversación existente
@@ -207,12 +260,12 @@ def update_conversation(session_id: str, matricula: str, mensaje: str, respuesta
 Genera un título corto y descriptivo para esta conversación (máximo 5 palabras).
 Responde SOLO con el título, sin comillas ni puntuación adicional."""
             
-            titulo_response = client.models.generate_content(
-                model="gemini-2.0-flash",
-                contents=titulo_prompt
-            )
-            
-            titulo = titulo_response.text.strip()
+            try:
+                titulo = (await llm.generate(titulo_prompt, "titulo", timeout=LLM_AUX_TIMEOUT_SECONDS)).strip()
+            except (LLMError, LLMQueueFull) as e:
+                # Sin LLM se usa el inicio del mensaje como título provisional
+                logger.warning(f"No se pudo generar el título: {e.message}")
+                titulo = " ".join(mensaje.split()[:5])
             
             # Crear nueva conversación
             conversacion = ConversacionModel(
@@ -250,12 +303,12 @@ Responde SOLO con el título, sin comillas ni puntuación adicional."""
 
 Genera un resumen conciso (máximo 2 frases) que capture los puntos principales discutidos."""
                 
-                resumen_response = client.models.generate_content(
-                    model="gemini-2.0-flash",
-                    contents=resumen_prompt
-                )
-                
-                conversacion.resumen = resumen_response.text.strip()
+                try:
+                    resumen = await llm.generate(resumen_prompt, "resumen", timeout=LLM_AUX_TIMEOUT_SECONDS)
+                    conversacion.resumen = resumen.strip()
+                except (LLMError, LLMQueueFull) as e:
+                    # Se conserva el resumen anterior
+                    logger.warning(f"No se pudo generar el resumen: {e.message}")
         
         db.commit()
         
@@ -264,6 +317,7 @@ Genera un resumen conciso (máximo 2 frases) que capture los puntos principales
         # No lanzamos excepción para no interrumpir el flujo principal
 
 # Función principal para obtener respuesta del chatbot
+@traced("chatbot.get_chatbot_response")
 async def get_chatbot_response(user_input: str, context_history: str, db: Session, matricula: str = None, session_id: str = None) -> Tuple[str, Dict[str, Any]]:
     """
     Obtiene una respuesta del chatbot con contexto mejorado.
@@ -302,29 +356,32 @@ async def get_chatbot_response(user_input: str, context_history: str, db: Sessio
             
         prompt += f"Usuario: {user_input}\nChatbot:"
         
-        # Llamar al modelo de Gemini con el prompt completo
-        response = client.models.generate_content(
-            model="gemini-2.0-flash",
-            contents=prompt
-        )
+        # Llamar al modelo con el prompt completo
+        try:
+            chatbot_response = (await llm.generate(prompt, "respuesta")).strip()
+        except LLMError as e:
+            # Respuesta degradada en lugar de un error: no se usa como contexto ni
+            # actualiza la conversación
+            logger.error(f"LLM no disponible, se devuelve respuesta degradada: {e.message}")
+            return RESPUESTA_DEGRADADA, {**message_metadatos, "degradado": True}
         
-        # Obtener la respuesta generada
-        chatbot_response = response.text.strip()
         logger.info(f"Respuesta generada: {chatbot_response[:50]}...")
         
         # Combinar metadatos
         metadatos = {
             **message_metadatos,
             "longitud_respuesta": len(chatbot_response),
-            "longitud_contexto": len(context_history)
+            "longitud_contexto": len(context_history),
+            "contexto_ids": conv_metadatos.get("contexto_ids", [])
         }
         
-        # Si hay session_id, actualizar la conversación
-        if session_id and matricula:
-            update_conversation(session_id, matricula, user_input, chatbot_response, db)
-        
+        # La conversación (título y resumen) se actualiza en segundo plano desde el
+        # router, con la prioridad más baja del planificador
         return chatbot_response, metadatos
 
+    except LLMQueueFull:
+        # Se propaga para responder 429 con Retry-After
+        raise
     except Exception as e:
         logger.error(f"Error en get_chatbot_response: {str(e)}")
         raise ChatbotException(f"Error al obtener respuesta del chatbot: {e}")
@@ -0,0 +1,52 @@
+"""
+Contadores desnormalizados de los temas del foro.
+
+`Foro.num_comentarios` y `Foro.ultima_actividad` (fecha del último comentario o,
+si no hay, de la publicación) evitan consultar los comentarios de cada tema al
+listar el foro. Se actualizan con sentencias UPDATE en la misma transacción que
+el cambio de comentarios, sin leer y reescribir el valor en Python.
+"""
+from typing import Iterable, Optional
+
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+
+from ..models.comentario_foro import ComentarioForo
+from ..models.foro import Foro
+
+def registrar_comentario(db: Session, foro_id: int) -> bool:
+    """Suma un comentario al tema. Devuelve False si el tema no existe."""
+    resultado = db.execute(
+        update(Foro)
+        .where(Foro.id == foro_id)
+        .values(num_comentarios=Foro.num_comentarios + 1, ultima_actividad=func.now())
+        .execution_options(synchronize_session=False)
+    )
+    return resultado.rowcount > 0
+
+def recalcular(db: Session, foro_ids: Optional[Iterable[int]] = None) -> None:
+    """
+    Recalcula los contadores a partir de los comentarios existentes (de los temas
+    indicados o de todos). Se usa tras borrar comentarios, porque la actividad
+    puede retroceder al comentario anterior.
+    """
+    num_comentarios = (
+        select(func.count(ComentarioForo.id))
+        .where(ComentarioForo.foro_id == Foro.id)
+        .scalar_subquery()
+    )
+    ultimo_comentario = (
+        select(func.max(ComentarioForo.fecha_comentario))
+        .where(ComentarioForo.foro_id == Foro.id)
+        .scalar_subquery()
+    )
+    sentencia = update(Foro).values(
+        num_comentarios=num_comentarios,
+        ultima_actividad=func.coalesce(ultimo_comentario, Foro.fecha_publicacion),
+    )
+    if foro_ids is not None:
+        foro_ids = list(foro_ids)
+        if not foro_ids:
+            return
+        sentencia = sentencia.where(Foro.id.in_(foro_ids))
+    db.execute(sentencia.execution_options(synchronize_session=False))
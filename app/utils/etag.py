@@ -0,0 +1,110 @@
+import hashlib
+import os
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, Optional
+
+from fastapi import Depends, HTTPException, Request, Response, status
+
+from ..config import ETAG_WINDOW_SECONDS
+from ..models.usuario import Usuario
+from .security import get_current_active_user
+
+# Con un backend de caché compartido (CACHE_BACKEND=redis) el ETag depende solo de la
+# generación del recurso en ese backend y de la petición, así que es el mismo en todos
+# los workers y una revalidación puede acabar en 304 en cualquiera de ellos. Con la
+# caché en memoria los contadores de versión son del proceso: el identificador de
+# instancia evita que dos workers generen el mismo ETag para datos distintos y la
+# ventana de tiempo acota cuánto puede durar un 304 obsoleto cuando la escritura
+# ocurrió en otro worker.
+_INSTANCE = os.urandom(4).hex()
+_lock = threading.Lock()
+_versions: Dict[str, int] = defaultdict(int)
+
+def bump_version(*recursos: str) -> None:
+    """Incrementa la versión de uno o más tipos de recurso tras una escritura."""
+    with _lock:
+        for recurso in recursos:
+            _versions[recurso] += 1
+
+def get_version(recurso: str) -> int:
+    return _versions[recurso]
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Compara la cabecera If-None-Match con el ETag actual usando comparación débil
+    (admite listas separadas por comas y '*').
+    """
+    if not if_none_match:
+        return False
+    actual = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == actual:
+            return True
+    return False
+
+def build_etag(recurso: str, request: Request, usuario: Optional[Usuario] = None, por_usuario: bool = False) -> str:
+    """
+    Construye un ETag débil a partir de la versión del recurso, la ruta, los
+    parámetros de consulta y el rol (o la matrícula) del usuario.
+    """
+    query = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+    rol = getattr(usuario, "rol", None)
+    rol = getattr(rol, "value", rol)
+    clave = f"{request.url.path}?{query}|{rol}"
+    if por_usuario and usuario is not None:
+        clave += f"|{usuario.matricula}"
+
+    from .cache import get_backend, ttl_efectivo  # cache importa este módulo
+
+    digest = hashlib.sha1(clave.encode("utf-8")).hexdigest()[:16]
+    backend = get_backend()
+    if getattr(backend, "compartido", False):
+        try:
+            return f'W/"{recurso}-{backend.get_generation(recurso)}-{digest}"'
+        except Exception:
+            # Sin el backend compartido se recurre al ETag local del proceso
+            pass
+
+    segundos = ttl_efectivo(recurso, ETAG_WINDOW_SECONDS)
+    ventana = int(time.time() // segundos) if segundos > 0 else 0
+    return f'W/"{_INSTANCE}-{ventana}-{recurso}-{get_version(recurso)}-{digest}"'
+
+def _check(recurso: str, request: Request, response: Response, usuario: Optional[Usuario], por_usuario: bool) -> None:
+    etag = build_etag(recurso, request, usuario, por_usuario)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        # Se corta antes de consultar la base de datos y de serializar la respuesta
+        raise HTTPException(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers={"ETag": etag, "Cache-Control": "private, no-cache"}
+        )
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "private, no-cache"
+
+def conditional_get(recurso: str, por_usuario: bool = False, publico: bool = False):
+    """
+    Dependencia para GET condicional. Se usa en el decorador de la ruta:
+
+        @router.get("/", dependencies=[Depends(conditional_get("foros"))])
+
+    Si el cliente envía un If-None-Match vigente responde 304 sin ejecutar el
+    endpoint; en caso contrario añade la cabecera ETag a la respuesta. Salvo en
+    rutas públicas, la autenticación se resuelve antes de comparar el ETag.
+    """
+    if publico:
+        def dependency(request: Request, response: Response):
+            _check(recurso, request, response, None, False)
+    else:
+        def dependency(
+            request: Request,
+            response: Response,
+            current_user: Usuario = Depends(get_current_active_user)
+        ):
+            _check(recurso, request, response, current_user, por_usuario)
+    return dependency
@@ -0,0 +1,117 @@
+"""
+Exportación en streaming (NDJSON o CSV) de tablas grandes.
+
+Las filas se leen con un cursor de servidor (`stream_results` + `yield_per`) y se
+emiten por lotes, así que la memoria no depende del tamaño de la exportación.
+El generador abre su propia sesión: FastAPI cierra las dependencias con `yield`
+antes de que termine el cuerpo de una StreamingResponse.
+"""
+import csv
+import io
+import json
+import logging
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Sequence
+
+import orjson
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select
+
+from app.config import EXPORT_BATCH_SIZE
+from app.database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+FORMATOS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+def _orjson_default(valor: Any) -> Any:
+    if isinstance(valor, Decimal):
+        return float(valor)
+    raise TypeError
+
+def _valor_csv(valor: Any) -> Any:
+    if valor is None:
+        return ""
+    if isinstance(valor, Enum):
+        return valor.value
+    if isinstance(valor, (datetime, date)):
+        return valor.isoformat()
+    if isinstance(valor, (dict, list)):
+        return json.dumps(valor, ensure_ascii=False)
+    return valor
+
+def fecha_naive(valor: Optional[datetime]) -> Optional[datetime]:
+    """
+    Pasa una fecha con zona horaria a la hora local del servidor sin zona: el reloj de
+    las columnas sin zona (`datetime.now()` en la aplicación y `now()` de la base, que
+    se supone en la misma zona) y de los mensajes archivados. Se aplica antes de
+    empezar el streaming: comparar fechas con y sin zona lanza TypeError y la
+    respuesta ya enviada quedaría truncada.
+    """
+    if valor is None or valor.tzinfo is None:
+        return valor
+    return valor.astimezone().replace(tzinfo=None)
+
+def filas(consulta: Select, lote: int = EXPORT_BATCH_SIZE) -> Iterator[Sequence[Any]]:
+    """Recorre el resultado de `consulta` con un cursor de servidor, en una sesión propia."""
+    db = SessionLocal()
+    try:
+        resultado = db.execute(consulta.execution_options(stream_results=True, yield_per=lote))
+        for particion in resultado.partitions():
+            yield from particion
+    finally:
+        db.close()
+
+def codificar(columnas: List[str], registros: Iterable[Sequence[Any]], formato: str, lote: int = EXPORT_BATCH_SIZE) -> Iterator[bytes]:
+    """Serializa los registros en fragmentos de hasta `lote` filas."""
+    if formato == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(columnas)
+        pendientes = 1
+        for registro in registros:
+            writer.writerow([_valor_csv(v) for v in registro])
+            pendientes += 1
+            if pendientes >= lote:
+                yield buffer.getvalue().encode("utf-8")
+                buffer.seek(0)
+                buffer.truncate()
+                pendientes = 0
+        if pendientes:
+            yield buffer.getvalue().encode("utf-8")
+        return
+
+    fragmento: List[bytes] = []
+    for registro in registros:
+        fragmento.append(orjson.dumps(dict(zip(columnas, registro)), default=_orjson_default, option=orjson.OPT_APPEND_NEWLINE))
+        if len(fragmento) >= lote:
+            yield b"".join(fragmento)
+            fragmento = []
+    if fragmento:
+        yield b"".join(fragmento)
+
+def exportar(
+    nombre: str,
+    consulta: Select,
+    formato: str,
+    transformar: Optional[Callable[[Iterator[Sequence[Any]]], Iterator[Sequence[Any]]]] = None,
+) -> StreamingResponse:
+    """
+    Respuesta en streaming con las filas de `consulta` (las columnas son las del
+    select). `transformar` permite añadir o expandir filas sobre la marcha.
+    """
+    columnas = [c.name for c in consulta.selected_columns]
+    registros = filas(consulta)
+    if transformar is not None:
+        registros = transformar(registros)
+    fecha = datetime.now().strftime("%Y%m%d-%H%M%S")
+    return StreamingResponse(
+        codificar(columnas, registros, formato),
+        media_type=FORMATOS[formato],
+        headers={"Content-Disposition": f'attachment; filename="{nombre}-{fecha}.{formato}"'},
+    )
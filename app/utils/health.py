@@ -0,0 +1,105 @@
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+
+from ..config import (
+    READINESS_CACHE_SECONDS,
+    READINESS_DB_TIMEOUT,
+    READINESS_POOL_SATURATION,
+)
+from ..database import engine
+
+logger = logging.getLogger(__name__)
+
+# Una comprobación devuelve (ok, detalle). Las no críticas se informan pero no
+# marcan la instancia como no lista.
+Check = Callable[[], Tuple[bool, Dict[str, Any]]]
+
+@dataclass
+class ReadinessResult:
+    ready: bool
+    checks: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    checked_at: float = 0.0
+
+_checks: List[Tuple[str, Check, bool]] = []
+_lock = threading.Lock()
+_cached: Optional[ReadinessResult] = None
+
+# Un único hilo para el SELECT 1: si la base de datos no responde, las sondas
+# siguientes no acumulan hilos bloqueados, sino que fallan mientras siga pendiente.
+_db_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="readiness-db")
+_db_pending: Optional[Future] = None
+
+def register_check(name: str, check: Check, critical: bool = True) -> None:
+    """Añade una comprobación a la sonda de disponibilidad (/ready)."""
+    _checks.append((name, check, critical))
+
+def _select_one() -> None:
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+
+def check_database() -> Tuple[bool, Dict[str, Any]]:
+    """Ejecuta SELECT 1 con una conexión del pool, con tiempo límite."""
+    global _db_pending
+    if _db_pending is not None and not _db_pending.done():
+        return False, {"error": "la comprobación anterior sigue sin responder"}
+
+    start = time.perf_counter()
+    _db_pending = _db_executor.submit(_select_one)
+    try:
+        _db_pending.result(timeout=READINESS_DB_TIMEOUT)
+    except FutureTimeout:
+        return False, {"error": f"sin respuesta en {READINESS_DB_TIMEOUT} s"}
+    except Exception as e:
+        return False, {"error": str(e)}
+    return True, {"latencia_ms": round((time.perf_counter() - start) * 1000, 2)}
+
+def check_pool() -> Tuple[bool, Dict[str, Any]]:
+    """Comprueba que el pool no esté saturado (conexiones en uso / capacidad)."""
+    pool = engine.pool
+    if not hasattr(pool, "checkedout") or not hasattr(pool, "size"):
+        return True, {"detalle": f"pool {type(pool).__name__} sin límite de conexiones"}
+
+    max_overflow = getattr(pool, "_max_overflow", 0)
+    en_uso = pool.checkedout()
+    detalle = {"en_uso": en_uso, "tamano": pool.size(), "max_overflow": max_overflow}
+    if max_overflow < 0:
+        return True, detalle
+
+    capacidad = pool.size() + max_overflow
+    saturacion = en_uso / capacidad if capacidad else 0.0
+    detalle["saturacion"] = round(saturacion, 3)
+    return saturacion < READINESS_POOL_SATURATION, detalle
+
+register_check("database", check_database)
+register_check("pool", check_pool)
+
+def _run_checks() -> ReadinessResult:
+    result = ReadinessResult(ready=True, checked_at=time.time())
+    for name, check, critical in _checks:
+        try:
+            ok, detalle = check()
+        except Exception as e:
+            ok, detalle = False, {"error": str(e)}
+        if not ok:
+            logger.warning(f"Comprobación de disponibilidad '{name}' fallida: {detalle}")
+            if critical:
+                result.ready = False
+        result.checks[name] = {"ok": ok, "critica": critical, **detalle}
+    return result
+
+def get_readiness() -> ReadinessResult:
+    """
+    Devuelve el estado de disponibilidad, reutilizando el último resultado durante
+    READINESS_CACHE_SECONDS para que las sondas no carguen la base de datos.
+    """
+    global _cached
+    with _lock:
+        if _cached is None or time.time() - _cached.checked_at >= READINESS_CACHE_SECONDS:
+            _cached = _run_checks()
+        return _cached
@@ -0,0 +1,202 @@
+"""
+Inscripción masiva de estudiantes desde CSV.
+
+Se valida cada fila, los duplicados contra la base se comprueban con una sola
+consulta IN, las contraseñas se cifran en paralelo en un pool de procesos
+(bcrypt es CPU intensivo y no libera el GIL) y las filas válidas se insertan por
+lotes. Los errores se informan por fila sin detener el resto de la importación.
+"""
+import csv
+import io
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from pydantic import ValidationError
+from sqlalchemy import insert, or_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..config import BULK_ENROLL_BATCH_SIZE, BULK_ENROLL_HASH_WORKERS, BULK_ENROLL_MAX_ROWS
+from ..models.semestre import Semestre
+from ..models.usuario import RolEnum, Usuario
+from ..schemas.usuario import UsuarioCreate
+from .integridad import campo_en_conflicto
+from .security import get_password_hash, normalize_matricula, validate_matricula
+
+logger = logging.getLogger(__name__)
+
+COLUMNAS_REQUERIDAS = ("matricula", "nombre", "apellido_paterno", "apellido_materno", "correo", "contrasena")
+
+@dataclass
+class ErrorFila:
+    fila: int
+    campo: Optional[str]
+    detalle: str
+    matricula: Optional[str] = None
+
+@dataclass
+class ResultadoInscripcion:
+    total: int = 0
+    creados: int = 0
+    errores: List[ErrorFila] = field(default_factory=list)
+
+_WORKERS = BULK_ENROLL_HASH_WORKERS or os.cpu_count() or 1
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # "spawn" y no fork: el worker de uvicorn ya tiene hilos y hacer fork de un
+            # proceso con hilos puede dejar a los hijos bloqueados en un lock heredado
+            _pool = ProcessPoolExecutor(max_workers=_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+def cerrar_pool() -> None:
+    """Detiene el pool de procesos, si se llegó a crear. Se llama al apagar la aplicación."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True, cancel_futures=True)
+            _pool = None
+
+def hash_contrasenas(contrasenas: List[str]) -> List[str]:
+    """Cifra las contraseñas en el pool de procesos, conservando el orden."""
+    if len(contrasenas) < 2 or _WORKERS == 1:
+        return [get_password_hash(c) for c in contrasenas]
+    return list(_get_pool().map(get_password_hash, contrasenas, chunksize=max(1, len(contrasenas) // (_WORKERS * 4))))
+
+def _leer_filas(contenido: bytes, resultado: ResultadoInscripcion) -> List[tuple]:
+    try:
+        texto = contenido.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise ValueError("El archivo debe estar codificado en UTF-8")
+    lector = csv.DictReader(io.StringIO(texto))
+    faltantes = [c for c in COLUMNAS_REQUERIDAS if c not in (lector.fieldnames or [])]
+    if faltantes:
+        raise ValueError(f"Faltan columnas en el CSV: {', '.join(faltantes)}")
+
+    filas = []
+    # La fila 1 es la cabecera
+    for numero, fila in enumerate(lector, start=2):
+        if len(filas) >= BULK_ENROLL_MAX_ROWS:
+            raise ValueError(f"El archivo supera el máximo de {BULK_ENROLL_MAX_ROWS} filas")
+        filas.append((numero, {k: (v or "").strip() for k, v in fila.items() if k}))
+    resultado.total = len(filas)
+    return filas
+
+def _validar(numero: int, fila: Dict[str, str], resultado: ResultadoInscripcion) -> Optional[UsuarioCreate]:
+    matricula = fila.get("matricula", "")
+    if not validate_matricula(matricula):
+        resultado.errores.append(ErrorFila(numero, "matricula", 'La matrícula debe comenzar con "ti" seguido de 5 dígitos', matricula or None))
+        return None
+    try:
+        return UsuarioCreate(
+            matricula=matricula,
+            nombre=fila["nombre"],
+            apellido_paterno=fila["apellido_paterno"],
+            apellido_materno=fila["apellido_materno"],
+            correo=fila["correo"],
+            contrasena=fila["contrasena"],
+            rol=RolEnum.estudiante,
+            semestre_id=fila.get("semestre_id") or None,
+        )
+    except ValidationError as e:
+        error = e.errors()[0]
+        campo = str(error["loc"][0]) if error.get("loc") else None
+        resultado.errores.append(ErrorFila(numero, campo, error["msg"], normalize_matricula(matricula)))
+        return None
+
+def inscribir_csv(db: Session, contenido: bytes, lote: int = BULK_ENROLL_BATCH_SIZE) -> ResultadoInscripcion:
+    """Importa estudiantes desde un CSV. Lanza ValueError si el archivo no se puede procesar."""
+    resultado = ResultadoInscripcion()
+    validos: List[tuple] = []
+    vistas_matriculas, vistos_correos = set(), set()
+
+    for numero, fila in _leer_filas(contenido, resultado):
+        usuario = _validar(numero, fila, resultado)
+        if usuario is None:
+            continue
+        if not usuario.contrasena:
+            resultado.errores.append(ErrorFila(numero, "contrasena", "La contraseña es obligatoria", usuario.matricula))
+            continue
+        if usuario.matricula in vistas_matriculas:
+            resultado.errores.append(ErrorFila(numero, "matricula", "Matrícula repetida en el archivo", usuario.matricula))
+            continue
+        if usuario.correo.lower() in vistos_correos:
+            resultado.errores.append(ErrorFila(numero, "correo", "Correo repetido en el archivo", usuario.matricula))
+            continue
+        vistas_matriculas.add(usuario.matricula)
+        vistos_correos.add(usuario.correo.lower())
+        validos.append((numero, usuario))
+
+    if validos:
+        # Una sola consulta para los duplicados contra la base y otra para los semestres
+        existentes = db.execute(
+            select(Usuario.matricula, Usuario.correo).where(or_(
+                Usuario.matricula.in_([u.matricula for _, u in validos]),
+                Usuario.correo.in_([u.correo for _, u in validos]),
+            ))
+        ).all()
+        matriculas_existentes = {m for m, _ in existentes}
+        correos_existentes = {c.lower() for _, c in existentes}
+        semestres = {u.semestre_id for _, u in validos if u.semestre_id is not None}
+        semestres_existentes = set(db.scalars(select(Semestre.id).where(Semestre.id.in_(semestres)))) if semestres else set()
+
+        pendientes = []
+        for numero, usuario in validos:
+            if usuario.matricula in matriculas_existentes:
+                resultado.errores.append(ErrorFila(numero, "matricula", "La matrícula ya está registrada", usuario.matricula))
+            elif usuario.correo.lower() in correos_existentes:
+                resultado.errores.append(ErrorFila(numero, "correo", "El correo ya está registrado", usuario.matricula))
+            elif usuario.semestre_id is not None and usuario.semestre_id not in semestres_existentes:
+                resultado.errores.append(ErrorFila(numero, "semestre_id", "El semestre no existe", usuario.matricula))
+            else:
+                pendientes.append((numero, usuario))
+        validos = pendientes
+
+    hashes = hash_contrasenas([u.contrasena for _, u in validos])
+    registros = [
+        (numero, {
+            "matricula": usuario.matricula,
+            "nombre": usuario.nombre,
+            "apellido_paterno": usuario.apellido_paterno,
+            "apellido_materno": usuario.apellido_materno,
+            "contrasena_hash": contrasena_hash,
+            "rol": RolEnum.estudiante,
+            "correo": usuario.correo,
+            "semestre_id": usuario.semestre_id,
+        })
+        for (numero, usuario), contrasena_hash in zip(validos, hashes)
+    ]
+
+    for inicio in range(0, len(registros), lote):
+        bloque = registros[inicio:inicio + lote]
+        try:
+            db.execute(insert(Usuario), [r for _, r in bloque])
+            db.commit()
+            resultado.creados += len(bloque)
+        except IntegrityError:
+            # Otra petición insertó alguno entre la comprobación y el INSERT:
+            # se reintenta fila a fila para atribuir el error
+            db.rollback()
+            for numero, registro in bloque:
+                try:
+                    db.execute(insert(Usuario), registro)
+                    db.commit()
+                    resultado.creados += 1
+                except IntegrityError as e:
+                    db.rollback()
+                    campo = campo_en_conflicto(e, ("matricula", "correo"))
+                    detalle = "El correo ya está registrado" if campo == "correo" else "La matrícula ya está registrada"
+                    resultado.errores.append(ErrorFila(numero, campo, detalle, registro["matricula"]))
+
+    resultado.errores.sort(key=lambda e: e.fila)
+    logger.info(f"Inscripción masiva: {resultado.creados} de {resultado.total} filas creadas, {len(resultado.errores)} errores")
+    return resultado
@@ -0,0 +1,24 @@
+"""
+Traducción de errores de integridad de la base de datos a errores por campo.
+
+Los mensajes dependen del motor (MySQL: "Duplicate entry ... for key
+'usuario.ix_usuario_correo'", SQLite: "UNIQUE constraint failed: usuario.correo",
+PostgreSQL: 'violates unique constraint "ix_usuario_correo"'), pero todos
+incluyen el nombre de la columna o del índice, que se nombra por la columna.
+"""
+from typing import Iterable, Optional
+
+from sqlalchemy.exc import IntegrityError
+
+def campo_en_conflicto(error: IntegrityError, campos: Iterable[str]) -> Optional[str]:
+    """Primer campo de `campos` mencionado en el error, o None si no se reconoce."""
+    mensaje = str(error.orig).lower().splitlines()[0] if str(error.orig) else ""
+    # Solo la parte que nombra la restricción: el valor duplicado podría contener otro campo
+    for marcador in ("for key", "constraint failed:", "constraint"):
+        if marcador in mensaje:
+            mensaje = mensaje.split(marcador, 1)[1]
+            break
+    for campo in campos:
+        if campo.lower() in mensaje:
+            return campo
+    return None
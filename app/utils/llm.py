@@ -0,0 +1,391 @@
+import asyncio
+import contextlib
+import json
+import logging
+import random
+import threading
+import time
+from typing import Any, Dict, Optional, Protocol, Tuple
+
+from ..config import (
+    GEMINI_API_KEY,
+    LLM_CIRCUIT_FAILURE_THRESHOLD,
+    LLM_CIRCUIT_RESET_SECONDS,
+    LLM_FAKE_LATENCY_MS,
+    LLM_MAX_RETRIES,
+    LLM_MODEL,
+    LLM_PROVIDER,
+    LLM_RETRY_BACKOFF_MAX_SECONDS,
+    LLM_RETRY_BACKOFF_SECONDS,
+    LLM_TIMEOUT_SECONDS,
+    OPENAI_API_KEY,
+    OPENAI_BASE_URL,
+)
+from .health import register_check
+from .llm_scheduler import PriorityScheduler, get_scheduler
+from .metrics import llm_request_duration, llm_requests, registry
+from .tracing import start_span
+
+logger = logging.getLogger(__name__)
+
+class LLMError(Exception):
+    """
+    Error de una llamada al LLM. `retryable` indica si tiene sentido reintentar y
+    `status_code` es el código HTTP del proveedor, si lo hubo.
+    """
+
+    def __init__(self, message: str, retryable: bool = True, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.message = message
+        self.retryable = retryable
+        self.status_code = status_code
+
+    @property
+    def client_error(self) -> bool:
+        """Error de la petición (4xx salvo 429): el proveedor responde, así que no cuenta para el circuito."""
+        return self.status_code is not None and 400 <= self.status_code < 500 and self.status_code != 429
+
+class LLMTimeout(LLMError):
+    pass
+
+class LLMUnavailable(LLMError):
+    """El circuito está abierto: no se llama al proveedor y se falla de inmediato."""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message, retryable=False)
+        self.retry_after = retry_after
+
+class CircuitBreaker:
+    """
+    Circuito de tres estados. Tras `failure_threshold` fallos consecutivos se abre y
+    rechaza llamadas durante `reset_timeout` segundos; después deja pasar una única
+    llamada de prueba (semiabierto) que lo cierra o lo vuelve a abrir.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "cerrado", "abierto", "semiabierto"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = 0.0
+        self._state = self.CLOSED
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self._state = self.HALF_OPEN
+                self._probe_in_flight = False
+            return self._state
+
+    def retry_after(self) -> float:
+        return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+    def acquire(self) -> Tuple[bool, bool]:
+        """
+        Devuelve (permitido, es_prueba). `es_prueba` indica que esta llamada es la de
+        prueba del circuito semiabierto: solo quien la tiene debe liberarla.
+        """
+        state = self.state
+        with self._lock:
+            if state == self.CLOSED:
+                return True, False
+            if state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True, True
+            return False, False
+
+    def allow(self) -> bool:
+        return self.acquire()[0]
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self._state = self.CLOSED
+            self._probe_in_flight = False
+
+    def release_probe(self) -> None:
+        """Libera la llamada de prueba sin contarla como éxito ni como fallo (p. ej. si se cancela)."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self._state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    logger.warning(f"Circuito del LLM abierto tras {self.failures} fallos consecutivos")
+                self._state = self.OPEN
+                self.opened_at = time.monotonic()
+                self._probe_in_flight = False
+
+class LLMBackend(Protocol):
+    """
+    Interfaz de un proveedor de LLM. `generate` devuelve el texto generado y
+    traduce los errores del proveedor a LLMError (con `retryable`).
+    """
+
+    name: str
+    model: str
+
+    async def generate(self, prompt: str, timeout: float) -> str:
+        ...
+
+class GeminiBackend:
+    """Backend sobre el cliente asíncrono de google-genai."""
+
+    name = "gemini"
+
+    def __init__(self, api_key: Optional[str] = None, model: str = "gemini-2.0-flash", client: Any = None):
+        self.api_key = api_key
+        self.model = model
+        self._client = client
+
+    @property
+    def client(self) -> Any:
+        # google.genai tarda casi un segundo en importarse: el cliente se construye
+        # en la primera llamada y no al arrancar el proceso
+        if self._client is None:
+            from google import genai
+            self._client = genai.Client(api_key=self.api_key)
+        return self._client
+
+    async def generate(self, prompt: str, timeout: float) -> str:
+        from google.genai import errors, types
+
+        try:
+            response = await self.client.aio.models.generate_content(
+                model=self.model,
+                contents=prompt,
+                # El SDK también corta la petición HTTP, no solo la espera
+                config=types.GenerateContentConfig(http_options=types.HttpOptions(timeout=int(timeout * 1000))),
+            )
+        except errors.APIError as e:
+            raise LLMError(
+                f"Gemini respondió {e.code}: {e.message}",
+                retryable=e.code == 429 or e.code >= 500,
+                status_code=e.code,
+            ) from e
+        return response.text or ""
+
+class OpenAICompatibleBackend:
+    """
+    Backend para cualquier API compatible con /chat/completions de OpenAI (OpenAI,
+    vLLM, Ollama, LM Studio...), sobre httpx.
+    """
+
+    name = "openai"
+
+    def __init__(self, api_key: Optional[str] = None, base_url: str = "https://api.openai.com/v1", model: str = "gpt-4o-mini"):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.model = model
+        self._client = None
+        self._loop = None
+
+    def _get_client(self):
+        import httpx
+
+        # El pool de conexiones de httpx pertenece a un bucle de eventos
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            headers = {"Authorization": f"Bearer {self.api_key}"} if self.api_key else {}
+            self._client = httpx.AsyncClient(base_url=self.base_url, headers=headers)
+            self._loop = loop
+        return self._client
+
+    async def generate(self, prompt: str, timeout: float) -> str:
+        import httpx
+
+        try:
+            response = await self._get_client().post(
+                "/chat/completions",
+                json={"model": self.model, "messages": [{"role": "user", "content": prompt}]},
+                timeout=timeout,
+            )
+        except httpx.TimeoutException as e:
+            raise LLMTimeout(f"Sin respuesta del proveedor en {timeout} s") from e
+        except httpx.HTTPError as e:
+            raise LLMError(f"Error de conexión con el proveedor: {str(e)}") from e
+
+        if response.status_code >= 400:
+            raise LLMError(
+                f"El proveedor respondió {response.status_code}: {response.text[:200]}",
+                retryable=response.status_code == 429 or response.status_code >= 500,
+                status_code=response.status_code,
+            )
+        try:
+            return response.json()["choices"][0]["message"]["content"] or ""
+        except (ValueError, KeyError, IndexError) as e:
+            raise LLMError(f"Respuesta inesperada del proveedor: {str(e)}", retryable=False) from e
+
+class FakeLLMBackend:
+    """
+    Backend local y determinista para pruebas, benchmarks y pruebas de carga: no usa
+    red. Tras `latency` segundos devuelve un JSON de análisis válido cuando el prompt
+    lo pide y un texto fijo en otro caso.
+    """
+
+    name = "fake"
+    model = "fake"
+
+    def __init__(self, latency: float = 0.0, respuesta: Optional[str] = None):
+        self.latency = latency
+        self.respuesta = respuesta
+        self.calls = 0
+
+    async def generate(self, prompt: str, timeout: float) -> str:
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if '"temas_detectados"' in prompt:
+            return json.dumps({
+                "temas_detectados": ["programación"],
+                "tipo_consulta": "conceptual",
+                "nivel_complejidad": "básico",
+                "sentimiento": "neutral",
+            }, ensure_ascii=False)
+        if self.respuesta is not None:
+            return self.respuesta
+        return f"Respuesta simulada ({len(prompt)} caracteres de contexto)."
+
+def create_backend(provider: str = LLM_PROVIDER, model: str = LLM_MODEL) -> LLMBackend:
+    """Construye el backend configurado en LLM_PROVIDER ("gemini", "openai" o "fake")."""
+    if provider == "gemini":
+        return GeminiBackend(api_key=GEMINI_API_KEY, model=model or "gemini-2.0-flash")
+    if provider == "openai":
+        return OpenAICompatibleBackend(api_key=OPENAI_API_KEY, base_url=OPENAI_BASE_URL, model=model or "gpt-4o-mini")
+    if provider == "fake":
+        return FakeLLMBackend(latency=LLM_FAKE_LATENCY_MS / 1000)
+    raise ValueError(f"Proveedor de LLM desconocido: {provider}")
+
+class LLMClient:
+    """
+    Envoltorio común para todas las llamadas al LLM: tiempo límite por llamada,
+    reintentos acotados con backoff exponencial y jitter, circuito que falla rápido
+    cuando el proveedor está caído, métricas y trazas. Cada intento espera turno en
+    el planificador global (`scheduler`), que puede rechazarlo con LLMQueueFull;
+    ese rechazo no cuenta como fallo del proveedor ni se reintenta.
+    """
+
+    def __init__(
+        self,
+        backend: LLMBackend,
+        timeout: float = 20.0,
+        max_retries: int = 2,
+        backoff: float = 0.5,
+        backoff_max: float = 4.0,
+        breaker: Optional[CircuitBreaker] = None,
+        scheduler: Optional[PriorityScheduler] = None,
+    ):
+        self.backend = backend
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.breaker = breaker or CircuitBreaker()
+        self.scheduler = scheduler
+
+    def _sleep_time(self, attempt: int) -> float:
+        # "Full jitter": espera aleatoria entre 0 y el backoff exponencial
+        return random.uniform(0, min(self.backoff_max, self.backoff * (2 ** attempt)))
+
+    async def generate(self, prompt: str, operacion: str, timeout: Optional[float] = None) -> str:
+        timeout = timeout or self.timeout
+        with start_span("llm.generate_content", kind="CLIENT", **{
+            "gen_ai.system": self.backend.name,
+            "gen_ai.request.model": getattr(self.backend, "model", self.backend.name),
+            "llm.operacion": operacion,
+            "llm.prompt_chars": len(prompt),
+        }) as span:
+            for attempt in range(self.max_retries + 1):
+                # Con el circuito abierto no se espera turno en la cola
+                if self.breaker.state == CircuitBreaker.OPEN:
+                    self._reject(operacion)
+
+                async with self._slot(operacion):
+                    permitido, es_prueba = self.breaker.acquire()
+                    if not permitido:
+                        self._reject(operacion)
+                    start = time.perf_counter()
+                    try:
+                        text = await asyncio.wait_for(self.backend.generate(prompt, timeout), timeout)
+                    except asyncio.TimeoutError:
+                        error: LLMError = LLMTimeout(f"Sin respuesta del LLM en {timeout} s")
+                        resultado = "timeout"
+                    except LLMError as e:
+                        error, resultado = e, "error"
+                    except Exception as e:
+                        # Errores de red u otros no clasificados por el backend
+                        error, resultado = LLMError(str(e)), "error"
+                    except BaseException:
+                        # Cancelación (p. ej. el cliente se desconecta): no dice nada del LLM,
+                        # pero si esta era la llamada de prueba hay que liberarla o el circuito no se cierra
+                        if es_prueba:
+                            self.breaker.release_probe()
+                        raise
+                    else:
+                        llm_request_duration.observe(time.perf_counter() - start, operacion=operacion)
+                        llm_requests.inc(operacion=operacion, resultado="ok")
+                        self.breaker.record_success()
+                        if span is not None:
+                            span.set_attribute("llm.intentos", attempt + 1)
+                            span.set_attribute("llm.response_chars", len(text))
+                        return text
+
+                    llm_request_duration.observe(time.perf_counter() - start, operacion=operacion)
+                    llm_requests.inc(operacion=operacion, resultado=resultado)
+                    if error.client_error:
+                        # Petición mal formada o rechazada: no es una caída del proveedor
+                        if es_prueba:
+                            self.breaker.release_probe()
+                    else:
+                        self.breaker.record_failure()
+                    logger.warning(f"Llamada al LLM '{operacion}' fallida (intento {attempt + 1}): {error.message}")
+                    if not error.retryable or attempt == self.max_retries:
+                        raise error
+                await asyncio.sleep(self._sleep_time(attempt))
+
+    def _reject(self, operacion: str) -> None:
+        llm_requests.inc(operacion=operacion, resultado="circuito_abierto")
+        raise LLMUnavailable("El servicio de IA no está disponible temporalmente", self.breaker.retry_after())
+
+    def _slot(self, operacion: str):
+        return self.scheduler.slot(operacion) if self.scheduler is not None else contextlib.nullcontext()
+
+def create_client(backend: LLMBackend) -> LLMClient:
+    return LLMClient(
+        backend,
+        timeout=LLM_TIMEOUT_SECONDS,
+        max_retries=LLM_MAX_RETRIES,
+        backoff=LLM_RETRY_BACKOFF_SECONDS,
+        backoff_max=LLM_RETRY_BACKOFF_MAX_SECONDS,
+        breaker=CircuitBreaker(LLM_CIRCUIT_FAILURE_THRESHOLD, LLM_CIRCUIT_RESET_SECONDS),
+        scheduler=get_scheduler(),
+    )
+
+# Estado del circuito de los clientes creados, para /metrics y /ready
+_clients: Dict[str, LLMClient] = {}
+
+def register_client(name: str, client: LLMClient) -> LLMClient:
+    _clients[name] = client
+    return client
+
+def _circuit_collector():
+    estados = (CircuitBreaker.CLOSED, CircuitBreaker.HALF_OPEN, CircuitBreaker.OPEN)
+    yield ("llm_circuit_state", "gauge", "Estado del circuito del LLM (1 en el estado actual)", [
+        ({"cliente": name, "estado": estado}, int(client.breaker.state == estado))
+        for name, client in _clients.items() for estado in estados
+    ])
+
+registry.register_collector(_circuit_collector)
+
+def _check_circuit() -> Tuple[bool, Dict[str, Any]]:
+    estados = {name: client.breaker.state for name, client in _clients.items()}
+    return all(e != CircuitBreaker.OPEN for e in estados.values()), {"circuito": estados}
+
+# Sin LLM la plataforma sigue sirviendo contenido, así que no retira la instancia
+register_check("llm", _check_circuit, critical=False)
@@ -0,0 +1,174 @@
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from ..config import LLM_MAX_CONCURRENCY, LLM_MAX_QUEUE, LLM_RATE_BURST, LLM_RATE_PER_SECOND
+from .metrics import Counter, Gauge, Histogram, registry
+
+# Prioridad de cada operación (menor = más prioritaria): la respuesta principal
+# se atiende antes que el análisis, y este antes que títulos y resúmenes.
+PRIORIDADES: Dict[str, int] = {
+    "respuesta": 0,
+    "analisis": 1,
+    "titulo": 2,
+    "resumen": 2,
+}
+PRIORIDAD_POR_DEFECTO = 2
+
+llm_queue_depth = registry.register(Gauge(
+    "llm_queue_depth", "Llamadas al LLM esperando turno por prioridad", ("prioridad",)
+))
+llm_in_flight = registry.register(Gauge(
+    "llm_in_flight", "Llamadas al LLM en curso"
+))
+llm_queue_rejected = registry.register(Counter(
+    "llm_queue_rejected_total", "Llamadas al LLM rechazadas por cola llena", ("operacion",)
+))
+llm_queue_wait = registry.register(Histogram(
+    "llm_queue_wait_seconds", "Tiempo de espera en cola antes de llamar al LLM", ("operacion",)
+))
+
+class LLMQueueFull(Exception):
+    """La cola del planificador está llena; el cliente debe reintentar tras `retry_after` segundos."""
+
+    def __init__(self, retry_after: float):
+        super().__init__("Demasiadas solicitudes al servicio de IA, intenta más tarde")
+        self.message = str(self)
+        self.retry_after = retry_after
+
+    @property
+    def retry_after_header(self) -> str:
+        return str(max(1, math.ceil(self.retry_after)))
+
+class TokenBucket:
+    """Limita el ritmo de llamadas a `rate` por segundo con ráfagas de hasta `burst`."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self) -> None:
+        while True:
+            self._refill()
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+class PriorityScheduler:
+    """
+    Limita las llamadas concurrentes al LLM de todo el proceso. Las llamadas que no
+    caben esperan en una cola con prioridad; si la cola está llena, una llamada más
+    prioritaria desplaza a la menos prioritaria en espera y, si no puede, se
+    rechaza con LLMQueueFull.
+    """
+
+    def __init__(self, max_concurrent: int = 8, max_queue: int = 64, rate: float = 0.0, burst: int = 1):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.bucket = TokenBucket(rate, burst) if rate > 0 else None
+        self.active = 0
+        self._queue: List[Tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+        # Duración media de una llamada (EWMA), para estimar Retry-After
+        self._avg_duration = 1.0
+
+    @property
+    def queued(self) -> int:
+        return sum(1 for _, _, f in self._queue if not f.done())
+
+    def _retry_after(self) -> float:
+        return (self.queued / max(1, self.max_concurrent) + 1) * self._avg_duration
+
+    def _update_depth(self) -> None:
+        depth: Dict[int, int] = {p: 0 for p in set(PRIORIDADES.values())}
+        for prioridad, _, future in self._queue:
+            if not future.done():
+                depth[prioridad] = depth.get(prioridad, 0) + 1
+        for prioridad, n in depth.items():
+            llm_queue_depth.set(n, prioridad=str(prioridad))
+
+    def _enqueue(self, prioridad: int) -> asyncio.Future:
+        if self.queued >= self.max_queue:
+            # Desplazar a la espera menos prioritaria (la más reciente entre iguales)
+            pendientes = [e for e in self._queue if not e[2].done()]
+            peor = max(pendientes, key=lambda e: (e[0], e[1])) if pendientes else None
+            if peor is None or peor[0] <= prioridad:
+                raise LLMQueueFull(self._retry_after())
+            peor[2].set_exception(LLMQueueFull(self._retry_after()))
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (prioridad, next(self._seq), future))
+        return future
+
+    def _release(self) -> None:
+        while self._queue:
+            _, _, future = heapq.heappop(self._queue)
+            if not future.done():
+                # El turno pasa directamente a la siguiente espera: `active` no cambia
+                future.set_result(None)
+                self._update_depth()
+                return
+        self.active -= 1
+        self._update_depth()
+
+    @asynccontextmanager
+    async def slot(self, operacion: str) -> AsyncIterator[None]:
+        prioridad = PRIORIDADES.get(operacion, PRIORIDAD_POR_DEFECTO)
+        start = time.perf_counter()
+
+        if self.active < self.max_concurrent and not self.queued:
+            self.active += 1
+        else:
+            try:
+                future = self._enqueue(prioridad)
+            except LLMQueueFull:
+                llm_queue_rejected.inc(operacion=operacion)
+                raise
+            self._update_depth()
+            try:
+                await future
+            except LLMQueueFull:
+                llm_queue_rejected.inc(operacion=operacion)
+                raise
+            except asyncio.CancelledError:
+                # Si el turno llegó justo al cancelar, se cede al siguiente
+                if future.done() and not future.cancelled() and future.exception() is None:
+                    self._release()
+                else:
+                    future.cancel()
+                    self._update_depth()
+                raise
+
+        try:
+            if self.bucket is not None:
+                await self.bucket.acquire()
+            llm_queue_wait.observe(time.perf_counter() - start, operacion=operacion)
+            llm_in_flight.inc()
+            inicio_llamada = time.perf_counter()
+            try:
+                yield
+            finally:
+                llm_in_flight.dec()
+                self._avg_duration = 0.8 * self._avg_duration + 0.2 * (time.perf_counter() - inicio_llamada)
+        finally:
+            self._release()
+
+_scheduler: Optional[PriorityScheduler] = None
+
+def get_scheduler() -> PriorityScheduler:
+    """Planificador global del proceso, compartido por todos los clientes LLM."""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = PriorityScheduler(LLM_MAX_CONCURRENCY, LLM_MAX_QUEUE, LLM_RATE_PER_SECOND, LLM_RATE_BURST)
+    return _scheduler
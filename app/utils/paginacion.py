@@ -0,0 +1,21 @@
+"""
+Cursores opacos para paginación por clave (keyset).
+
+El cursor codifica la clave de ordenación de la última fila devuelta, de modo que
+la página siguiente se obtiene con un rango sobre el índice en lugar de OFFSET.
+"""
+import base64
+from datetime import datetime
+from typing import Tuple
+
+def codificar_cursor(fecha: datetime, id: int) -> str:
+    return base64.urlsafe_b64encode(f"{fecha.isoformat()}|{id}".encode()).decode().rstrip("=")
+
+def decodificar_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Devuelve (fecha, id). Lanza ValueError si el cursor no es válido."""
+    try:
+        texto = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        fecha, id = texto.rsplit("|", 1)
+        return datetime.fromisoformat(fecha), int(id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Cursor no válido") from e
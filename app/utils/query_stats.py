@@ -0,0 +1,70 @@
+import logging
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class QueryStats:
+    """Estadísticas de las sentencias SQL ejecutadas durante una petición."""
+    count: int = 0
+    total_time: float = 0.0
+    statements: Counter = field(default_factory=Counter)
+
+    def record(self, statement: str, elapsed: float) -> None:
+        self.count += 1
+        self.total_time += elapsed
+        self.statements[statement] += 1
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """Sentencias idénticas ejecutadas al menos `threshold` veces (posible N+1)."""
+        return [(stmt, n) for stmt, n in self.statements.most_common() if n >= threshold]
+
+_current: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+def current_stats() -> Optional[QueryStats]:
+    return _current.get()
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """
+    Cuenta las sentencias ejecutadas dentro del bloque. Útil también en pruebas:
+
+        with track_queries() as stats:
+            client.get("/api/mensajes/mensajes-chatbot/?limit=100")
+        assert stats.count == 1
+    """
+    stats = QueryStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start_times = conn.info.get("query_start_time")
+    if not start_times:
+        return
+    elapsed = time.perf_counter() - start_times.pop()
+    stats = _current.get()
+    if stats is not None:
+        stats.record(statement, elapsed)
+
+def instrument_engine(engine: Engine) -> None:
+    """Registra los eventos que miden cada sentencia ejecutada por el motor."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+def log_n_plus_one(stats: QueryStats, label: str, threshold: int) -> None:
+    for statement, n in stats.repeated(threshold):
+        logger.warning(f"Posible N+1 en {label}: sentencia repetida {n} veces: {statement[:200]}")
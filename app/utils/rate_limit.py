@@ -0,0 +1,201 @@
+"""
+Limitación de ritmo con cubetas de fichas (token bucket).
+
+Cada regla define para un método y una ruta cuántas peticiones se permiten por
+periodo (capacidad y ritmo de recarga) y por qué claves se cuenta: la IP del
+cliente (`ip`), la matrícula (`matricula`) o la IP solo en peticiones sin
+matrícula (`anonima`); la petición se rechaza si cualquiera de sus cubetas está
+vacía. Una ruta puede tener varias reglas, p. ej. una estricta por
+matrícula y otra más holgada por IP (varios estudiantes pueden compartir IP detrás
+de un NAT); se aplican todas. El estado vive en memoria del proceso o, con
+RATE_LIMIT_BACKEND=redis, en Redis para compartirlo entre workers.
+
+Formato de RATE_LIMIT_RULES (reglas separadas por ";"):
+    METODO RUTA=PETICIONES/SEGUNDOS[:clave,clave]
+    POST /api/usuarios/login=10/60:ip,matricula
+Una ruta terminada en "*" se trata como prefijo.
+"""
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..config import RATE_LIMIT_BACKEND, RATE_LIMIT_REDIS_URL, RATE_LIMIT_RULES
+from .metrics import Counter, registry
+
+logger = logging.getLogger(__name__)
+
+# En este orden se cargan las cubetas de una regla
+CLAVES = ("ip", "anonima", "matricula")
+
+rate_limit_rejected = registry.register(Counter(
+    "rate_limit_rejected_total", "Peticiones rechazadas por límite de ritmo", ("regla", "clave")
+))
+
+@dataclass(frozen=True)
+class Regla:
+    metodo: str
+    ruta: str
+    capacidad: int
+    periodo: float
+    claves: Tuple[str, ...] = ("ip",)
+
+    @property
+    def nombre(self) -> str:
+        return f"{self.metodo} {self.ruta}"
+
+    @property
+    def ritmo(self) -> float:
+        """Fichas recargadas por segundo."""
+        return self.capacidad / self.periodo
+
+    def aplica(self, metodo: str, ruta: str) -> bool:
+        if self.metodo != "*" and self.metodo != metodo:
+            return False
+        if self.ruta.endswith("*"):
+            return ruta.startswith(self.ruta[:-1])
+        return ruta == self.ruta
+
+def parse_rules(texto: str) -> List[Regla]:
+    """Convierte RATE_LIMIT_RULES en reglas. Lanza ValueError si el formato no es válido."""
+    reglas = []
+    for parte in filter(None, (p.strip() for p in texto.split(";"))):
+        try:
+            destino, limite = parte.rsplit("=", 1)
+            metodo, ruta = destino.split()
+            limite, _, claves = limite.partition(":")
+            capacidad, periodo = limite.split("/")
+            claves = tuple(c.strip() for c in claves.split(",") if c.strip()) or ("ip",)
+        except ValueError:
+            raise ValueError(f"Regla de límite de ritmo no válida: {parte!r}")
+        desconocidas = set(claves) - set(CLAVES)
+        if desconocidas:
+            raise ValueError(f"Claves no válidas en {parte!r}: {', '.join(sorted(desconocidas))}")
+        reglas.append(Regla(metodo.upper(), ruta, int(capacidad), float(periodo), claves))
+    return reglas
+
+class MemoryRateLimitBackend:
+    """
+    Cubetas en memoria del proceso. Al superar `max_keys` se descartan las usadas
+    hace más tiempo (LRU): las de un cliente activo se conservan aunque se creen
+    muchas cubetas nuevas.
+    """
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        # clave -> (fichas, última actualización), de la menos a la más reciente
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consume(self, key: str, capacidad: int, ritmo: float) -> Tuple[bool, float]:
+        """Consume una ficha. Devuelve (permitido, segundos hasta la siguiente ficha)."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (float(capacidad), now))
+            tokens = min(capacidad, tokens + (now - updated) * ritmo)
+            if tokens >= 1:
+                tokens -= 1
+                permitido, espera = True, 0.0
+            else:
+                permitido, espera = False, (1 - tokens) / ritmo
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return permitido, espera
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+# Cubeta atómica en Redis: hash con fichas y marca de tiempo, con expiración
+_LUA_CONSUME = """
+local capacidad = tonumber(ARGV[1])
+local ritmo = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local estado = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(estado[1]) or capacidad
+local updated = tonumber(estado[2]) or now
+tokens = math.min(capacidad, tokens + math.max(0, now - updated) * ritmo)
+local permitido = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    permitido = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacidad / ritmo) + 1)
+return {permitido, tostring(tokens)}
+"""
+
+class RedisRateLimitBackend:
+    """Cubetas compartidas entre procesos sobre cualquier cliente compatible con Redis (register_script)."""
+
+    def __init__(self, client: Any = None, url: Optional[str] = None):
+        if client is None:
+            import redis  # Dependencia opcional, solo necesaria con RATE_LIMIT_BACKEND=redis
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self._script = client.register_script(_LUA_CONSUME)
+
+    def consume(self, key: str, capacidad: int, ritmo: float) -> Tuple[bool, float]:
+        permitido, tokens = self._script(keys=[f"ratelimit:{key}"], args=[capacidad, ritmo, time.time()])
+        tokens = float(tokens)
+        return bool(int(permitido)), 0.0 if int(permitido) else (1 - tokens) / ritmo
+
+    def clear(self) -> None:
+        pass
+
+def _create_backend():
+    if RATE_LIMIT_BACKEND == "redis":
+        try:
+            return RedisRateLimitBackend(url=RATE_LIMIT_REDIS_URL)
+        except ImportError:
+            logger.warning("RATE_LIMIT_BACKEND=redis pero el paquete 'redis' no está instalado; se usan límites en memoria")
+    return MemoryRateLimitBackend()
+
+class RateLimiter:
+    def __init__(self, reglas: List[Regla], backend: Any = None):
+        self.reglas = reglas
+        self.backend = backend if backend is not None else _create_backend()
+
+    def aplicables(self, metodo: str, ruta: str) -> List[Regla]:
+        """Reglas que aplican a la petición; las que cuentan por matrícula, al final."""
+        return sorted((r for r in self.reglas if r.aplica(metodo, ruta)), key=lambda r: "matricula" in r.claves)
+
+    def check(self, regla: Regla, identidades: Dict[str, Optional[str]]) -> Optional[float]:
+        """
+        Consume una ficha de cada cubeta de la regla, empezando por la IP. Devuelve
+        None si se permite o los segundos que el cliente debe esperar; tras el primer
+        rechazo no se crean ni se cargan más cubetas.
+        """
+        for clave in sorted(regla.claves, key=CLAVES.index):
+            valor = identidades.get(clave)
+            if not valor:
+                continue
+            try:
+                permitido, segundos = self.backend.consume(
+                    f"{regla.nombre}={regla.capacidad}/{regla.periodo:g}|{clave}:{valor}", regla.capacidad, regla.ritmo
+                )
+            except Exception as e:
+                # Un fallo del backend compartido no debe tumbar el servicio
+                logger.error(f"Error en el backend de límites de ritmo: {str(e)}")
+                continue
+            if not permitido:
+                rate_limit_rejected.inc(regla=regla.nombre, clave=clave)
+                return segundos
+        return None
+
+def retry_after_header(segundos: float) -> str:
+    return str(max(1, math.ceil(segundos)))
+
+_limiter: Optional[RateLimiter] = None
+
+def get_limiter() -> RateLimiter:
+    """Limitador global del proceso con las reglas de RATE_LIMIT_RULES."""
+    global _limiter
+    if _limiter is None:
+        _limiter = RateLimiter(parse_rules(RATE_LIMIT_RULES))
+    return _limiter
@@ -0,0 +1,238 @@
+import functools
+import inspect
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, Optional, TextIO
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from ..config import TRACING_EXPORTER, TRACING_FILE, TRACING_SERVICE_NAME
+
+# Trazas ligeras sin dependencias externas. Los identificadores siguen el formato
+# de W3C Trace Context (cabecera traceparent) y cada span se exporta como una línea
+# JSON con los nombres de campo de OpenTelemetry, de modo que un colector OTLP o
+# cualquier herramienta que lea JSONL puede ingerirlos.
+
+@dataclass
+class Span:
+    name: str
+    trace_id: str
+    span_id: str
+    parent_span_id: Optional[str] = None
+    kind: str = "INTERNAL"
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    start_ns: int = 0
+    end_ns: int = 0
+    status: str = "UNSET"
+    status_message: Optional[str] = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def record_error(self, exc: BaseException) -> None:
+        self.status = "ERROR"
+        self.status_message = str(exc)[:500]
+        self.attributes["exception.type"] = type(exc).__name__
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "resource": {"service.name": TRACING_SERVICE_NAME},
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": self.start_ns,
+            "endTimeUnixNano": self.end_ns,
+            "durationMs": round((self.end_ns - self.start_ns) / 1e6, 3),
+            "attributes": self.attributes,
+            "status": {"code": self.status, "message": self.status_message},
+        }
+
+class JsonLinesExporter:
+    """Escribe cada span terminado como una línea JSON en un flujo de texto."""
+
+    def __init__(self, stream: TextIO):
+        self.stream = stream
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        line = json.dumps(span.to_dict(), ensure_ascii=False, default=str)
+        with self._lock:
+            self.stream.write(line + "\n")
+            self.stream.flush()
+
+def _create_exporter() -> Optional[JsonLinesExporter]:
+    if TRACING_EXPORTER == "stdout":
+        return JsonLinesExporter(sys.stdout)
+    if TRACING_EXPORTER == "file":
+        return JsonLinesExporter(open(TRACING_FILE, "a", encoding="utf-8"))
+    return None
+
+_exporter = _create_exporter()
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+_request_id: ContextVar[str] = ContextVar("request_id", default="-")
+
+def set_exporter(exporter: Optional[JsonLinesExporter]) -> None:
+    """Reemplaza el exportador (None desactiva las trazas)."""
+    global _exporter
+    _exporter = exporter
+
+def enabled() -> bool:
+    return _exporter is not None
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+def get_request_id() -> str:
+    return _request_id.get()
+
+@contextmanager
+def request_context(request_id: str) -> Iterator[None]:
+    token = _request_id.set(request_id)
+    try:
+        yield
+    finally:
+        _request_id.reset(token)
+
+_TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$")
+
+def parse_traceparent(value: Optional[str]) -> Optional[tuple]:
+    """Devuelve (trace_id, span_id) de una cabecera traceparent válida."""
+    match = _TRACEPARENT.match((value or "").strip().lower())
+    if not match or match.group(1) == "0" * 32:
+        return None
+    return match.group(1), match.group(2)
+
+def format_traceparent(span: Span) -> str:
+    return f"00-{span.trace_id}-{span.span_id}-01"
+
+@contextmanager
+def start_span(name: str, kind: str = "INTERNAL", parent: Optional[tuple] = None, **attributes: Any) -> Iterator[Optional[Span]]:
+    """
+    Abre un span hijo del span actual (o de `parent`, un par (trace_id, span_id)
+    recibido por traceparent). Sin exportador configurado no hace nada y devuelve None.
+
+        with start_span("llm.generate_content", operacion="respuesta") as span:
+            ...
+    """
+    if _exporter is None:
+        yield None
+        return
+
+    padre = _current_span.get()
+    if padre is not None:
+        trace_id, parent_span_id = padre.trace_id, padre.span_id
+    elif parent is not None:
+        trace_id, parent_span_id = parent
+    else:
+        trace_id, parent_span_id = os.urandom(16).hex(), None
+
+    span = Span(
+        name=name, trace_id=trace_id, span_id=os.urandom(8).hex(), parent_span_id=parent_span_id,
+        kind=kind, attributes=attributes, start_ns=time.time_ns(),
+    )
+    if _request_id.get() != "-":
+        span.attributes.setdefault("request.id", _request_id.get())
+    token = _current_span.set(span)
+    try:
+        yield span
+    except BaseException as e:
+        span.record_error(e)
+        raise
+    finally:
+        _current_span.reset(token)
+        span.end_ns = time.time_ns()
+        if span.status == "UNSET":
+            span.status = "OK"
+        try:
+            _exporter.export(span)
+        except Exception:
+            pass
+
+def traced(name: Optional[str] = None):
+    """Decorador que envuelve una función (síncrona o async) en un span."""
+    def decorator(func):
+        span_name = name or func.__qualname__
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with start_span(span_name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with start_span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+
+    return decorator
+
+# Spans de base de datos: uno por sentencia, solo dentro de una traza activa
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _exporter is None or _current_span.get() is None:
+        return
+    cm = start_span("db.query", kind="CLIENT", **{
+        "db.system": conn.dialect.name,
+        "db.statement": statement[:1000],
+    })
+    cm.__enter__()
+    conn.info.setdefault("trace_spans", []).append(cm)
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    spans = conn.info.get("trace_spans")
+    if spans:
+        spans.pop().__exit__(None, None, None)
+
+def _handle_error(exception_context):
+    conn = exception_context.connection
+    spans = conn.info.get("trace_spans") if conn is not None else None
+    if spans:
+        exc = exception_context.original_exception
+        spans.pop().__exit__(type(exc), exc, exc.__traceback__)
+
+def instrument_engine(engine: Engine) -> None:
+    """Registra los eventos que abren un span por cada sentencia SQL."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+# Identificador de petición en los logs
+
+LOG_FORMAT = "%(asctime)s %(levelname)s [%(request_id)s] %(name)s: %(message)s"
+
+def install_log_context(fmt: str = LOG_FORMAT) -> None:
+    """
+    Añade `request_id` y `trace_id` a todos los registros de log y aplica `fmt`
+    a los handlers del logger raíz.
+    """
+    factory = logging.getLogRecordFactory()
+    if getattr(factory, "_con_contexto", False):
+        return
+
+    def record_factory(*args, **kwargs):
+        record = factory(*args, **kwargs)
+        record.request_id = _request_id.get()
+        span = _current_span.get()
+        record.trace_id = span.trace_id if span is not None else "-"
+        return record
+
+    record_factory._con_contexto = True
+    logging.setLogRecordFactory(record_factory)
+    root = logging.getLogger()
+    if not root.handlers:
+        logging.basicConfig(level=logging.INFO)
+    for handler in root.handlers:
+        handler.setFormatter(logging.Formatter(fmt))
@@ -0,0 +1,104 @@
+"""
+Benchmark de tiempo de arranque (importación de la aplicación).
+
+Ejecuta `python -X importtime -c "import app.main"` en procesos nuevos, informa la
+mediana del tiempo total de importación y los módulos con mayor tiempo propio y
+acumulado. Con `--max-ms` termina con código 1 si la mediana supera el umbral,
+para usarlo como control en CI.
+
+Uso:
+    python -m benchmarks.arranque
+    python -m benchmarks.arranque --repeticiones 10 --top 15
+    python -m benchmarks.arranque --json arranque.json --max-ms 2000
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple
+
+_LINEA = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|(\s*)(.+)$")
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int, int]]:
+    """Devuelve (módulo, propio_us, acumulado_us, profundidad) por cada línea de -X importtime."""
+    filas = []
+    for linea in stderr.splitlines():
+        match = _LINEA.match(linea)
+        if match:
+            propio, acumulado, sangria, modulo = match.groups()
+            filas.append((modulo.strip(), int(propio), int(acumulado), (len(sangria) - 1) // 2))
+    return filas
+
+def medir(modulo: str) -> Tuple[float, List[Tuple[str, int, int, int]]]:
+    env = {**os.environ, "PYTHONDONTWRITEBYTECODE": "1"}
+    # La aplicación crea el motor al importar; sin base de datos real basta SQLite en memoria
+    env.setdefault("DATABASE_URL", "sqlite://")
+    inicio = time.perf_counter()
+    proceso = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {modulo}"],
+        env=env, capture_output=True, text=True,
+    )
+    pared_ms = (time.perf_counter() - inicio) * 1000
+    if proceso.returncode != 0:
+        raise SystemExit(f"Error al importar {modulo}:\n{proceso.stderr[-2000:]}")
+    return pared_ms, parse_importtime(proceso.stderr)
+
+def run(modulo: str, repeticiones: int, top: int) -> Dict:
+    medir(modulo)  # calentamiento (cachés de bytecode y del sistema de archivos)
+    totales, paredes = [], []
+    propios: Dict[str, List[int]] = {}
+    acumulados: Dict[str, List[int]] = {}
+    for _ in range(repeticiones):
+        pared_ms, filas = medir(modulo)
+        paredes.append(pared_ms)
+        for nombre, propio, acumulado, _ in filas:
+            propios.setdefault(nombre, []).append(propio)
+            acumulados.setdefault(nombre, []).append(acumulado)
+        totales.append(next(acumulado for nombre, _, acumulado, _ in filas if nombre == modulo) / 1000)
+
+    def ranking(valores: Dict[str, List[int]]) -> List[Dict]:
+        medianas = sorted(((statistics.median(v) / 1000, k) for k, v in valores.items()), reverse=True)
+        return [{"modulo": k, "ms": round(ms, 2)} for ms, k in medianas[:top]]
+
+    return {
+        "modulo": modulo,
+        "python": sys.version.split()[0],
+        "repeticiones": repeticiones,
+        "importacion_ms_p50": round(statistics.median(totales), 2),
+        "importacion_ms_max": round(max(totales), 2),
+        "proceso_ms_p50": round(statistics.median(paredes), 2),
+        "top_propio": ranking(propios),
+        "top_acumulado": ranking({k: v for k, v in acumulados.items() if k != modulo}),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modulo", default="app.main")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--json", dest="salida", help="Guardar los resultados en un archivo JSON")
+    parser.add_argument("--max-ms", type=float, help="Fallar si la mediana de importación supera este valor")
+    args = parser.parse_args()
+
+    r = run(args.modulo, args.repeticiones, args.top)
+    print(f"import {r['modulo']}: p50={r['importacion_ms_p50']} ms max={r['importacion_ms_max']} ms "
+          f"(proceso completo p50={r['proceso_ms_p50']} ms, {r['repeticiones']} repeticiones)")
+    for titulo, clave in (("tiempo propio", "top_propio"), ("tiempo acumulado", "top_acumulado")):
+        print(f"\nMódulos con más {titulo}:")
+        for fila in r[clave]:
+            print(f"  {fila['ms']:>9.2f} ms  {fila['modulo']}")
+
+    if args.salida:
+        with open(args.salida, "w") as f:
+            json.dump(r, f, indent=2)
+
+    if args.max_ms is not None and r["importacion_ms_p50"] > args.max_ms:
+        print(f"\nLa importación ({r['importacion_ms_p50']} ms) supera el umbral de {args.max_ms} ms")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+"""
+Prueba de carga reproducible de la API.
+
+Un conductor asyncio sobre httpx simula `--usuarios` estudiantes concurrentes
+durante `--duracion` segundos. Cada uno inicia sesión y repite una mezcla
+ponderada de operaciones: catálogo, listado y búsqueda del foro, comentarios,
+reacciones, progreso de recursos y chat. El chatbot usa el proveedor local
+`fake` (LLM_PROVIDER=fake) con latencia configurable, de modo que no hay red.
+
+Por defecto la aplicación corre en el mismo proceso (httpx.ASGITransport) sobre
+una base SQLite temporal sembrada con datos deterministas. Con `--url` se ataca
+un servidor ya arrancado (p. ej. uvicorn con MySQL local); en ese caso
+`--database-url` debe apuntar a la misma base para sembrarla, o usar
+`--sin-sembrar` si ya tiene datos de scripts.generar_datos (con la misma
+`--contrasena`).
+
+El informe JSON (p50/p95/p99 y RPS por operación) se puede comparar entre versiones:
+
+    python -m benchmarks.carga --json antes.json
+    python -m benchmarks.carga --json despues.json
+    python -m benchmarks.carga --comparar antes.json despues.json
+
+Uso:
+    python -m benchmarks.carga
+    python -m benchmarks.carga --usuarios 50 --duracion 60 --llm-latencia-ms 300
+    python -m benchmarks.carga --url http://localhost:8000 --database-url mysql+pymysql://...
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+# Peso relativo de cada operación en la mezcla
+MEZCLA = {
+    "catalogo": 20,
+    "foros_listado": 25,
+    "foros_busqueda": 10,
+    "foro_comentarios": 15,
+    "reaccion": 10,
+    "progreso": 12,
+    "chat": 8,
+}
+
+TERMINOS_BUSQUEDA = ["sql", "redes", "algoritmo", "memoria", "proyecto", "examen", "índice", "python"]
+ORDENES_FORO = ["recientes", "actividad", "likes"]
+
+def cargar_datos(sembrar: bool, escala: float, semilla: int, contrasena: str) -> Dict[str, List[Any]]:
+    """
+    Con `sembrar` crea el esquema y genera datos deterministas con
+    scripts.generar_datos; después lee de la base las matrículas de estudiantes y
+    los ids de foros y recursos que usarán los usuarios virtuales.
+    """
+    from sqlalchemy import select
+
+    import app.models  # noqa: F401  (registra todos los mapeos)
+    from app.database import Base, SessionLocal, engine
+    from app.models.foro import Foro
+    from app.models.recurso import Recurso
+    from app.models.usuario import RolEnum, Usuario
+    from scripts.generar_datos import generar
+
+    db = SessionLocal()
+    try:
+        if sembrar:
+            Base.metadata.create_all(engine)
+            generar(db, escala=escala, semilla=semilla, contrasena=contrasena, log=lambda _: None)
+        datos = {
+            "matriculas": list(db.scalars(
+                select(Usuario.matricula).where(Usuario.rol == RolEnum.estudiante).order_by(Usuario.matricula)
+            )),
+            "foros": list(db.scalars(select(Foro.id))),
+            "recursos": list(db.scalars(select(Recurso.id))),
+        }
+    finally:
+        db.close()
+    if not all(datos.values()):
+        raise SystemExit("La base no tiene usuarios, foros o recursos; siembrala con scripts.generar_datos")
+    return datos
+
+class Resultados:
+    def __init__(self):
+        self.tiempos: Dict[str, List[float]] = {}
+        self.errores: Dict[str, Dict[str, int]] = {}
+
+    def registrar(self, operacion: str, ms: float, status: Optional[int], ok: bool) -> None:
+        if ok:
+            self.tiempos.setdefault(operacion, []).append(ms)
+        else:
+            errores = self.errores.setdefault(operacion, {})
+            errores[str(status)] = errores.get(str(status), 0) + 1
+
+    def informe(self, duracion: float) -> Dict[str, Any]:
+        def percentil(valores: List[float], p: float) -> float:
+            return round(valores[min(len(valores) - 1, int(len(valores) * p))], 2)
+
+        operaciones = {}
+        for operacion in sorted(set(self.tiempos) | set(self.errores)):
+            valores = sorted(self.tiempos.get(operacion, []))
+            errores = sum(self.errores.get(operacion, {}).values())
+            operaciones[operacion] = {
+                "peticiones": len(valores) + errores,
+                "errores": self.errores.get(operacion, {}),
+                "rps": round(len(valores) / duracion, 2),
+                "p50_ms": round(statistics.median(valores), 2) if valores else None,
+                "p95_ms": percentil(valores, 0.95) if valores else None,
+                "p99_ms": percentil(valores, 0.99) if valores else None,
+            }
+        todos = sorted(t for v in self.tiempos.values() for t in v)
+        return {
+            "total": {
+                "peticiones": len(todos) + sum(sum(e.values()) for e in self.errores.values()),
+                "errores": sum(sum(e.values()) for e in self.errores.values()),
+                "rps": round(len(todos) / duracion, 2),
+                "p50_ms": round(statistics.median(todos), 2) if todos else None,
+                "p95_ms": percentil(todos, 0.95) if todos else None,
+                "p99_ms": percentil(todos, 0.99) if todos else None,
+            },
+            "operaciones": operaciones,
+        }
+
+async def _medir(resultados: Resultados, operacion: str, peticion: Callable, esperado=(200, 201)):
+    inicio = time.perf_counter()
+    try:
+        response = await peticion()
+        status = response.status_code
+    except Exception as e:
+        resultados.registrar(operacion, 0, type(e).__name__, False)
+        return None
+    resultados.registrar(operacion, (time.perf_counter() - inicio) * 1000, status, status in esperado)
+    return response
+
+async def usuario_virtual(client, indice: int, semilla: int, contrasena: str, datos: Dict[str, List[Any]], fin: float, resultados: Resultados):
+    rng = random.Random(semilla * 1000 + indice)
+    matricula = datos["matriculas"][indice % len(datos["matriculas"])]
+
+    response = await _medir(resultados, "login", lambda: client.post(
+        "/api/usuarios/login", data={"username": matricula, "password": contrasena}
+    ))
+    if response is None or response.status_code != 200:
+        return
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    session_id = None
+    operaciones, pesos = zip(*MEZCLA.items())
+
+    while time.perf_counter() < fin:
+        operacion = rng.choices(operaciones, pesos)[0]
+        foro_id = rng.choice(datos["foros"])
+
+        if operacion == "catalogo":
+            peticion = lambda: client.get("/api/catalogo/", headers=headers)
+        elif operacion == "foros_listado":
+            peticion = lambda: client.get("/api/foros/", params={"skip": rng.randint(0, 5) * 20, "limit": 20, "orden": rng.choice(ORDENES_FORO)}, headers=headers)
+        elif operacion == "foros_busqueda":
+            peticion = lambda: client.get("/api/foros/", params={"search": rng.choice(TERMINOS_BUSQUEDA), "limit": 20}, headers=headers)
+        elif operacion == "foro_comentarios":
+            peticion = lambda: client.get(f"/api/comentarios-foro/foro/{foro_id}", headers=headers)
+        elif operacion == "reaccion":
+            tipo = rng.choice(["like", "dislike"])
+            peticion = lambda: client.post(f"/api/foros/{foro_id}/reacciones", params={"tipo": tipo}, headers=headers)
+        elif operacion == "progreso":
+            cuerpo = {
+                "matricula": matricula,
+                "recurso_id": rng.choice(datos["recursos"]),
+                "estado": rng.choice(["en_progreso", "completado"]),
+            }
+            peticion = lambda: client.post("/api/progreso-recursos/", json=cuerpo, headers=headers)
+        else:
+            cuerpo = {"matricula": matricula, "session_id": session_id, "mensaje": "¿Qué es la normalización en bases de datos?"}
+            peticion = lambda: client.post("/api/mensajes/mensajes-chatbot/conversar", json=cuerpo, headers=headers)
+
+        response = await _medir(resultados, operacion, peticion)
+        if operacion == "chat" and response is not None and response.status_code == 201:
+            # Cada usuario sigue una conversación de unos pocos mensajes
+            session_id = response.json()["session_id"] if rng.random() < 0.8 else None
+
+async def ejecutar(args, datos: Dict[str, List[Any]]) -> Dict[str, Any]:
+    import httpx
+
+    if args.url:
+        transport, base_url = None, args.url
+    else:
+        from app.main import app as fastapi_app
+        transport, base_url = httpx.ASGITransport(app=fastapi_app), "http://carga"
+
+    resultados = Resultados()
+    limites = httpx.Limits(max_connections=args.usuarios, max_keepalive_connections=args.usuarios)
+    async with httpx.AsyncClient(transport=transport, base_url=base_url, timeout=60, limits=limites) as client:
+        inicio = time.perf_counter()
+        fin = inicio + args.duracion
+        await asyncio.gather(*(
+            usuario_virtual(client, i, args.semilla, args.contrasena, datos, fin, resultados) for i in range(args.usuarios)
+        ))
+        duracion = time.perf_counter() - inicio
+    return resultados.informe(duracion)
+
+def _commit_actual() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+def imprimir(informe: Dict[str, Any]) -> None:
+    print(f"{'operación':<20}{'peticiones':>11}{'errores':>9}{'rps':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    filas = list(informe["operaciones"].items()) + [("TOTAL", informe["total"])]
+    for nombre, r in filas:
+        errores = r["errores"] if isinstance(r["errores"], int) else sum(r["errores"].values())
+        print(f"{nombre:<20}{r['peticiones']:>11}{errores:>9}{r['rps']:>9}{str(r['p50_ms']):>10}{str(r['p95_ms']):>10}{str(r['p99_ms']):>10}")
+
+def comparar(antes_path: str, despues_path: str) -> None:
+    with open(antes_path) as f:
+        antes = json.load(f)
+    with open(despues_path) as f:
+        despues = json.load(f)
+    print(f"{'operación':<20}{'métrica':<8}{'antes':>10}{'después':>10}{'cambio':>9}")
+    nombres = sorted(set(antes["operaciones"]) | set(despues["operaciones"])) + ["TOTAL"]
+    for nombre in nombres:
+        a = antes["total"] if nombre == "TOTAL" else antes["operaciones"].get(nombre, {})
+        d = despues["total"] if nombre == "TOTAL" else despues["operaciones"].get(nombre, {})
+        for metrica in ("rps", "p50_ms", "p95_ms", "p99_ms"):
+            va, vd = a.get(metrica), d.get(metrica)
+            cambio = f"{(vd - va) / va * 100:+.1f}%" if va and vd is not None else "-"
+            print(f"{nombre:<20}{metrica:<8}{str(va):>10}{str(vd):>10}{cambio:>9}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--usuarios", type=int, default=20, help="Usuarios virtuales concurrentes")
+    parser.add_argument("--duracion", type=float, default=30, help="Segundos de carga")
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--url", help="Servidor ya arrancado; por defecto la app corre en el mismo proceso")
+    parser.add_argument("--database-url", help="Base de datos a sembrar (por defecto SQLite temporal)")
+    parser.add_argument("--sin-sembrar", action="store_true", help="No crear datos (la base ya está sembrada)")
+    parser.add_argument("--escala", type=float, default=0.1, help="Escala de scripts.generar_datos al sembrar")
+    parser.add_argument("--contrasena", default="Sysmentor2025!", help="Contraseña común de los usuarios sembrados")
+    parser.add_argument("--llm-latencia-ms", type=float, default=200, help="Latencia del LLM simulado")
+    parser.add_argument("--con-limites", action="store_true", help="Mantener los límites de ritmo (RATE_LIMIT_*) activos")
+    parser.add_argument("--json", dest="salida", help="Guardar el informe en un archivo JSON")
+    parser.add_argument("--comparar", nargs=2, metavar=("ANTES", "DESPUES"), help="Comparar dos informes JSON y salir")
+    args = parser.parse_args()
+
+    if args.comparar:
+        comparar(*args.comparar)
+        return
+
+    # La configuración se lee al importar la aplicación: fijarla antes
+    directorio = tempfile.mkdtemp(prefix="carga-")
+    os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{os.path.join(directorio, 'carga.db')}"
+    os.environ["LLM_PROVIDER"] = "fake"
+    os.environ["LLM_FAKE_LATENCY_MS"] = str(args.llm_latencia_ms)
+    os.environ.setdefault("SECRET_KEY", "carga-secret-key")
+    os.environ.setdefault("TRACING_EXPORTER", "none")
+    # Todos los usuarios virtuales comparten IP en proceso: sin esto el límite de login por IP los rechazaría
+    if not args.con_limites:
+        os.environ["RATE_LIMIT_ENABLED"] = "false"
+
+    datos = cargar_datos(not args.sin_sembrar, args.escala, args.semilla, args.contrasena)
+
+    informe = asyncio.run(ejecutar(args, datos))
+    informe["parametros"] = {
+        "usuarios": args.usuarios, "duracion_s": args.duracion, "semilla": args.semilla, "escala": args.escala,
+        "llm_latencia_ms": args.llm_latencia_ms, "destino": args.url or "en proceso",
+        "base_de_datos": os.environ["DATABASE_URL"].split("://")[0],
+    }
+    informe["entorno"] = {"commit": _commit_actual(), "python": sys.version.split()[0], "fecha": datetime.now().isoformat(timespec="seconds")}
+    imprimir(informe)
+
+    if args.salida:
+        with open(args.salida, "w") as f:
+            json.dump(informe, f, indent=2, ensure_ascii=False)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Benchmark de compresión de respuestas.
+
+Mide el tamaño y el costo de CPU de comprimir cargas típicas de la API
+(historial de chatbot, lecturas y listados del foro) con gzip y, si está
+instalado, brotli.
+
+Uso:
+    python -m benchmarks.compresion
+    python -m benchmarks.compresion --json resultados.json
+"""
+import argparse
+import gzip
+import json
+import random
+import time
+from datetime import datetime, timedelta
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+PALABRAS = (
+    "sistema base datos consulta índice red protocolo algoritmo estructura memoria proceso "
+    "hilo servidor cliente función clase objeto herencia interfaz compilador lenguaje "
+    "transacción normalización arquitectura capa modelo vista controlador prueba unidad"
+).split()
+
+def _texto(rng: random.Random, palabras: int) -> str:
+    return " ".join(rng.choice(PALABRAS) for _ in range(palabras)).capitalize() + "."
+
+def historial_chatbot(rng: random.Random, mensajes: int = 100) -> list:
+    inicio = datetime(2025, 1, 1)
+    return [
+        {
+            "id": i,
+            "matricula": "ti00001",
+            "session_id": "2f1c6a0e-1b9d-4c55-9f55-5d9f1e0c1a11",
+            "mensaje": _texto(rng, 25),
+            "respuesta": _texto(rng, 250),
+            "metadatos": {"temas_detectados": rng.sample(PALABRAS, 3), "longitud_respuesta": 1500},
+            "fecha": (inicio + timedelta(minutes=i)).isoformat(),
+        }
+        for i in range(mensajes)
+    ]
+
+def lectura(rng: random.Random, palabras: int = 30000) -> dict:
+    return {
+        "id": 1,
+        "semana_tema_id": 1,
+        "tipo": "lectura",
+        "contenido_lectura": _texto(rng, palabras),
+        "url_video": None,
+        "cuestionario_id": None,
+    }
+
+def listado_foros(rng: random.Random, temas: int = 100) -> list:
+    inicio = datetime(2025, 1, 1)
+    return [
+        {
+            "id": i,
+            "matricula": f"ti{i:05d}",
+            "materia_id": 1,
+            "titulo": _texto(rng, 8),
+            "contenido": _texto(rng, 120),
+            "fecha_publicacion": (inicio + timedelta(hours=i)).isoformat(),
+            "likes": rng.randint(0, 50),
+            "dislikes": rng.randint(0, 5),
+        }
+        for i in range(temas)
+    ]
+
+def _codecs():
+    codecs = [
+        ("gzip-1", lambda b: gzip.compress(b, compresslevel=1)),
+        ("gzip-6", lambda b: gzip.compress(b, compresslevel=6)),
+        ("gzip-9", lambda b: gzip.compress(b, compresslevel=9)),
+    ]
+    if brotli is not None:
+        codecs += [
+            ("br-4", lambda b: brotli.compress(b, quality=4)),
+            ("br-11", lambda b: brotli.compress(b, quality=11)),
+        ]
+    return codecs
+
+def _medir(fn, data: bytes, repeticiones: int) -> float:
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        fn(data)
+    return (time.perf_counter() - inicio) / repeticiones * 1000
+
+def run(repeticiones: int = 20, seed: int = 42) -> list:
+    rng = random.Random(seed)
+    cargas = {
+        "historial_chatbot_100": historial_chatbot(rng),
+        "lectura_30k_palabras": lectura(rng),
+        "listado_foros_100": listado_foros(rng),
+    }
+    resultados = []
+    for nombre, carga in cargas.items():
+        data = json.dumps(carga, ensure_ascii=False).encode("utf-8")
+        for codec, fn in _codecs():
+            comprimido = fn(data)
+            resultados.append({
+                "carga": nombre,
+                "codec": codec,
+                "bytes_original": len(data),
+                "bytes_comprimido": len(comprimido),
+                "ratio": round(len(data) / len(comprimido), 2),
+                "ms_por_respuesta": round(_medir(fn, data, repeticiones), 3),
+            })
+    return resultados
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeticiones", type=int, default=20)
+    parser.add_argument("--json", dest="salida", help="Guardar los resultados en un archivo JSON")
+    args = parser.parse_args()
+
+    resultados = run(args.repeticiones)
+    print(f"{'carga':<24}{'codec':<8}{'original':>10}{'comprimido':>12}{'ratio':>8}{'ms':>10}")
+    for r in resultados:
+        print(f"{r['carga']:<24}{r['codec']:<8}{r['bytes_original']:>10}{r['bytes_comprimido']:>12}{r['ratio']:>8}{r['ms_por_respuesta']:>10}")
+    if brotli is None:
+        print("\nbrotli no está instalado: solo se midió gzip")
+
+    if args.salida:
+        with open(args.salida, "w") as f:
+            json.dump(resultados, f, indent=2)
+
+if __name__ == "__main__":
+    main()
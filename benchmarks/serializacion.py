@@ -0,0 +1,98 @@
+"""
+Micro-benchmark de serialización de los listados de mensajes del chatbot.
+
+Compara, sobre objetos ORM en memoria (sin base de datos), la ruta anterior
+(`orm_to_pydantic` + JSONResponse) con la actual (validación directa
+`from_attributes` en FastAPI + ORJSONResponse), atravesando la pila completa
+de FastAPI con un cliente de pruebas.
+
+Uso:
+    python -m benchmarks.serializacion
+    python -m benchmarks.serializacion --filas 100 --repeticiones 200
+"""
+import argparse
+import os
+import statistics
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.testclient import TestClient
+
+import app.models  # noqa: F401  (registra todos los mapeos)
+from app.models.mensaje_chatbot import MensajeChatbot as MensajeChatbotModel
+from app.models.usuario import Usuario as UsuarioModel, RolEnum
+from app.schemas.mensaje_chatbot import MensajeChatbotWithUsuario
+from app.schemas.usuario import Usuario as UsuarioSchema
+
+def orm_to_pydantic(orm_obj, pydantic_model):
+    """Implementación anterior, conservada solo como referencia del benchmark."""
+    obj_dict = {c.name: getattr(orm_obj, c.name) for c in orm_obj.__table__.columns}
+    if pydantic_model == MensajeChatbotWithUsuario and orm_obj.usuario:
+        obj_dict["usuario"] = orm_to_pydantic(orm_obj.usuario, UsuarioSchema)
+    return pydantic_model(**obj_dict)
+
+def build_rows(filas: int) -> List[MensajeChatbotModel]:
+    usuario = UsuarioModel(
+        id=1, matricula="ti00001", nombre="Ana", apellido_paterno="López", apellido_materno="Ruiz",
+        contrasena_hash="x", rol=RolEnum.estudiante, correo="ana@example.com",
+        fecha_registro=datetime(2025, 1, 1), semestre_id=None,
+    )
+    inicio = datetime(2025, 1, 1)
+    return [
+        MensajeChatbotModel(
+            id=i, matricula="ti00001", session_id="2f1c6a0e-1b9d-4c55-9f55-5d9f1e0c1a11",
+            mensaje="¿Qué es la normalización en bases de datos?" * 2,
+            respuesta="La normalización es un proceso para organizar los datos. " * 20,
+            fecha=inicio + timedelta(minutes=i),
+            metadatos={"temas_detectados": ["bases de datos"], "longitud_respuesta": 1200},
+            usuario=usuario,
+        )
+        for i in range(filas)
+    ]
+
+def build_app(rows) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/antes", response_model=List[MensajeChatbotWithUsuario], response_class=JSONResponse)
+    def antes():
+        return [orm_to_pydantic(m, MensajeChatbotWithUsuario) for m in rows]
+
+    @app.get("/despues", response_model=List[MensajeChatbotWithUsuario], response_class=ORJSONResponse)
+    def despues():
+        return rows
+
+    return app
+
+def medir(client: TestClient, path: str, repeticiones: int) -> dict:
+    client.get(path)  # calentamiento
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        response = client.get(path)
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+        assert response.status_code == 200
+    tiempos.sort()
+    return {
+        "p50_ms": round(statistics.median(tiempos), 3),
+        "p95_ms": round(tiempos[int(len(tiempos) * 0.95) - 1], 3),
+        "bytes": len(response.content),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--filas", type=int, default=100)
+    parser.add_argument("--repeticiones", type=int, default=100)
+    args = parser.parse_args()
+
+    client = TestClient(build_app(build_rows(args.filas)))
+    for path in ("/antes", "/despues"):
+        r = medir(client, path, args.repeticiones)
+        print(f"{path:<10} filas={args.filas} p50={r['p50_ms']} ms p95={r['p95_ms']} ms bytes={r['bytes']}")
+
+if __name__ == "__main__":
+    main()
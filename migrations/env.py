@@ -26,8 +26,7 @@ from app.models.foro import Foro
 from app.models.comentario_foro import ComentarioForo
 from app.models.reaccion_foro import ReaccionForo
 from app.models.progreso_recurso import ProgresoRecurso
-from app.models.conversacion_chatbot import ConversacionChatbot
-from app.models.mensaje_chatbot import MensajeChatbot
+from app.models.mensaje_chatbot import MensajeChatbot, ConversacionChatbot, ConversacionArchivada
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -0,0 +1,248 @@
+"""esquema_inicial: tablas existentes antes de las migraciones
+
+Revision ID: 0a1d5c8e2b47
+Revises: 
+Create Date: 2026-10-19 19:00:00.000000
+
+Crea el esquema tal como lo generaba Base.metadata.create_all() antes de usar
+Alembic, para que `alembic upgrade head` funcione sobre una base vacía. En una
+base que ya tiene esas tablas no hay que ejecutarla, sino marcarla como aplicada
+antes de actualizar:
+
+    alembic stamp 0a1d5c8e2b47
+    alembic upgrade head
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0a1d5c8e2b47'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'semestre',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('nombre', sa.String(length=50), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('nombre'),
+    )
+    op.create_index(op.f('ix_semestre_id'), 'semestre', ['id'], unique=False)
+
+    op.create_table(
+        'usuario',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('matricula', sa.String(length=7), nullable=False),
+        sa.Column('nombre', sa.String(length=100), nullable=False),
+        sa.Column('apellido_paterno', sa.String(length=100), nullable=False),
+        sa.Column('apellido_materno', sa.String(length=100), nullable=False),
+        sa.Column('contrasena_hash', sa.String(length=255), nullable=False),
+        sa.Column('rol', sa.Enum('estudiante', 'admin', name='rolenum'), nullable=True),
+        sa.Column('fecha_registro', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column('correo', sa.String(length=100), nullable=False),
+        sa.Column('semestre_id', sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(['semestre_id'], ['semestre.id'], onupdate='CASCADE', ondelete='SET NULL'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_usuario_id'), 'usuario', ['id'], unique=False)
+    op.create_index(op.f('ix_usuario_matricula'), 'usuario', ['matricula'], unique=True)
+    op.create_index(op.f('ix_usuario_correo'), 'usuario', ['correo'], unique=True)
+
+    op.create_table(
+        'materia',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('nombre', sa.String(length=100), nullable=False),
+        sa.Column('descripcion', sa.Text(), nullable=True),
+        sa.Column('semestre_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['semestre_id'], ['semestre.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_materia_id'), 'materia', ['id'], unique=False)
+
+    op.create_table(
+        'semana_tema',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('materia_id', sa.Integer(), nullable=False),
+        sa.Column('numero_semana', sa.Integer(), nullable=False),
+        sa.Column('tema', sa.String(length=255), nullable=False),
+        sa.ForeignKeyConstraint(['materia_id'], ['materia.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sqlite_autoincrement=True,
+    )
+    op.create_index(op.f('ix_semana_tema_id'), 'semana_tema', ['id'], unique=False)
+
+    op.create_table(
+        'cuestionario',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('semana_tema_id', sa.Integer(), nullable=False),
+        sa.Column('titulo', sa.String(length=255), nullable=False),
+        sa.ForeignKeyConstraint(['semana_tema_id'], ['semana_tema.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_cuestionario_id'), 'cuestionario', ['id'], unique=False)
+
+    op.create_table(
+        'pregunta',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('cuestionario_id', sa.Integer(), nullable=False),
+        sa.Column('texto', sa.Text(), nullable=False),
+        sa.ForeignKeyConstraint(['cuestionario_id'], ['cuestionario.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_pregunta_id'), 'pregunta', ['id'], unique=False)
+
+    op.create_table(
+        'opcion',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('pregunta_id', sa.Integer(), nullable=False),
+        sa.Column('texto', sa.String(length=255), nullable=False),
+        sa.Column('es_correcta', sa.Boolean(), nullable=False),
+        sa.ForeignKeyConstraint(['pregunta_id'], ['pregunta.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_opcion_id'), 'opcion', ['id'], unique=False)
+
+    op.create_table(
+        'recurso',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('semana_tema_id', sa.Integer(), nullable=False),
+        sa.Column('tipo', sa.Enum('lectura', 'video', 'cuestionario', name='tiporecursoenum'), nullable=False),
+        sa.Column('contenido_lectura', sa.Text(), nullable=True),
+        sa.Column('url_video', sa.String(length=255), nullable=True),
+        sa.Column('cuestionario_id', sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(['semana_tema_id'], ['semana_tema.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['cuestionario_id'], ['cuestionario.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_recurso_id'), 'recurso', ['id'], unique=False)
+
+    op.create_table(
+        'progreso_recurso',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('matricula', sa.String(length=7), nullable=False),
+        sa.Column('recurso_id', sa.Integer(), nullable=False),
+        sa.Column('estado', sa.Enum('no_iniciado', 'en_progreso', 'completado', name='estadoprogresoenum'), nullable=False),
+        sa.Column('fecha_inicio', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('fecha_finalizacion', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('calificacion', sa.Numeric(precision=5, scale=2), nullable=True),
+        sa.Column('comentarios', sa.Text(), nullable=True),
+        sa.ForeignKeyConstraint(['matricula'], ['usuario.matricula'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['recurso_id'], ['recurso.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sqlite_autoincrement=True,
+    )
+    op.create_index(op.f('ix_progreso_recurso_id'), 'progreso_recurso', ['id'], unique=False)
+
+    op.create_table(
+        'foro',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('matricula', sa.String(length=7), nullable=False),
+        sa.Column('materia_id', sa.Integer(), nullable=False),
+        sa.Column('titulo', sa.String(length=255), nullable=False),
+        sa.Column('contenido', sa.Text(), nullable=False),
+        sa.Column('fecha_publicacion', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column('likes', sa.Integer(), nullable=True),
+        sa.Column('dislikes', sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(['matricula'], ['usuario.matricula'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['materia_id'], ['materia.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_foro_id'), 'foro', ['id'], unique=False)
+
+    op.create_table(
+        'comentario_foro',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('foro_id', sa.Integer(), nullable=False),
+        sa.Column('matricula', sa.String(length=7), nullable=False),
+        sa.Column('comentario', sa.Text(), nullable=False),
+        sa.Column('fecha_comentario', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.ForeignKeyConstraint(['foro_id'], ['foro.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['matricula'], ['usuario.matricula'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_comentario_foro_id'), 'comentario_foro', ['id'], unique=False)
+
+    op.create_table(
+        'reaccion_foro',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('foro_id', sa.Integer(), nullable=False),
+        sa.Column('matricula', sa.String(length=7), nullable=False),
+        sa.Column('tipo', sa.Enum('like', 'dislike', name='tiporeaccionenum'), nullable=False),
+        sa.Column('fecha_reaccion', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.ForeignKeyConstraint(['foro_id'], ['foro.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['matricula'], ['usuario.matricula'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sqlite_autoincrement=True,
+    )
+    op.create_index(op.f('ix_reaccion_foro_id'), 'reaccion_foro', ['id'], unique=False)
+
+    op.create_table(
+        'mensaje_chatbot',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('matricula', sa.String(length=7), nullable=True),
+        sa.Column('session_id', sa.String(length=36), nullable=False),
+        sa.Column('mensaje', sa.Text(), nullable=False),
+        sa.Column('respuesta', sa.Text(), nullable=False),
+        sa.Column('fecha', sa.DateTime(), nullable=True),
+        sa.Column('contexto', sa.Text(), nullable=True),
+        sa.Column('metadatos', sa.JSON(), nullable=True),
+        sa.ForeignKeyConstraint(['matricula'], ['usuario.matricula'], ondelete='SET NULL'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_mensaje_chatbot_id'), 'mensaje_chatbot', ['id'], unique=False)
+
+    op.create_table(
+        'conversacion_chatbot',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('session_id', sa.String(length=36), nullable=False),
+        sa.Column('matricula', sa.String(length=7), nullable=True),
+        sa.Column('titulo', sa.String(length=255), nullable=True),
+        sa.Column('fecha_inicio', sa.DateTime(), nullable=True),
+        sa.Column('fecha_ultima_actividad', sa.DateTime(), nullable=True),
+        sa.Column('resumen', sa.Text(), nullable=True),
+        sa.Column('temas', sa.JSON(), nullable=True),
+        sa.ForeignKeyConstraint(['matricula'], ['usuario.matricula'], ondelete='SET NULL'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('session_id'),
+    )
+    op.create_index(op.f('ix_conversacion_chatbot_id'), 'conversacion_chatbot', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_conversacion_chatbot_id'), table_name='conversacion_chatbot')
+    op.drop_table('conversacion_chatbot')
+    op.drop_index(op.f('ix_mensaje_chatbot_id'), table_name='mensaje_chatbot')
+    op.drop_table('mensaje_chatbot')
+    op.drop_index(op.f('ix_reaccion_foro_id'), table_name='reaccion_foro')
+    op.drop_table('reaccion_foro')
+    op.drop_index(op.f('ix_comentario_foro_id'), table_name='comentario_foro')
+    op.drop_table('comentario_foro')
+    op.drop_index(op.f('ix_foro_id'), table_name='foro')
+    op.drop_table('foro')
+    op.drop_index(op.f('ix_progreso_recurso_id'), table_name='progreso_recurso')
+    op.drop_table('progreso_recurso')
+    op.drop_index(op.f('ix_recurso_id'), table_name='recurso')
+    op.drop_table('recurso')
+    op.drop_index(op.f('ix_opcion_id'), table_name='opcion')
+    op.drop_table('opcion')
+    op.drop_index(op.f('ix_pregunta_id'), table_name='pregunta')
+    op.drop_table('pregunta')
+    op.drop_index(op.f('ix_cuestionario_id'), table_name='cuestionario')
+    op.drop_table('cuestionario')
+    op.drop_index(op.f('ix_semana_tema_id'), table_name='semana_tema')
+    op.drop_table('semana_tema')
+    op.drop_index(op.f('ix_materia_id'), table_name='materia')
+    op.drop_table('materia')
+    op.drop_index(op.f('ix_usuario_correo'), table_name='usuario')
+    op.drop_index(op.f('ix_usuario_matricula'), table_name='usuario')
+    op.drop_index(op.f('ix_usuario_id'), table_name='usuario')
+    op.drop_table('usuario')
+    op.drop_index(op.f('ix_semestre_id'), table_name='semestre')
+    op.drop_table('semestre')
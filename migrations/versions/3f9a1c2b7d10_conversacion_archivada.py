@@ -0,0 +1,46 @@
+"""conversacion_archivada: archivo comprimido de sesiones de chat antiguas
+
+Revision ID: 3f9a1c2b7d10
+Revises: 0a1d5c8e2b47
+Create Date: 2026-10-19 19:05:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9a1c2b7d10'
+down_revision: Union[str, None] = '0a1d5c8e2b47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'conversacion_archivada',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('session_id', sa.String(length=36), nullable=False),
+        sa.Column('matricula', sa.String(length=7), nullable=True),
+        sa.Column('num_mensajes', sa.Integer(), nullable=False),
+        sa.Column('fecha_primer_mensaje', sa.DateTime(), nullable=True),
+        sa.Column('fecha_ultimo_mensaje', sa.DateTime(), nullable=True),
+        sa.Column('fecha_archivado', sa.DateTime(), server_default=sa.func.now(), nullable=True),
+        sa.Column('tamano_original', sa.Integer(), nullable=False),
+        sa.Column('datos', sa.LargeBinary(length=2**24), nullable=False),
+        sa.ForeignKeyConstraint(['matricula'], ['usuario.matricula'], ondelete='SET NULL'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('session_id'),
+    )
+    op.create_index(op.f('ix_conversacion_archivada_id'), 'conversacion_archivada', ['id'], unique=False)
+    op.create_index(op.f('ix_conversacion_archivada_matricula'), 'conversacion_archivada', ['matricula'], unique=False)
+    op.create_index(op.f('ix_conversacion_archivada_fecha_ultimo_mensaje'), 'conversacion_archivada', ['fecha_ultimo_mensaje'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_conversacion_archivada_fecha_ultimo_mensaje'), table_name='conversacion_archivada')
+    op.drop_index(op.f('ix_conversacion_archivada_matricula'), table_name='conversacion_archivada')
+    op.drop_index(op.f('ix_conversacion_archivada_id'), table_name='conversacion_archivada')
+    op.drop_table('conversacion_archivada')
@@ -0,0 +1,85 @@
+"""mensaje_chatbot: sustituir la columna contexto por referencias a mensajes
+
+Rellena metadatos["contexto_ids"] de los mensajes que guardaban contexto con los
+ids de los mensajes previos de su sesión (los mismos que usa
+get_conversation_history) y elimina la columna. El texto se reconstruye bajo
+demanda con GET /api/mensajes/mensajes-chatbot/{mensaje_id}/contexto.
+
+Revision ID: 8b2e4d6a9c31
+Revises: 3f9a1c2b7d10
+Create Date: 2026-10-19 19:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b2e4d6a9c31'
+down_revision: Union[str, None] = '3f9a1c2b7d10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Mismo límite de mensajes previos que get_conversation_history
+LIMITE_HISTORIAL = 10
+LOTE = 1000
+
+mensaje_chatbot = sa.table(
+    'mensaje_chatbot',
+    sa.column('id', sa.Integer),
+    sa.column('session_id', sa.String),
+    sa.column('fecha', sa.DateTime),
+    sa.column('contexto', sa.Text),
+    sa.column('metadatos', sa.JSON),
+)
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+
+    sesiones = conn.execute(
+        sa.select(mensaje_chatbot.c.session_id)
+        .where(mensaje_chatbot.c.contexto.isnot(None))
+        .distinct()
+    ).scalars().all()
+
+    pendientes = []
+    for session_id in sesiones:
+        filas = conn.execute(
+            sa.select(mensaje_chatbot.c.id, mensaje_chatbot.c.contexto, mensaje_chatbot.c.metadatos)
+            .where(mensaje_chatbot.c.session_id == session_id)
+            .order_by(mensaje_chatbot.c.fecha, mensaje_chatbot.c.id)
+        ).all()
+        previos = []
+        for fila in filas:
+            if fila.contexto is not None:
+                metadatos = dict(fila.metadatos) if isinstance(fila.metadatos, dict) else {}
+                metadatos.setdefault("contexto_ids", previos[-LIMITE_HISTORIAL:])
+                pendientes.append({"_id": fila.id, "_metadatos": metadatos})
+            if not (isinstance(fila.metadatos, dict) and fila.metadatos.get("degradado")):
+                previos.append(fila.id)
+        if len(pendientes) >= LOTE:
+            _actualizar(conn, pendientes)
+            pendientes = []
+    _actualizar(conn, pendientes)
+
+    with op.batch_alter_table('mensaje_chatbot') as batch_op:
+        batch_op.drop_column('contexto')
+
+
+def _actualizar(conn, pendientes) -> None:
+    if pendientes:
+        conn.execute(
+            mensaje_chatbot.update()
+            .where(mensaje_chatbot.c.id == sa.bindparam('_id'))
+            .values(metadatos=sa.bindparam('_metadatos')),
+            pendientes,
+        )
+
+
+def downgrade() -> None:
+    # El texto eliminado no se restaura: la columna vuelve vacía
+    with op.batch_alter_table('mensaje_chatbot') as batch_op:
+        batch_op.add_column(sa.Column('contexto', sa.Text(), nullable=True))
@@ -0,0 +1,26 @@
+"""mensaje_chatbot: índice (session_id, fecha, id) para historial y paginación
+
+Revision ID: c47d0e5f1a82
+Revises: 8b2e4d6a9c31
+Create Date: 2026-10-19 20:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c47d0e5f1a82'
+down_revision: Union[str, None] = '8b2e4d6a9c31'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_mensaje_chatbot_session_fecha_id', 'mensaje_chatbot', ['session_id', 'fecha', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_mensaje_chatbot_session_fecha_id', table_name='mensaje_chatbot')
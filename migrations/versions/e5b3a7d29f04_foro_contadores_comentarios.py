@@ -0,0 +1,48 @@
+"""foro: num_comentarios y ultima_actividad desnormalizados, índices de orden
+
+Revision ID: e5b3a7d29f04
+Revises: c47d0e5f1a82
+Create Date: 2026-10-19 22:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5b3a7d29f04'
+down_revision: Union[str, None] = 'c47d0e5f1a82'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('foro', sa.Column('num_comentarios', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('foro', sa.Column('ultima_actividad', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True))
+    op.create_index('ix_comentario_foro_foro_fecha', 'comentario_foro', ['foro_id', 'fecha_comentario'], unique=False)
+
+    # Contadores a partir de los comentarios existentes
+    op.execute(
+        "UPDATE foro SET "
+        "num_comentarios = (SELECT count(*) FROM comentario_foro c WHERE c.foro_id = foro.id), "
+        "ultima_actividad = coalesce("
+        "(SELECT max(c.fecha_comentario) FROM comentario_foro c WHERE c.foro_id = foro.id), "
+        "foro.fecha_publicacion)"
+    )
+
+    op.create_index('ix_foro_actividad', 'foro', ['ultima_actividad', 'id'], unique=False)
+    op.create_index('ix_foro_likes', 'foro', ['likes', 'id'], unique=False)
+    op.create_index('ix_foro_materia_actividad', 'foro', ['materia_id', 'ultima_actividad', 'id'], unique=False)
+    op.create_index('ix_foro_materia_likes', 'foro', ['materia_id', 'likes', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_foro_materia_likes', table_name='foro')
+    op.drop_index('ix_foro_materia_actividad', table_name='foro')
+    op.drop_index('ix_foro_likes', table_name='foro')
+    op.drop_index('ix_foro_actividad', table_name='foro')
+    op.drop_index('ix_comentario_foro_foro_fecha', table_name='comentario_foro')
+    op.drop_column('foro', 'ultima_actividad')
+    op.drop_column('foro', 'num_comentarios')
@@ -0,0 +1,49 @@
+"""
+Archiva las sesiones de chat inactivas y aplica la retención de los archivos.
+
+Pensado para ejecutarse periódicamente (cron, tarea programada o un job del
+orquestador). Cada lote de sesiones se confirma por separado, así que se puede
+interrumpir y volver a lanzar sin perder trabajo.
+
+Uso:
+    python -m scripts.archivar_chat
+    python -m scripts.archivar_chat --dias 30 --retencion-dias 365
+    python -m scripts.archivar_chat --max-sesiones 1000 --sin-retencion
+"""
+import argparse
+import logging
+
+def main():
+    from app.config import CHAT_ARCHIVE_AFTER_DAYS, CHAT_ARCHIVE_BATCH, CHAT_ARCHIVE_RETENTION_DAYS
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dias", type=int, default=CHAT_ARCHIVE_AFTER_DAYS, help="Archivar sesiones sin actividad desde hace N días")
+    parser.add_argument("--retencion-dias", type=int, default=CHAT_ARCHIVE_RETENTION_DAYS, help="Eliminar archivos con más de N días (0 = nunca)")
+    parser.add_argument("--lote", type=int, default=CHAT_ARCHIVE_BATCH, help="Sesiones por transacción")
+    parser.add_argument("--max-sesiones", type=int, help="Límite de sesiones a archivar en esta ejecución")
+    parser.add_argument("--sin-retencion", action="store_true", help="No eliminar archivos antiguos")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    import app.models  # noqa: F401  (registra todos los mapeos)
+    from app.database import SessionLocal
+    from app.utils.archivo_chat import aplicar_retencion, archivar_sesiones
+
+    db = SessionLocal()
+    try:
+        resultado = archivar_sesiones(db, args.dias, args.lote, args.max_sesiones)
+        if not args.sin_retencion:
+            resultado.archivos_eliminados = aplicar_retencion(db, args.retencion_dias)
+    finally:
+        db.close()
+
+    ratio = resultado.bytes_comprimidos / resultado.bytes_originales if resultado.bytes_originales else 0
+    print(
+        f"{resultado.sesiones} sesiones archivadas ({resultado.mensajes} mensajes, "
+        f"{resultado.bytes_originales} → {resultado.bytes_comprimidos} bytes, ratio {ratio:.2f}); "
+        f"{resultado.archivos_eliminados} archivos eliminados por retención"
+    )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,308 @@
+"""
+Generador de datos sintéticos para reproducir volúmenes de producción en local.
+
+Puebla todos los modelos de app/models (semestres, materias, semanas, recursos,
+cuestionarios con preguntas y opciones, usuarios, foros con comentarios y
+reacciones, progreso de recursos y sesiones de chat) con inserciones masivas por
+lotes. Con la misma semilla y escala el resultado es idéntico, de modo que los
+planes de consulta y la paginación se pueden medir de forma determinista.
+
+Cantidades con --escala 1 (cada una se multiplica por la escala):
+    materias por semestre 6 (9 semestres), usuarios 2000, foros 5000 (6 comentarios y hasta 10 reacciones de
+    media), 40 progresos por usuario, 3 sesiones de chat por usuario de 8 mensajes.
+Cada materia tiene siempre 16 semanas con 3 recursos (lectura, video y cuestionario).
+
+Todos los usuarios comparten la contraseña indicada (se calcula un solo hash).
+
+Uso:
+    python -m scripts.generar_datos --escala 1
+    python -m scripts.generar_datos --escala 0.1 --semilla 7 --database-url sqlite:///local.db
+    python -m scripts.generar_datos --escala 5 --reiniciar
+"""
+import argparse
+import math
+import os
+import random
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, Iterator, List
+
+PALABRAS = (
+    "sistema base datos consulta índice red protocolo algoritmo estructura memoria proceso "
+    "hilo servidor cliente función clase objeto herencia interfaz compilador lenguaje sql "
+    "transacción normalización arquitectura capa modelo vista controlador prueba unidad python "
+    "redes examen proyecto práctica seguridad criptografía nube contenedor despliegue"
+).split()
+
+INICIO = datetime(2024, 8, 1)
+
+@dataclass
+class Resumen:
+    filas: Dict[str, int] = field(default_factory=dict)
+    segundos: float = 0.0
+
+def _texto(rng: random.Random, palabras: int) -> str:
+    return " ".join(rng.choice(PALABRAS) for _ in range(palabras)).capitalize() + "."
+
+def _escalar(base: float, escala: float) -> int:
+    return max(1, math.ceil(base * escala))
+
+def _lotes(filas: Iterable[Dict[str, Any]], tamano: int) -> Iterator[List[Dict[str, Any]]]:
+    lote = []
+    for fila in filas:
+        lote.append(fila)
+        if len(lote) >= tamano:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
+
+def generar(db, escala: float = 1.0, semilla: int = 42, contrasena: str = "Sysmentor2025!", lote: int = 5000, log=print) -> Resumen:
+    """
+    Inserta el conjunto de datos en la sesión `db` y hace commit por tabla.
+    Los identificadores se asignan a partir del máximo actual de cada tabla, así
+    que también se puede añadir volumen a una base existente.
+    """
+    from sqlalchemy import func, insert, select
+
+    from app.models.comentario_foro import ComentarioForo
+    from app.models.cuestionario import Cuestionario
+    from app.models.foro import Foro
+    from app.models.materia import Materia
+    from app.models.mensaje_chatbot import ConversacionChatbot, MensajeChatbot
+    from app.models.opcion import Opcion
+    from app.models.pregunta import Pregunta
+    from app.models.progreso_recurso import EstadoProgresoEnum, ProgresoRecurso
+    from app.models.reaccion_foro import ReaccionForo, TipoReaccionEnum
+    from app.models.recurso import Recurso, TipoRecursoEnum
+    from app.models.semana_tema import SemanaTema
+    from app.models.semestre import Semestre
+    from app.models.usuario import RolEnum, Usuario
+    from app.utils.security import get_password_hash
+
+    rng = random.Random(semilla)
+    resumen = Resumen()
+    inicio_total = time.perf_counter()
+
+    def siguiente_id(model) -> int:
+        return (db.scalar(select(func.max(model.id))) or 0) + 1
+
+    def insertar(model, filas: Iterable[Dict[str, Any]]) -> None:
+        inicio = time.perf_counter()
+        total = 0
+        for bloque in _lotes(filas, lote):
+            db.execute(insert(model), bloque)
+            total += len(bloque)
+        db.commit()
+        resumen.filas[model.__tablename__] = resumen.filas.get(model.__tablename__, 0) + total
+        log(f"{model.__tablename__:<22}{total:>10} filas {time.perf_counter() - inicio:>8.2f} s")
+
+    # Catálogo: semestres → materias → semanas → recursos (y cuestionarios)
+    existentes = set(db.scalars(select(Semestre.nombre)))
+    semestre_id = siguiente_id(Semestre)
+    semestres = []
+    for numero in range(1, 10):
+        nombre = f"Semestre {numero}"
+        while nombre in existentes:
+            nombre = f"{nombre}*"
+        semestres.append({"id": semestre_id + numero - 1, "nombre": nombre})
+    insertar(Semestre, semestres)
+
+    materia_id = siguiente_id(Materia)
+    materias = [
+        {
+            "id": materia_id + i,
+            "nombre": f"{_texto(rng, 2)[:-1]} {i + 1}",
+            "descripcion": _texto(rng, 30),
+            "semestre_id": semestres[i % len(semestres)]["id"],
+        }
+        for i in range(len(semestres) * _escalar(6, escala))
+    ]
+    insertar(Materia, materias)
+
+    semana_id = siguiente_id(SemanaTema)
+    semanas = [
+        {"id": semana_id + i * 16 + s, "materia_id": m["id"], "numero_semana": s + 1, "tema": _texto(rng, 5)[:255]}
+        for i, m in enumerate(materias) for s in range(16)
+    ]
+    insertar(SemanaTema, semanas)
+
+    # Un recurso de cada tres es cuestionario, con 5 preguntas de 4 opciones
+    cuestionario_id, pregunta_id, recurso_id = siguiente_id(Cuestionario), siguiente_id(Pregunta), siguiente_id(Recurso)
+    cuestionarios, preguntas, opciones, recursos = [], [], [], []
+    for semana in semanas:
+        for j in range(3):
+            tipo = (TipoRecursoEnum.lectura, TipoRecursoEnum.video, TipoRecursoEnum.cuestionario)[j % 3]
+            recurso = {"id": recurso_id + len(recursos), "semana_tema_id": semana["id"], "tipo": tipo,
+                       "contenido_lectura": None, "url_video": None, "cuestionario_id": None}
+            if tipo == TipoRecursoEnum.lectura:
+                recurso["contenido_lectura"] = _texto(rng, rng.randint(300, 1500))
+            elif tipo == TipoRecursoEnum.video:
+                recurso["url_video"] = f"https://videos.example.com/{rng.getrandbits(40):010x}"
+            else:
+                cid = cuestionario_id + len(cuestionarios)
+                cuestionarios.append({"id": cid, "semana_tema_id": semana["id"], "titulo": f"Cuestionario: {semana['tema'][:200]}"})
+                for _ in range(5):
+                    pid = pregunta_id + len(preguntas)
+                    preguntas.append({"id": pid, "cuestionario_id": cid, "texto": _texto(rng, 12) + "?"})
+                    correcta = rng.randrange(4)
+                    opciones.extend(
+                        {"pregunta_id": pid, "texto": _texto(rng, 4)[:255], "es_correcta": k == correcta}
+                        for k in range(4)
+                    )
+                recurso["cuestionario_id"] = cid
+            recursos.append(recurso)
+    insertar(Cuestionario, cuestionarios)
+    insertar(Pregunta, preguntas)
+    insertar(Opcion, opciones)
+    insertar(Recurso, recursos)
+    recurso_ids = [r["id"] for r in recursos]
+
+    # Usuarios: un único hash bcrypt para todos (calcular miles sería lo más lento)
+    ocupadas = set(db.scalars(select(Usuario.matricula)))
+    matriculas, numero = [], 1
+    while len(matriculas) < _escalar(2000, escala):
+        matricula = f"ti{numero:05d}"
+        if matricula not in ocupadas:
+            matriculas.append(matricula)
+        numero += 1
+        if numero > 99999:
+            raise ValueError("No quedan matrículas libres con el formato tiNNNNN")
+    hash_comun = get_password_hash(contrasena)
+    insertar(Usuario, (
+        {
+            "matricula": m,
+            "nombre": rng.choice(["Ana", "Luis", "María", "José", "Sofía", "Diego", "Lucía", "Carlos"]),
+            "apellido_paterno": rng.choice(["López", "García", "Hernández", "Martínez", "Pérez"]),
+            "apellido_materno": rng.choice(["Ruiz", "Díaz", "Torres", "Flores", "Gómez"]),
+            "contrasena_hash": hash_comun,
+            "rol": RolEnum.admin if i == 0 else RolEnum.estudiante,
+            "correo": f"{m}@alumnos.example.com",
+            "semestre_id": semestres[i % len(semestres)]["id"],
+            "fecha_registro": INICIO + timedelta(minutes=rng.randint(0, 60 * 24 * 30)),
+        }
+        for i, m in enumerate(matriculas)
+    ))
+
+    # Foros con reacciones únicas por (foro, usuario) y contadores coherentes
+    foro_id = siguiente_id(Foro)
+    foros, reacciones, comentarios = [], [], []
+    for i in range(_escalar(5000, escala)):
+        fid = foro_id + i
+        likes = dislikes = 0
+        for matricula in rng.sample(matriculas, min(len(matriculas), rng.randint(0, 20))):
+            tipo = TipoReaccionEnum.like if rng.random() < 0.8 else TipoReaccionEnum.dislike
+            likes += tipo == TipoReaccionEnum.like
+            dislikes += tipo == TipoReaccionEnum.dislike
+            reacciones.append({"foro_id": fid, "matricula": matricula, "tipo": tipo,
+                               "fecha_reaccion": INICIO + timedelta(minutes=i * 10 + rng.randint(1, 5000))})
+        publicacion = INICIO + timedelta(minutes=i * 10)
+        fechas = [publicacion + timedelta(minutes=rng.randint(1, 10000)) for _ in range(rng.randint(0, 12))]
+        comentarios.extend(
+            {
+                "foro_id": fid,
+                "matricula": rng.choice(matriculas),
+                "comentario": _texto(rng, rng.randint(5, 80)),
+                "fecha_comentario": fecha,
+            }
+            for fecha in fechas
+        )
+        foros.append({
+            "id": fid,
+            "matricula": rng.choice(matriculas),
+            "materia_id": rng.choice(materias)["id"],
+            "titulo": _texto(rng, rng.randint(3, 10))[:255],
+            "contenido": _texto(rng, rng.randint(20, 200)),
+            "fecha_publicacion": publicacion,
+            "likes": likes,
+            "dislikes": dislikes,
+            "num_comentarios": len(fechas),
+            "ultima_actividad": max(fechas, default=publicacion),
+        })
+    insertar(Foro, foros)
+    insertar(ReaccionForo, reacciones)
+    insertar(ComentarioForo, comentarios)
+
+    # Progreso: recursos distintos por usuario (única por matrícula y recurso)
+    def progresos() -> Iterator[Dict[str, Any]]:
+        for matricula in matriculas:
+            for rid in rng.sample(recurso_ids, min(len(recurso_ids), rng.randint(20, 60))):
+                estado = rng.choice(list(EstadoProgresoEnum))
+                inicio = INICIO + timedelta(hours=rng.randint(0, 24 * 120))
+                yield {
+                    "matricula": matricula,
+                    "recurso_id": rid,
+                    "estado": estado,
+                    "fecha_inicio": inicio if estado != EstadoProgresoEnum.no_iniciado else None,
+                    "fecha_finalizacion": inicio + timedelta(hours=rng.randint(1, 72)) if estado == EstadoProgresoEnum.completado else None,
+                    "calificacion": rng.randint(50, 100) if estado == EstadoProgresoEnum.completado else None,
+                    "comentarios": None,
+                }
+    insertar(ProgresoRecurso, progresos())
+
+    # Chat: sesiones con su conversación y mensajes en orden cronológico
+    conversaciones, mensajes = [], []
+    for matricula in matriculas:
+        for n in range(3):
+            # Derivado de la matrícula (siempre nueva) para no chocar al añadir volumen
+            session_id = str(uuid.uuid5(uuid.NAMESPACE_URL, f"generar_datos/{semilla}/{matricula}/{n}"))
+            fecha = INICIO + timedelta(minutes=rng.randint(0, 60 * 24 * 120))
+            temas = rng.sample(PALABRAS, 2)
+            primero = len(mensajes)
+            for _ in range(rng.randint(4, 12)):
+                fecha += timedelta(seconds=rng.randint(20, 600))
+                mensajes.append({
+                    "matricula": matricula,
+                    "session_id": session_id,
+                    "mensaje": _texto(rng, rng.randint(5, 40)) + "?",
+                    "respuesta": _texto(rng, rng.randint(40, 300)),
+                    "fecha": fecha,
+                    "metadatos": {"temas_detectados": temas, "tipo_consulta": "conceptual"},
+                })
+            conversaciones.append({
+                "session_id": session_id,
+                "matricula": matricula,
+                "titulo": _texto(rng, 4)[:-1],
+                # La conversación empieza con su primer mensaje
+                "fecha_inicio": mensajes[primero]["fecha"],
+                "fecha_ultima_actividad": fecha,
+                "resumen": _texto(rng, 25),
+                "temas": temas,
+            })
+    insertar(ConversacionChatbot, conversaciones)
+    insertar(MensajeChatbot, mensajes)
+
+    resumen.segundos = time.perf_counter() - inicio_total
+    return resumen
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--escala", type=float, default=1.0, help="Factor de escala de los volúmenes")
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--contrasena", default="Sysmentor2025!", help="Contraseña común de los usuarios generados")
+    parser.add_argument("--lote", type=int, default=5000, help="Filas por sentencia INSERT")
+    parser.add_argument("--database-url", help="Por defecto, DATABASE_URL del entorno")
+    parser.add_argument("--reiniciar", action="store_true", help="Borrar y recrear todas las tablas antes de generar")
+    args = parser.parse_args()
+
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+
+    import app.models  # noqa: F401  (registra todos los mapeos)
+    from app.database import Base, SessionLocal, engine
+
+    if args.reiniciar:
+        Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+
+    db = SessionLocal()
+    try:
+        resumen = generar(db, args.escala, args.semilla, args.contrasena, args.lote)
+    finally:
+        db.close()
+    print(f"\n{sum(resumen.filas.values())} filas en {resumen.segundos:.1f} s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+import os
+import tempfile
+
+# La configuración se lee al importar app.config: las pruebas usan una base SQLite temporal
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/pruebas.db"
+os.environ.setdefault("GEMINI_API_KEY", "pruebas")
+
+import pytest
+
+from app.database import Base, SessionLocal, engine
+import app.models  # noqa: F401  (registra todas las tablas en Base.metadata)
+from app.models.usuario import RolEnum, Usuario
+
+@pytest.fixture
+def db():
+    """Sesión sobre un esquema vacío, recreado en cada prueba."""
+    Base.metadata.create_all(engine)
+    sesion = SessionLocal()
+    try:
+        yield sesion
+    finally:
+        sesion.close()
+        Base.metadata.drop_all(engine)
+
+@pytest.fixture
+def crear_usuario(db):
+    def crear(matricula: str, rol: RolEnum = RolEnum.estudiante) -> Usuario:
+        usuario = Usuario(
+            matricula=matricula,
+            nombre="Nombre",
+            apellido_paterno="Paterno",
+            apellido_materno="Materno",
+            contrasena_hash="x",
+            rol=rol,
+            correo=f"{matricula}@example.com",
+        )
+        db.add(usuario)
+        db.commit()
+        return usuario
+    return crear
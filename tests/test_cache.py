@@ -0,0 +1,55 @@
+import pytest
+from starlette.requests import Request
+
+from app.utils import cache
+from app.utils.etag import build_etag
+
+class ClienteCompartido:
+    """Sustituto mínimo de un cliente Redis (get/set/incr) compartido por varios workers."""
+
+    def __init__(self):
+        self.datos = {}
+
+    def get(self, key):
+        return self.datos.get(key)
+
+    def set(self, key, value, ex=None):
+        self.datos[key] = value
+
+    def incr(self, key):
+        self.datos[key] = int(self.datos.get(key, 0)) + 1
+        return self.datos[key]
+
+@pytest.fixture
+def backend_compartido():
+    anterior = cache.get_backend()
+    cache.set_backend(cache.RedisCacheBackend(client=ClienteCompartido()))
+    yield cache.get_backend()
+    cache.set_backend(anterior)
+
+def _peticion(path: str) -> Request:
+    return Request({"type": "http", "method": "GET", "path": path, "query_string": b"", "headers": []})
+
+def test_backend_local_acota_los_espacios_volatiles():
+    assert not cache.get_backend().compartido
+    assert cache.ttl_efectivo("foros", 300) == cache.CACHE_VOLATILE_TTL_SECONDS
+    assert cache.ttl_efectivo("comentarios_foro", 300) == cache.CACHE_VOLATILE_TTL_SECONDS
+    assert cache.ttl_efectivo("materias", 300) == 300
+
+def test_backend_compartido_no_acota(backend_compartido):
+    assert cache.ttl_efectivo("foros", 300) == 300
+
+def test_etag_cambia_con_escrituras_de_otros_workers(backend_compartido):
+    antes = build_etag("foros", _peticion("/api/foros/"))
+    # Escritura atendida por otro worker: solo cambia la generación compartida
+    backend_compartido.incr_generation("foros")
+    assert build_etag("foros", _peticion("/api/foros/")) != antes
+
+def test_etag_compartido_es_igual_en_todos_los_workers(backend_compartido, monkeypatch):
+    from app.utils import etag
+
+    en_un_worker = build_etag("foros", _peticion("/api/foros/"))
+    # Otro proceso: distinto identificador de instancia y sin escrituras locales
+    monkeypatch.setattr(etag, "_INSTANCE", "otro")
+    monkeypatch.setattr(etag, "_versions", etag.defaultdict(int))
+    assert build_etag("foros", _peticion("/api/foros/")) == en_un_worker
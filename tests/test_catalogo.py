@@ -0,0 +1,32 @@
+from app.models.semestre import Semestre
+from app.utils import catalogo
+from app.utils.cache import get_backend
+
+def test_escritura_en_otro_worker_invalida_el_snapshot(db):
+    db.add(Semestre(nombre="Primero"))
+    db.commit()
+    catalogo.invalidate_catalog()
+    antes = catalogo.get_catalog_snapshot(db)
+
+    # Otro worker escribe: solo cambia la generación en el backend compartido, sin hook local
+    db.add(Semestre(nombre="Segundo"))
+    db.commit()
+    assert catalogo.get_catalog_snapshot(db) is antes
+    get_backend().incr_generation("semestres")
+
+    despues = catalogo.get_catalog_snapshot(db)
+    assert despues.etag != antes.etag
+    assert b"Segundo" in despues.body
+
+def test_snapshot_caduca_por_antiguedad(db, monkeypatch):
+    db.add(Semestre(nombre="Primero"))
+    db.commit()
+    catalogo.invalidate_catalog()
+    antes = catalogo.get_catalog_snapshot(db)
+
+    db.add(Semestre(nombre="Segundo"))
+    db.commit()
+    monkeypatch.setattr(catalogo, "CACHE_TTL_SECONDS", 0)
+
+    assert b"Segundo" in catalogo.get_catalog_snapshot(db).body
+    assert catalogo.get_catalog_snapshot(db) is not antes
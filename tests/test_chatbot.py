@@ -0,0 +1,28 @@
+from app.models.mensaje_chatbot import MensajeChatbot
+from app.utils.archivo_chat import archivar_sesiones
+from app.utils.chatbot import get_conversation_history, reconstruir_contexto
+
+def test_sesion_archivada_retomada_conserva_el_contexto(db, crear_usuario):
+    usuario = crear_usuario("ti00001")
+    for i in range(3):
+        db.add(MensajeChatbot(matricula=usuario.matricula, session_id="sesion", mensaje=f"antigua {i}", respuesta=f"r{i}"))
+    db.commit()
+    archivar_sesiones(db, antiguedad_dias=0)
+    assert db.query(MensajeChatbot).count() == 0
+
+    # El estudiante retoma la sesión archivada
+    db.add(MensajeChatbot(matricula=usuario.matricula, session_id="sesion", mensaje="nueva", respuesta="r"))
+    db.commit()
+
+    contexto, metadatos = get_conversation_history("sesion", db, limit=3)
+
+    assert "antigua 0" not in contexto
+    assert contexto.index("antigua 1") < contexto.index("antigua 2") < contexto.index("nueva")
+    assert len(metadatos["contexto_ids"]) == 3
+
+    siguiente = MensajeChatbot(
+        matricula=usuario.matricula, session_id="sesion", mensaje="otra", respuesta="r", metadatos=metadatos,
+    )
+    reconstruido, ids = reconstruir_contexto(siguiente, db)
+    assert ids == metadatos["contexto_ids"]
+    assert reconstruido.endswith(contexto[contexto.index("Usuario:"):])
@@ -0,0 +1,47 @@
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+
+import orjson
+import pytest
+
+from app.models.mensaje_chatbot import MensajeChatbot
+from app.routers.exportaciones import exportar_mensajes
+from app.utils.archivo_chat import archivar_sesiones
+from app.utils.exportacion import fecha_naive
+
+def _cuerpo(respuesta) -> list:
+    async def leer():
+        return b"".join([fragmento async for fragmento in respuesta.body_iterator])
+    return [orjson.loads(linea) for linea in asyncio.run(leer()).splitlines()]
+
+@pytest.fixture
+def zona_local(monkeypatch):
+    """Servidor en una zona distinta de UTC (UTC-6, sin horario de verano)."""
+    monkeypatch.setenv("TZ", "America/Mexico_City")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+def test_fecha_con_zona_pasa_a_hora_local(zona_local):
+    assert fecha_naive(datetime(2026, 1, 1, 12, tzinfo=timezone.utc)) == datetime(2026, 1, 1, 6)
+    assert fecha_naive(datetime(2026, 1, 1, 12)) == datetime(2026, 1, 1, 12)
+
+def test_rango_con_zona_horaria_incluye_los_archivados(db, crear_usuario, zona_local):
+    usuario = crear_usuario("ti00001")
+    for i in range(3):
+        db.add(MensajeChatbot(matricula=usuario.matricula, session_id="archivada", mensaje=f"p{i}", respuesta="r"))
+    db.add(MensajeChatbot(matricula=usuario.matricula, session_id="activa", mensaje="p", respuesta="r"))
+    db.commit()
+    archivar_sesiones(db, antiguedad_dias=0, max_sesiones=1)
+
+    # Rango estrecho: con un desfase de zona quedarían fuera todos los mensajes
+    desde = datetime.now(timezone.utc) - timedelta(minutes=5)
+    hasta = datetime.now(timezone.utc) + timedelta(minutes=5)
+    filas = _cuerpo(exportar_mensajes(
+        formato="ndjson", matricula=None, session_id=None, desde=desde, hasta=hasta, incluir_archivados=True,
+    ))
+
+    assert len(filas) == 4
+    assert {f["session_id"] for f in filas} == {"archivada", "activa"}
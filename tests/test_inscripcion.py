@@ -0,0 +1,13 @@
+from app.utils import inscripcion
+from app.utils.security import verify_password
+
+def test_el_pool_de_cifrado_usa_spawn_y_se_cierra(monkeypatch):
+    monkeypatch.setattr(inscripcion, "_WORKERS", 2)
+    try:
+        hashes = inscripcion.hash_contrasenas(["uno", "dos"])
+        assert inscripcion._pool._mp_context.get_start_method() == "spawn"
+    finally:
+        inscripcion.cerrar_pool()
+
+    assert inscripcion._pool is None
+    assert verify_password("uno", hashes[0]) and verify_password("dos", hashes[1])
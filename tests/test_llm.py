@@ -0,0 +1,93 @@
+import asyncio
+
+import pytest
+
+from app.utils.llm import CircuitBreaker, LLMClient, LLMError
+
+class BackendLento:
+    name = "pruebas"
+    model = "pruebas"
+
+    def __init__(self):
+        self.llamadas = 0
+
+    async def generate(self, prompt: str, timeout: float) -> str:
+        self.llamadas += 1
+        await asyncio.sleep(3600)
+        return "nunca"
+
+class BackendCaido(BackendLento):
+    async def generate(self, prompt: str, timeout: float) -> str:
+        self.llamadas += 1
+        raise LLMError("caído", status_code=503)
+
+class BackendPeticionInvalida(BackendLento):
+    async def generate(self, prompt: str, timeout: float) -> str:
+        self.llamadas += 1
+        raise LLMError("petición inválida", retryable=False, status_code=400)
+
+def test_cancelar_la_llamada_de_prueba_libera_el_circuito():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+
+    async def escenario():
+        with pytest.raises(LLMError):
+            await LLMClient(BackendCaido(), max_retries=0, breaker=breaker).generate("hola", "pruebas")
+
+        # Circuito semiabierto: la llamada de prueba se cancela (cliente desconectado)
+        cliente = LLMClient(BackendLento(), max_retries=0, breaker=breaker)
+        tarea = asyncio.create_task(cliente.generate("hola", "pruebas", timeout=3600))
+        await asyncio.sleep(0.01)
+        assert cliente.backend.llamadas == 1
+        tarea.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await tarea
+
+    asyncio.run(escenario())
+
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow()
+
+def test_cancelar_una_llamada_normal_no_libera_la_prueba_de_otra():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+
+    async def escenario():
+        # Llamada normal en curso con el circuito cerrado
+        normal = LLMClient(BackendLento(), max_retries=0, breaker=breaker)
+        tarea_normal = asyncio.create_task(normal.generate("hola", "pruebas", timeout=3600))
+        await asyncio.sleep(0.01)
+
+        with pytest.raises(LLMError):
+            await LLMClient(BackendCaido(), max_retries=0, breaker=breaker).generate("hola", "pruebas")
+
+        # Otra llamada toma la prueba del circuito semiabierto
+        prueba = LLMClient(BackendLento(), max_retries=0, breaker=breaker)
+        tarea_prueba = asyncio.create_task(prueba.generate("hola", "pruebas", timeout=3600))
+        await asyncio.sleep(0.01)
+        assert prueba.backend.llamadas == 1
+
+        tarea_normal.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await tarea_normal
+        # La prueba sigue en curso: no se admite una segunda
+        assert not breaker.allow()
+
+        tarea_prueba.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await tarea_prueba
+
+    asyncio.run(escenario())
+
+def test_los_errores_de_la_peticion_no_abren_el_circuito():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+    cliente = LLMClient(BackendPeticionInvalida(), max_retries=0, breaker=breaker)
+
+    async def escenario():
+        for _ in range(3):
+            with pytest.raises(LLMError) as exc:
+                await cliente.generate("hola", "pruebas")
+            assert exc.value.status_code == 400
+
+    asyncio.run(escenario())
+
+    assert cliente.backend.llamadas == 3
+    assert breaker.state == CircuitBreaker.CLOSED
@@ -0,0 +1,73 @@
+from typing import List
+
+from pydantic import TypeAdapter
+
+from app.models.mensaje_chatbot import MensajeChatbot
+from app.routers.mensajes_chatbot import read_mensaje_chatbot, read_mensajes_chatbot
+from app.schemas.mensaje_chatbot import MensajeChatbotWithUsuario
+from app.utils.query_stats import track_queries
+
+def _crear_mensajes(db, crear_usuario, por_usuario: int = 40) -> List[MensajeChatbot]:
+    mensajes = []
+    for n in range(1, 4):
+        usuario = crear_usuario(f"ti0000{n}")
+        for i in range(por_usuario):
+            mensajes.append(MensajeChatbot(
+                matricula=usuario.matricula, session_id=f"sesion-{n}", mensaje=f"pregunta {i}", respuesta=f"respuesta {i}",
+            ))
+    db.add_all(mensajes)
+    db.commit()
+    db.expire_all()
+    return mensajes
+
+def _sentencias_listado(db, limit: int) -> int:
+    # La serialización se incluye en el bloque: una carga perezosa de `usuario` también contaría
+    with track_queries() as stats:
+        mensajes = read_mensajes_chatbot(skip=0, limit=limit, db=db)
+        respuesta = TypeAdapter(List[MensajeChatbotWithUsuario]).validate_python(mensajes)
+    assert len(respuesta) == limit
+    assert all(m.usuario is not None for m in respuesta)
+    return stats.count
+
+def test_listado_con_numero_constante_de_sentencias(db, crear_usuario):
+    _crear_mensajes(db, crear_usuario)
+
+    pequena = _sentencias_listado(db, 5)
+    db.expire_all()
+    grande = _sentencias_listado(db, 100)
+
+    assert pequena == grande == 1
+
+def test_detalle_carga_el_usuario_en_la_misma_consulta(db, crear_usuario):
+    mensaje = _crear_mensajes(db, crear_usuario, por_usuario=1)[0]
+    mensaje_id, matricula = mensaje.id, mensaje.matricula
+    db.expire_all()
+
+    with track_queries() as stats:
+        respuesta = MensajeChatbotWithUsuario.model_validate(read_mensaje_chatbot(mensaje_id, db=db))
+
+    assert respuesta.usuario.matricula == matricula
+    assert stats.count == 1
+
+def test_paginacion_por_cursor_recorre_cada_mensaje_una_vez(db, crear_usuario):
+    from app.models.mensaje_chatbot import ConversacionChatbot
+    from app.routers.mensajes_chatbot import get_conversacion_by_id
+
+    usuario = crear_usuario("ti00001")
+    db.add(ConversacionChatbot(session_id="sesion", matricula=usuario.matricula))
+    # Inserciones sucesivas con la fecha por defecto: varios mensajes caen en el mismo segundo
+    for i in range(7):
+        db.add(MensajeChatbot(matricula=usuario.matricula, session_id="sesion", mensaje=f"pregunta {i}", respuesta="respuesta"))
+        db.commit()
+    esperados = [id for (id,) in db.query(MensajeChatbot.id).order_by(MensajeChatbot.id)]
+
+    vistos, antes = [], None
+    for _ in range(len(esperados) + 1):
+        pagina = get_conversacion_by_id("sesion", limit=2, antes=antes, db=db)
+        vistos = [m.id for m in pagina["mensajes"]] + vistos
+        antes = pagina["cursor_anteriores"]
+        if antes is None:
+            break
+
+    assert antes is None
+    assert vistos == esperados
@@ -0,0 +1,92 @@
+from starlette.responses import PlainTextResponse
+from starlette.testclient import TestClient
+
+from app.config import RATE_LIMIT_RULES
+from app.middleware.limites import RateLimitMiddleware
+from app.utils.rate_limit import MemoryRateLimitBackend, RateLimiter, parse_rules
+
+async def aplicacion(scope, receive, send):
+    await PlainTextResponse("ok")(scope, receive, send)
+
+def _cliente(reglas: str = RATE_LIMIT_RULES, **opciones) -> TestClient:
+    limiter = RateLimiter(parse_rules(reglas), backend=MemoryRateLimitBackend())
+    return TestClient(RateLimitMiddleware(aplicacion, limiter=limiter, **opciones))
+
+def _login(cliente: TestClient, matricula: str):
+    return cliente.post("/api/usuarios/login", data={"username": matricula, "password": "x"})
+
+def _login_desde(cliente: TestClient, reenviado: str):
+    return cliente.post("/api/usuarios/login", data={"username": "ti00001"}, headers={"X-Forwarded-For": reenviado})
+
+def test_un_grupo_detras_de_la_misma_ip_puede_iniciar_sesion():
+    cliente = _cliente()
+    respuestas = [_login(cliente, f"ti{n:05d}") for n in range(40)]
+    assert all(r.status_code == 200 for r in respuestas)
+
+def test_la_matricula_se_limita_sin_afectar_a_las_demas():
+    cliente = _cliente()
+    assert all(_login(cliente, "ti00001").status_code == 200 for _ in range(10))
+
+    rechazo = _login(cliente, "ti00001")
+    assert rechazo.status_code == 429
+    assert int(rechazo.headers["retry-after"]) >= 1
+    assert rechazo.headers["x-ratelimit-limit"] == "10;w=60"
+    assert _login(cliente, "ti00002").status_code == 200
+
+def test_x_forwarded_for_falsificado_no_da_una_cubeta_nueva():
+    cliente = _cliente("POST /api/usuarios/login=3/60:ip", trust_proxy=True)
+
+    # El proxy de confianza añade al final la IP real (203.0.113.7); lo anterior lo envía el cliente
+    respuestas = [_login_desde(cliente, f"10.0.0.{n}, 203.0.113.7") for n in range(5)]
+    assert [r.status_code for r in respuestas] == [200, 200, 200, 429, 429]
+    assert _login_desde(cliente, "203.0.113.8").status_code == 200
+
+def test_x_forwarded_for_con_varios_proxies_de_confianza():
+    cliente = _cliente("POST /api/usuarios/login=1/60:ip", trust_proxy=True, trusted_hops=2)
+
+    assert _login_desde(cliente, "1.1.1.1, 203.0.113.7, 10.0.0.1").status_code == 200
+    assert _login_desde(cliente, "2.2.2.2, 203.0.113.7, 10.0.0.2").status_code == 429
+
+def test_matriculas_distintas_no_vacian_las_cubetas_por_ip():
+    backend = MemoryRateLimitBackend(max_keys=50)
+    limiter = RateLimiter(parse_rules("POST /api/usuarios/login=5/60:matricula;POST /api/usuarios/login=20/60:ip"), backend=backend)
+    cliente = TestClient(RateLimitMiddleware(aplicacion, limiter=limiter))
+
+    respuestas = [_login(cliente, f"ti{n:05d}") for n in range(200)]
+
+    # La cubeta de la IP se agota y a partir de ahí no se crean cubetas por matrícula
+    assert sum(r.status_code == 200 for r in respuestas) == 20
+    assert len(backend._buckets) == 21
+    assert _login(cliente, "ti00001").status_code == 429
+
+def test_al_llenarse_se_descartan_las_cubetas_menos_usadas():
+    backend = MemoryRateLimitBackend(max_keys=3)
+    assert backend.consume("atacante", 1, 1 / 60) == (True, 0.0)
+    for n in range(10):
+        backend.consume(f"otra-{n}", 1, 1 / 60)
+        # El atacante sigue usando su cubeta, así que no es la menos reciente
+        permitido, _ = backend.consume("atacante", 1, 1 / 60)
+        assert not permitido
+    assert len(backend._buckets) == 3
+
+def _conversar(cliente: TestClient, matricula=None):
+    cuerpo = {"mensaje": "hola", **({"matricula": matricula} if matricula else {})}
+    return cliente.post("/api/mensajes/mensajes-chatbot/conversar", json=cuerpo)
+
+def test_chat_sin_matricula_usa_una_cubeta_pequena_por_ip():
+    cliente = _cliente()
+    anonimas = [_conversar(cliente).status_code for _ in range(10)]
+    assert anonimas.count(200) == 5
+
+    # Los estudiantes identificados detrás de la misma IP no se ven afectados
+    assert all(_conversar(cliente, f"ti{n:05d}").status_code == 200 for n in range(30))
+
+def test_chat_con_matriculas_rotadas_queda_limitado_por_ip():
+    cliente = _cliente()
+    respuestas = [_conversar(cliente, f"ti{n:05d}").status_code for n in range(200)]
+    assert respuestas.count(200) == 120
+
+def test_registro_de_un_grupo_desde_la_misma_ip():
+    cliente = _cliente()
+    respuestas = [cliente.post("/api/usuarios/", json={"matricula": f"ti{n:05d}"}).status_code for n in range(40)]
+    assert all(r == 200 for r in respuestas)